@@ -0,0 +1,114 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets: ``rate`` requests per second with ``burst`` capacity"""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def allow(self, client):
+        """Take a token for ``client``; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                allowed, retry_after = True, 0
+                tokens -= 1
+            else:
+                allowed = False
+                retry_after = max(1, math.ceil((1 - tokens) / self.rate))
+                self.rejected += 1
+            self._buckets[client] = (tokens, now)
+            # Forget the least recently seen clients; they come back with a full bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted; carries a Retry-After hint"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, time-limited wait queue.
+
+    At most ``max_in_flight`` requests run at once and at most ``max_queue``
+    wait for a slot. Anything beyond that is refused immediately, and a queued
+    request that can't start within ``queue_timeout`` seconds is refused too,
+    so admitted requests see predictable latency instead of piling up.
+    """
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self._service_time = 1.0  # Moving average of seconds per request, for Retry-After
+
+    def _retry_after(self):
+        backlog = self.in_flight + self.queued
+        return max(1, math.ceil(self._service_time * backlog / self.max_in_flight))
+
+    def acquire(self):
+        """Wait for a slot or raise Overloaded"""
+        with self._condition:
+            if self.in_flight < self.max_in_flight and self.queued == 0:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise Overloaded('queue_full', self._retry_after())
+
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_queue_timeout += 1
+                        raise Overloaded('queue_timeout', self._retry_after())
+                    self._condition.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.admitted += 1
+
+    def release(self, service_time):
+        with self._condition:
+            self.in_flight -= 1
+            self._service_time = 0.9 * self._service_time + 0.1 * service_time
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return {
+                'in_flight': self.in_flight,
+                'queue_depth': self.queued,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_queue_timeout': self.rejected_queue_timeout,
+                'avg_service_seconds': round(self._service_time, 3),
+            }
@@ -0,0 +1,224 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BATCH_SIZE = 100  # Documents per worker task and per store transaction
+
+
+def _init_worker(data_dir):
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        import resume_parser
+    resume_parser.app.config['DATA_DIR'] = data_dir
+
+
+def backfill_batch(items, names):
+    """Worker entry point: re-run ``names`` over the stored text and hints of (document_id, profile) items.
+
+    Returns (document_id, text_key, fields, error) per item, where text_key is
+    the field cache key of the stored text; fields is None on error.
+    """
+    import resume_parser
+    from extractor_scheduler import run_extractors
+    from field_cache import FieldCache
+
+    outcomes = []
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        store = resume_parser.get_text_store()
+        texts = store.get_many([doc_id for doc_id, _ in items])
+        hints = store.get_hints([doc_id for doc_id, _ in items])
+        for doc_id, profile in items:
+            text = texts.get(doc_id)
+            if text is None:
+                outcomes.append((doc_id, None, None, 'text not stored'))
+                continue
+            try:
+                # One extractor thread per process; the process pool already fills every core
+                fields = run_extractors(resume_parser.EXTRACTOR_REGISTRY, text, names=names,
+                                        max_workers=1, profile=profile, hints=hints.get(doc_id))
+                outcomes.append((doc_id, FieldCache.text_key(text), fields, None))
+            except Exception as e:
+                outcomes.append((doc_id, None, None, f'{type(e).__name__}: {e}'))
+    return outcomes
+
+
+def affected_outputs(registry, names):
+    """``names`` plus every output computed from one of them (phone from phones)"""
+    return [output for output in registry.outputs()
+            if output in names or set(registry.plan([output])) & set(names)]
+
+
+class Backfill:
+    """Re-runs extractors over the text store and writes the results back.
+
+    Reading batches, running extractors in worker processes and writing
+    results overlap; writes happen in this process only, one transaction per
+    store and batch. Stored results keep their candidate ids, so iteration
+    over the result store is not disturbed by the updates.
+    """
+
+    def __init__(self, resume_parser, names, workers, batch_size, stale_only=False):
+        self.rp = resume_parser
+        self.names = names
+        self.workers = workers
+        self.batch_size = batch_size
+        self.stale_only = stale_only
+        self._versions = {}  # (keyword profile, hints digest) -> {extractor: version}
+        self.updated = self.current = 0
+        self.errors = {}
+
+    def versions(self, profile, hints=None):
+        from field_cache import hints_digest
+        key = (profile, hints_digest(hints))
+        if key not in self._versions:
+            self._versions[key] = {name: self.rp.EXTRACTOR_REGISTRY.version(name, profile, hints)
+                                   for name in self.names}
+        return self._versions[key]
+
+    def stale(self, records):
+        """The records whose fields are not all cached at their current versions"""
+        cache = self.rp.get_field_cache()
+        hints = self.rp.get_text_store().get_hints([record['document_id'] for record in records])
+        stale = []
+        for record in records:
+            versions = self.versions(record['result'].get('keyword_profile'), hints.get(record['document_id']))
+            # Results stored before their text hash was kept are always re-run
+            if record['text_hash'] is not None and cache.is_current(record['text_hash'], versions):
+                self.current += 1
+            else:
+                stale.append(record)
+        return stale
+
+    def batches(self):
+        """Stored records to re-run, in batches"""
+        page = []
+        batch = []
+        for record in self.rp.get_result_store().iter_results(batch_size=self.batch_size * 4):
+            page.append(record)
+            if len(page) == self.batch_size:
+                batch.extend(self.stale(page) if self.stale_only else page)
+                page = []
+            if len(batch) >= self.batch_size:
+                yield batch[:self.batch_size]
+                batch = batch[self.batch_size:]
+        batch.extend(self.stale(page) if self.stale_only and page else page)
+        while batch:
+            yield batch[:self.batch_size]
+            batch = batch[self.batch_size:]
+
+    def write(self, records, outcomes):
+        """Merge re-run fields into the stored results and refresh the caches and indexes"""
+        from search_index import INDEXED_FIELDS
+        results = []
+        cached_fields = []
+        cache = self.rp.get_field_cache()
+        hints = self.rp.get_text_store().get_hints([doc_id for doc_id, _, _, _ in outcomes])
+        text_keys = {}
+        for doc_id, text_key, fields, error in outcomes:
+            if error is not None:
+                self.errors[doc_id] = error
+                continue
+            record = records[doc_id]
+            record['result'].update(fields)
+            results.append((doc_id, record['result']))
+            text_keys[doc_id] = text_key
+            versions = self.versions(record['result'].get('keyword_profile'), hints.get(doc_id))
+            cached_fields.append((text_key, {name: (versions[name], fields[name]) for name in self.names}))
+        if not results:
+            return
+        for text_key, fields in cached_fields:
+            cache.put(text_key, fields)
+        # The stored result is current once every field is; otherwise it keeps its old stamp.
+        # It only comes wholly from the stored text once every output was re-run.
+        rerun_all = set(self.names) >= set(self.rp.EXTRACTOR_REGISTRY.outputs())
+        stamped = []
+        for doc_id, result in results:
+            profile = result.get('keyword_profile')
+            current = cache.is_current(text_keys[doc_id], self.rp.field_versions(profile, hints.get(doc_id)))
+            stamped.append((doc_id, result, self.rp.fields_version(profile, hints.get(doc_id)) if current else None,
+                            text_keys[doc_id] if rerun_all else None))
+        self.updated += self.rp.get_result_store().update_results(stamped)
+
+        reindex = any(name in INDEXED_FIELDS for name in self.names)
+        reskill = 'skills' in self.names
+        if reindex or reskill:
+            texts = self.rp.get_text_store().get_many([doc_id for doc_id, _ in results])
+            if reindex:
+                self.rp.get_search_index().add_documents(
+                    [(doc_id, texts[doc_id], result) for doc_id, result in results])
+            if reskill:
+                self.rp.get_ranking_engine().add_many(
+                    [(doc_id, texts[doc_id], result.get('skills')) for doc_id, result in results])
+                self.rp.get_skill_bitmap().add_many([(doc_id, result.get('skills')) for doc_id, result in results])
+
+    def run(self):
+        started = time.monotonic()
+        data_dir = self.rp.app.config['DATA_DIR']
+        in_flight = {}  # future -> {document_id: record}
+        # Spawned, not forked: the parent holds open SQLite connections
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(data_dir,)) as pool:
+            pending = self.batches()
+            exhausted = False
+            while in_flight or not exhausted:
+                # Keep every worker busy with one batch queued behind it
+                while not exhausted and len(in_flight) < self.workers * 2:
+                    batch = next(pending, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    items = [(record['document_id'], record['result'].get('keyword_profile')) for record in batch]
+                    future = pool.submit(backfill_batch, items, self.names)
+                    in_flight[future] = {record['document_id']: record for record in batch}
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    records = in_flight.pop(future)
+                    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+                        self.write(records, future.result())
+                print(f"DEBUG: Backfilled {self.updated} documents ({len(self.errors)} errors, "
+                      f"{self.current} already current) in {time.monotonic() - started:.1f}s")
+        return {'updated': self.updated, 'current': self.current, 'errors': self.errors,
+                'seconds': round(time.monotonic() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Re-run extractors over the stored text of every parsed resume, without decoding files again')
+    parser.add_argument('--extractors', help='Comma-separated extractors to re-run (default: all)')
+    parser.add_argument('--stale', action='store_true',
+                        help='Skip documents whose fields were already computed by the current extractor versions')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--data-dir', help='Data directory (default: the app setting)')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        import resume_parser
+    if args.data_dir:
+        resume_parser.app.config['DATA_DIR'] = os.path.abspath(args.data_dir)
+    registry = resume_parser.EXTRACTOR_REGISTRY
+    names = [name.strip() for name in args.extractors.split(',')] if args.extractors else registry.outputs()
+    unknown = [name for name in names if name not in registry.outputs()]
+    if unknown:
+        parser.error(f"unknown extractors {unknown}; choose from {registry.outputs()}")
+    names = affected_outputs(registry, names)
+    print(f"DEBUG: Re-running {names} over {resume_parser.get_text_store().stats()['texts']} stored texts")
+
+    summary = Backfill(resume_parser, names, args.workers or os.cpu_count() or 1, args.batch_size,
+                       stale_only=args.stale).run()
+    for doc_id, error in list(summary['errors'].items())[:20]:
+        print(f"WARNING: {doc_id}: {error}")
+    print(f"DEBUG: Backfill finished: {summary['updated']} updated, {summary['current']} already current, "
+          f"{len(summary['errors'])} errors in {summary['seconds']}s")
+    sys.exit(1 if summary['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,704 @@
+import argparse
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PORT = 8765
+DEFAULT_CHUNK_SIZE = 100  # Manifest entries per lease
+DEFAULT_SHARDS = 16  # Contiguous manifest ranges; workers start on one and steal from the others
+DEFAULT_LEASE_SECONDS = 120.0  # A chunk without a heartbeat for this long goes back to the queue
+DEFAULT_MAX_ATTEMPTS = 3  # Lost leases before a single-file chunk is marked failed
+WAIT_SECONDS = 2.0  # Suggested pause for a worker while all remaining chunks are leased
+COORDINATOR_RETRY_SECONDS = 60.0  # How long a worker keeps retrying an unreachable coordinator
+INSERT_BATCH = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    idx INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    document_id TEXT,
+    error TEXT,
+    worker TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_state ON items(state, idx);
+"""
+
+
+class BatchState:
+    """The manifest and the outcome of every entry, kept in SQLite.
+
+    An entry moves from pending to done or failed exactly once, so a result
+    committed twice (a worker whose lease expired, then a second worker) is
+    stored once, and a restarted coordinator carries on with what is pending.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load_manifest(self, manifest_path):
+        """Read the manifest (one file path per line) unless this state already holds it"""
+        manifest_path = os.path.abspath(manifest_path)
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'manifest'").fetchone()
+        if row is not None:
+            if row[0] != manifest_path:
+                raise ValueError(f"State {self.db_path} belongs to manifest {row[0]}")
+            return False
+        base = os.path.dirname(manifest_path)
+        with conn:
+            batch = []
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    path = line.strip()
+                    if not path or path.startswith('#'):
+                        continue
+                    # Relative entries are relative to the manifest
+                    batch.append((os.path.join(base, path),))
+                    if len(batch) == INSERT_BATCH:
+                        conn.executemany('INSERT INTO items (path) VALUES (?)', batch)
+                        batch = []
+            conn.executemany('INSERT INTO items (path) VALUES (?)', batch)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('manifest', ?)", (manifest_path,))
+        return True
+
+    def counts(self):
+        counts = {'pending': 0, 'done': 0, 'failed': 0}
+        counts.update(self._connect().execute('SELECT state, count(*) FROM items GROUP BY state').fetchall())
+        return counts
+
+    def iter_pending(self):
+        """Indexes of pending entries, in manifest order"""
+        cursor = self._connect().execute("SELECT idx FROM items WHERE state = 'pending' ORDER BY idx")
+        for (idx,) in cursor:
+            yield idx
+
+    def pending_items(self, start, end):
+        """(index, path) of the pending entries in [start, end)"""
+        return self._connect().execute(
+            "SELECT idx, path FROM items WHERE state = 'pending' AND idx >= ? AND idx < ? ORDER BY idx",
+            (start, end)).fetchall()
+
+    def pending_among(self, indexes):
+        if not indexes:
+            return set()
+        placeholders = ','.join('?' * len(indexes))
+        return {idx for (idx,) in self._connect().execute(
+            f"SELECT idx FROM items WHERE state = 'pending' AND idx IN ({placeholders})", list(indexes))}
+
+    def finish(self, outcomes, worker):
+        """Record (index, state, document_id, error) outcomes of pending entries"""
+        finished_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "UPDATE items SET state = ?, document_id = ?, error = ?, worker = ?, finished_at = ? "
+                "WHERE idx = ? AND state = 'pending'",
+                [(state, doc_id, error, worker, finished_at, idx) for idx, state, doc_id, error in outcomes])
+
+    def retry_failed(self):
+        """Put failed entries back to pending; returns how many"""
+        conn = self._connect()
+        with conn:
+            return conn.execute(
+                "UPDATE items SET state = 'pending', error = NULL, worker = NULL, finished_at = NULL "
+                "WHERE state = 'failed'").rowcount
+
+    def failures(self, limit=20):
+        return self._connect().execute(
+            "SELECT path, error FROM items WHERE state = 'failed' ORDER BY idx LIMIT ?", (limit,)).fetchall()
+
+
+def outcome_problem(outcome):
+    """Why a committed outcome is malformed, or None if it is usable"""
+    if not isinstance(outcome, dict):
+        return 'an outcome is not a JSON object'
+    index = outcome.get('index')
+    if not isinstance(index, int) or isinstance(index, bool):
+        return 'an outcome has no integer index'
+    if outcome.get('ok') is True:
+        result = outcome.get('result')
+        if not isinstance(result, dict) or not isinstance(result.get('document_id'), str):
+            return f'outcome {index} is ok but has no result with a document_id'
+        if not isinstance(outcome.get('text'), str) or not isinstance(outcome.get('path'), str):
+            return f'outcome {index} is ok but has no text or path'
+    elif outcome.get('ok') is not False:
+        return f'outcome {index} has no ok flag'
+    return None
+
+
+class Coordinator:
+    """Hands out manifest chunks to pulling workers and commits their results.
+
+    Chunks are split over ``shards`` contiguous ranges of the manifest. Each
+    worker is given a home shard and takes chunks from its front; when that
+    runs dry it steals from the back of the longest remaining shard, so fast
+    workers take over the tail of slow ones. A leased chunk whose worker
+    stops sending heartbeats is split in two and queued again, which retries
+    the work of a dead worker and isolates a file that keeps killing workers.
+    Results are written to the stores here, in one process.
+    """
+
+    def __init__(self, state, ingest, chunk_size=DEFAULT_CHUNK_SIZE, shards=DEFAULT_SHARDS,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, profile=None):
+        self.state = state
+        self.ingest = ingest
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.profile = profile
+        self.counts = state.counts()
+        self.chunks = {}  # chunk id -> {'start', 'end', 'shard', 'attempts'}, pending or leased
+        self.leases = {}  # chunk id -> {'worker', 'token', 'expires'}
+        self.workers = {}  # worker id -> {'name', 'shard', 'last_seen', 'chunks', 'items', 'stolen'}
+        self.requeued = 0
+        self._next_chunk_id = 0
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+
+        ranges = self._pending_ranges(chunk_size)
+        self.shards = [deque() for _ in range(max(1, min(shards, len(ranges))))]
+        for position, (start, end) in enumerate(ranges):
+            self._add_chunk(start, end, position * len(self.shards) // len(ranges))
+        print(f"DEBUG: {self.counts['pending']} pending entries in {len(ranges)} chunks over "
+              f"{len(self.shards)} shards")
+
+    def _pending_ranges(self, chunk_size):
+        """[start, end) index ranges holding ``chunk_size`` pending entries each"""
+        ranges = []
+        first = last = None
+        taken = 0
+        for idx in self.state.iter_pending():
+            if first is None:
+                first = idx
+            last = idx
+            taken += 1
+            if taken == chunk_size:
+                ranges.append((first, last + 1))
+                first = None
+                taken = 0
+        if first is not None:
+            ranges.append((first, last + 1))
+        return ranges
+
+    def _add_chunk(self, start, end, shard, attempts=0, front=False):
+        chunk_id = self._next_chunk_id
+        self._next_chunk_id += 1
+        self.chunks[chunk_id] = {'start': start, 'end': end, 'shard': shard, 'attempts': attempts}
+        if front:
+            self.shards[shard].appendleft(chunk_id)
+        else:
+            self.shards[shard].append(chunk_id)
+
+    def register(self, name):
+        with self._lock:
+            # The shard with the fewest workers, preferring ones with work left
+            owners = [0] * len(self.shards)
+            for worker in self.workers.values():
+                owners[worker['shard']] += 1
+            shard = min(range(len(self.shards)), key=lambda s: (owners[s], not self.shards[s], s))
+            worker_id = uuid.uuid4().hex[:12]
+            self.workers[worker_id] = {'name': name, 'shard': shard, 'last_seen': time.monotonic(),
+                                       'chunks': 0, 'items': 0, 'stolen': 0}
+        print(f"DEBUG: Worker {name} registered as {worker_id} on shard {shard}")
+        return {'worker_id': worker_id, 'lease_seconds': self.lease_seconds, 'profile': self.profile}
+
+    def _take_chunk(self, shard):
+        """Next chunk from the worker's own shard, else the back of the longest other one"""
+        if self.shards[shard]:
+            return self.shards[shard].popleft(), False
+        victim = max(range(len(self.shards)), key=lambda s: len(self.shards[s]))
+        if self.shards[victim]:
+            return self.shards[victim].pop(), True
+        return None, False
+
+    def lease(self, worker_id):
+        """A chunk of pending entries for the worker, or a wait or done signal"""
+        with self._lock:
+            self.reap()
+            worker = self.workers.get(worker_id)
+            if worker is None:
+                return None
+            worker['last_seen'] = time.monotonic()
+            while True:
+                chunk_id, stolen = self._take_chunk(worker['shard'])
+                if chunk_id is None:
+                    return {'done': True} if not self.chunks else {'wait': WAIT_SECONDS}
+                chunk = self.chunks[chunk_id]
+                items = self.state.pending_items(chunk['start'], chunk['end'])
+                if items:
+                    break
+                # Committed meanwhile by a worker whose lease had expired
+                del self.chunks[chunk_id]
+            token = uuid.uuid4().hex
+            self.leases[chunk_id] = {'worker': worker_id, 'token': token,
+                                     'expires': time.monotonic() + self.lease_seconds}
+            if stolen:
+                worker['stolen'] += 1
+        return {'chunk_id': chunk_id, 'token': token, 'items': items, 'stolen': stolen}
+
+    def heartbeat(self, worker_id, chunk_id, token):
+        """Extend a lease; False if it was lost"""
+        with self._lock:
+            if worker_id in self.workers:
+                self.workers[worker_id]['last_seen'] = time.monotonic()
+            lease = self.leases.get(chunk_id)
+            if lease is None or lease['token'] != token:
+                return False
+            lease['expires'] = time.monotonic() + self.lease_seconds
+            return True
+
+    def reap(self):
+        """Requeue chunks whose lease expired (caller holds the lock)"""
+        now = time.monotonic()
+        for chunk_id, lease in list(self.leases.items()):
+            if lease['expires'] > now:
+                continue
+            del self.leases[chunk_id]
+            chunk = self.chunks.pop(chunk_id)
+            worker = self.workers.get(lease['worker'], {}).get('name', lease['worker'])
+            items = self.state.pending_items(chunk['start'], chunk['end'])
+            if not items:
+                continue
+            self.requeued += 1
+            if len(items) > 1:
+                middle = items[len(items) // 2][0]
+                print(f"WARNING: Lease on chunk {chunk_id} expired ({worker}), "
+                      f"requeued its {len(items)} entries as two chunks")
+                self._add_chunk(middle, chunk['end'], chunk['shard'], front=True)
+                self._add_chunk(chunk['start'], middle, chunk['shard'], front=True)
+            elif chunk['attempts'] + 1 < self.max_attempts:
+                print(f"WARNING: Lease on {items[0][1]} expired ({worker}), retrying")
+                self._add_chunk(chunk['start'], chunk['end'], chunk['shard'], chunk['attempts'] + 1, front=True)
+            else:
+                print(f"WARNING: Giving up on {items[0][1]} after {self.max_attempts} lost leases")
+                error = f'worker lost {self.max_attempts} times'
+                self.state.finish([(items[0][0], 'failed', None, error)], lease['worker'])
+                self.counts['pending'] -= 1
+                self.counts['failed'] += 1
+
+    def commit(self, worker_id, chunk_id, token, outcomes):
+        """Store a chunk's outcomes. Entries already committed are skipped, so this is safe to repeat.
+
+        Raises ValueError for malformed outcomes, before anything is stored.
+        If storing fails, the entries stay pending and the chunk's lease is
+        expired so it is handed out again; the stores replace results by
+        document id, so entries stored before the failure are not indexed twice.
+        """
+        if not isinstance(outcomes, list):
+            raise ValueError('outcomes must be a list')
+        for outcome in outcomes:
+            problem = outcome_problem(outcome)
+            if problem:
+                raise ValueError(problem)
+        with self._commit_lock:
+            fresh_indexes = self.state.pending_among([outcome['index'] for outcome in outcomes])
+            fresh = [outcome for outcome in outcomes if outcome['index'] in fresh_indexes]
+            parsed = [outcome for outcome in fresh if outcome['ok']]
+            try:
+                if parsed:
+                    self.ingest([(o['result']['document_id'], o['text'], o['result'], os.path.basename(o['path']),
+                                  o.get('file_type'), o.get('hints')) for o in parsed])
+            except Exception as e:
+                print(f"WARNING: Storing chunk {chunk_id} failed, requeueing it: {e}")
+                with self._lock:
+                    lease = self.leases.get(chunk_id)
+                    if lease is not None and lease['token'] == token:
+                        # Reaped on the next lease call; heartbeats with the old token now fail
+                        lease['expires'], lease['token'] = 0.0, None
+                raise RuntimeError(f'Storing results failed: {e}') from e
+            self.state.finish([(o['index'], 'done' if o['ok'] else 'failed',
+                                o['result']['document_id'] if o['ok'] else None,
+                                None if o['ok'] else o.get('error')) for o in fresh], worker_id)
+
+        with self._lock:
+            self.counts['pending'] -= len(fresh)
+            self.counts['done'] += len(parsed)
+            self.counts['failed'] += len(fresh) - len(parsed)
+            worker = self.workers.get(worker_id)
+            if worker is not None:
+                worker['last_seen'] = time.monotonic()
+                worker['chunks'] += 1
+                worker['items'] += len(fresh)
+            lease = self.leases.get(chunk_id)
+            if lease is not None and lease['token'] == token:
+                del self.leases[chunk_id]
+                chunk = self.chunks.pop(chunk_id)
+                # Entries the worker did not report go back to the queue
+                if self.state.pending_items(chunk['start'], chunk['end']):
+                    self._add_chunk(chunk['start'], chunk['end'], chunk['shard'], chunk['attempts'], front=True)
+        return {'committed': len(fresh), 'duplicates': len(outcomes) - len(fresh)}
+
+    def finished(self):
+        with self._lock:
+            self.reap()
+            return not self.chunks
+
+    def status(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'counts': dict(self.counts),
+                'chunks_queued': sum(len(shard) for shard in self.shards),
+                'chunks_leased': len(self.leases),
+                'requeued': self.requeued,
+                'shards': [len(shard) for shard in self.shards],
+                'workers': {worker_id: {'name': w['name'], 'shard': w['shard'], 'chunks': w['chunks'],
+                                        'items': w['items'], 'stolen': w['stolen'],
+                                        'idle_seconds': round(now - w['last_seen'], 1)}
+                            for worker_id, w in self.workers.items()},
+            }
+
+
+def create_app(coordinator):
+    """HTTP interface of the coordinator; every call is a JSON POST except /status"""
+    from flask import Flask, jsonify, request
+
+    app = Flask(__name__)
+
+    def json_body(*keys):
+        """The request's JSON object, or None if it is not one or lacks one of ``keys``"""
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or any(key not in body for key in keys):
+            return None
+        return body
+
+    def bad_request(*keys):
+        return jsonify({'error': f"Expected a JSON object with {', '.join(keys)}"}), 400
+
+    @app.route('/register', methods=['POST'])
+    def register():
+        body = json_body() or {}
+        return jsonify(coordinator.register(body.get('name') or request.remote_addr))
+
+    @app.route('/lease', methods=['POST'])
+    def lease():
+        body = json_body('worker_id')
+        if body is None:
+            return bad_request('worker_id')
+        reply = coordinator.lease(body['worker_id'])
+        if reply is None:
+            return jsonify({'error': 'Unknown worker, register again'}), 404
+        return jsonify(reply)
+
+    @app.route('/heartbeat', methods=['POST'])
+    def heartbeat():
+        body = json_body('worker_id', 'chunk_id', 'token')
+        if body is None:
+            return bad_request('worker_id', 'chunk_id', 'token')
+        if not coordinator.heartbeat(body['worker_id'], body['chunk_id'], body['token']):
+            return jsonify({'error': 'Lease lost'}), 409
+        return jsonify({'ok': True})
+
+    @app.route('/commit', methods=['POST'])
+    def commit():
+        body = json_body('worker_id', 'chunk_id', 'token', 'outcomes')
+        if body is None:
+            return bad_request('worker_id', 'chunk_id', 'token', 'outcomes')
+        try:
+            reply = coordinator.commit(body['worker_id'], body['chunk_id'], body['token'], body['outcomes'])
+        except ValueError as e:
+            return jsonify({'error': f'Malformed outcomes: {e}'}), 400
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 500
+        return jsonify(reply)
+
+    @app.route('/status', methods=['GET'])
+    def status():
+        return jsonify(coordinator.status())
+
+    return app
+
+
+def call(base_url, path, payload, timeout=60.0):
+    """POST ``payload`` as JSON; returns (status, reply body)"""
+    request = urllib.request.Request(base_url.rstrip('/') + path, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b'{}')
+        except ValueError:
+            return e.code, {}
+
+
+def call_with_retry(base_url, path, payload):
+    """``call``, retrying while the coordinator is unreachable"""
+    deadline = time.monotonic() + COORDINATOR_RETRY_SECONDS
+    delay = 0.5
+    while True:
+        try:
+            return call(base_url, path, payload)
+        except (urllib.error.URLError, OSError) as e:
+            if time.monotonic() > deadline:
+                raise
+            print(f"WARNING: Coordinator unreachable ({getattr(e, 'reason', e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a chunk's lease alive while the worker processes it"""
+
+    def __init__(self, base_url, worker_id, chunk_id, token, interval):
+        super().__init__(daemon=True)
+        self.payload = {'worker_id': worker_id, 'chunk_id': chunk_id, 'token': token}
+        self.base_url = base_url
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                status, _ = call(self.base_url, '/heartbeat', self.payload, timeout=self.interval)
+            except (urllib.error.URLError, OSError):
+                continue
+            if status == 409:
+                # Another worker may have it now; finishing is still useful,
+                # the commit is idempotent
+                print(f"WARNING: Lease on chunk {self.payload['chunk_id']} was lost")
+                return
+
+
+def register_worker(base_url, name):
+    """Register with the coordinator, waiting for as long as it is unreachable.
+
+    A restarted coordinator resumes its batch, so workers wait for it rather
+    than exit.
+    """
+    while True:
+        try:
+            status, registration = call_with_retry(base_url, '/register', {'name': name})
+        except (urllib.error.URLError, OSError) as e:
+            print(f"WARNING: {name}: coordinator unreachable for {COORDINATOR_RETRY_SECONDS:.0f}s "
+                  f"({getattr(e, 'reason', e)}), still trying")
+            continue
+        if status == 200:
+            return registration
+        print(f"WARNING: {name}: registration failed ({status}: {registration.get('error')}), retrying")
+        time.sleep(WAIT_SECONDS)
+
+
+def run_worker(base_url, name=None, data_dir=None):
+    """Pull chunks from the coordinator until the batch is done; returns entries processed"""
+    from watch_folder import process_file
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    if data_dir:
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            import resume_parser
+        resume_parser.app.config['DATA_DIR'] = data_dir
+    name = name or f'{socket.gethostname()}-{os.getpid()}'
+    registration = None
+    processed = 0
+    while True:
+        if registration is None:
+            registration = register_worker(base_url, name)
+            worker_id = registration['worker_id']
+            profile = registration.get('profile')
+        try:
+            status, reply = call_with_retry(base_url, '/lease', {'worker_id': worker_id})
+        except (urllib.error.URLError, OSError) as e:
+            print(f"WARNING: {name}: coordinator unreachable ({getattr(e, 'reason', e)}), registering again")
+            registration = None
+            continue
+        if status == 404:
+            registration = None
+            continue
+        if status != 200:
+            print(f"WARNING: {name}: lease request failed ({status}: {reply.get('error')}), retrying")
+            time.sleep(WAIT_SECONDS)
+            continue
+        if reply.get('done'):
+            break
+        if 'wait' in reply:
+            time.sleep(reply['wait'])
+            continue
+
+        started = time.monotonic()
+        heartbeat = Heartbeat(base_url, worker_id, reply['chunk_id'], reply['token'],
+                              registration['lease_seconds'] / 3)
+        heartbeat.start()
+        outcomes = []
+        try:
+            for index, path in reply['items']:
+                outcome = process_file(path, profile=profile)
+                outcomes.append({'index': index, 'path': path, 'ok': outcome['ok'], 'result': outcome.get('result'),
+                                 'text': outcome.get('text'), 'hints': outcome.get('hints'),
+                                 'file_type': outcome.get('file_type'), 'error': outcome.get('error')})
+            # Storing a large chunk can outlast the lease, so heartbeats continue until it is committed
+            try:
+                status, committed = call_with_retry(base_url, '/commit', {
+                    'worker_id': worker_id, 'chunk_id': reply['chunk_id'], 'token': reply['token'],
+                    'outcomes': outcomes})
+            except (urllib.error.URLError, OSError) as e:
+                status, committed = None, {'error': f"coordinator unreachable ({getattr(e, 'reason', e)})"}
+                registration = None
+        finally:
+            heartbeat.stopped.set()
+        if status != 200:
+            # Handled as a lost lease: the chunk is dropped here, and the
+            # coordinator hands it out again once the lease expires
+            print(f"WARNING: {name}: commit of chunk {reply['chunk_id']} failed ({status}: {committed.get('error')}), "
+                  f"dropping it as a lost lease")
+            continue
+        processed += len(outcomes)
+        print(f"DEBUG: {name}: chunk {reply['chunk_id']}{' (stolen)' if reply['stolen'] else ''} "
+              f"{len(outcomes)} files in {time.monotonic() - started:.1f}s, {committed['committed']} committed, "
+              f"{committed['duplicates']} already committed")
+    print(f"DEBUG: {name}: batch done, {processed} files processed")
+    return processed
+
+
+def _worker_process(base_url, name, data_dir):
+    run_worker(base_url, name, data_dir)
+
+
+def start_workers(base_url, count, name=None, data_dir=None):
+    """Spawn ``count`` local worker processes"""
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    prefix = name or f'{socket.gethostname()}-worker'
+    for number in range(count):
+        process = context.Process(target=_worker_process, args=(base_url, f'{prefix}{number + 1}', data_dir),
+                                  daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def run_coordinator(args):
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        import resume_parser
+    if args.data_dir:
+        resume_parser.app.config['DATA_DIR'] = os.path.abspath(args.data_dir)
+    if not resume_parser.keyword_profile_exists(args.profile):
+        sys.exit(f"Unknown keyword profile '{args.profile}'")
+
+    state = BatchState(args.state or os.path.abspath(args.manifest) + '.state.db')
+    try:
+        if state.load_manifest(args.manifest):
+            print(f"DEBUG: Loaded manifest {args.manifest} into {state.db_path}")
+        else:
+            print(f"DEBUG: Resuming {args.manifest} from {state.db_path}")
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.retry_failed:
+        print(f"DEBUG: Retrying {state.retry_failed()} failed entries")
+
+    # Not silenced with redirect_stdout: that is process-wide and would
+    # swallow the request threads' output too
+    coordinator = Coordinator(state, resume_parser.ingest_parsed_resumes, chunk_size=args.chunk_size, shards=args.shards,
+                              lease_seconds=args.lease_seconds, max_attempts=args.max_attempts,
+                              profile=args.profile)
+    server = make_server(args.host, args.port, create_app(coordinator), threaded=True)
+    base_url = f'http://{args.host if args.host != "0.0.0.0" else "127.0.0.1"}:{server.server_port}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"DEBUG: Coordinator listening on {base_url}")
+
+    workers = start_workers(base_url, args.local_workers, data_dir=args.data_dir) if args.local_workers else []
+    started = time.monotonic()
+    last_report = 0.0
+    try:
+        while not coordinator.finished():
+            time.sleep(0.5)
+            if time.monotonic() - last_report >= args.report_interval:
+                last_report = time.monotonic()
+                status = coordinator.status()
+                print(f"DEBUG: {status['counts']}, {status['chunks_leased']} chunks leased, "
+                      f"{status['chunks_queued']} queued, {len(status['workers'])} workers, "
+                      f"{status['requeued']} requeued")
+        # Let polling workers see that the batch is done
+        time.sleep(WAIT_SECONDS * 2)
+    finally:
+        server.shutdown()
+        for process in workers:
+            process.join(timeout=WAIT_SECONDS * 2)
+            if process.is_alive():
+                process.terminate()
+
+    status = coordinator.status()
+    print(f"DEBUG: Batch finished in {time.monotonic() - started:.1f}s: {status['counts']}, "
+          f"{status['requeued']} chunks requeued")
+    for worker in status['workers'].values():
+        print(f"  {worker['name']:24} {worker['items']:8} files {worker['chunks']:6} chunks "
+              f"{worker['stolen']:5} stolen")
+    for path, error in state.failures():
+        print(f"WARNING: {path}: {error}")
+    sys.exit(1 if status['counts']['failed'] else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse a manifest of resumes with workers on several machines')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    coordinator = commands.add_parser('coordinator', help='Serve a manifest to workers and store their results')
+    coordinator.add_argument('manifest', help='File with one resume path per line')
+    coordinator.add_argument('--host', default='127.0.0.1', help='Interface to listen on (0.0.0.0 for remote workers)')
+    coordinator.add_argument('--port', type=int, default=DEFAULT_PORT)
+    coordinator.add_argument('--state', help='Progress database (default: <manifest>.state.db); rerun to resume')
+    coordinator.add_argument('--retry-failed', action='store_true', help='Process failed entries again when resuming')
+    coordinator.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    coordinator.add_argument('--shards', type=int, default=DEFAULT_SHARDS)
+    coordinator.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                             help='Seconds without a heartbeat before a chunk is handed to another worker')
+    coordinator.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+    coordinator.add_argument('--profile', help='Keyword profile to parse with')
+    coordinator.add_argument('--local-workers', type=int, default=0, help='Also start this many local workers')
+    coordinator.add_argument('--report-interval', type=float, default=30.0)
+    coordinator.add_argument('--data-dir', help='Data directory (default: the app setting)')
+
+    worker = commands.add_parser('worker', help='Pull chunks from a coordinator until the batch is done')
+    worker.add_argument('url', help='Coordinator URL, e.g. http://host:8765')
+    worker.add_argument('--processes', type=int, default=1, help='Worker processes to run on this machine')
+    worker.add_argument('--name', help='Worker name prefix shown by the coordinator (default: host name)')
+    worker.add_argument('--data-dir', help='Local data directory for the field cache')
+    args = parser.parse_args()
+
+    if args.command == 'coordinator':
+        run_coordinator(args)
+    else:
+        processes = start_workers(args.url, args.processes, args.name, args.data_dir)
+        for process in processes:
+            process.join()
+
+
+if __name__ == '__main__':
+    main()
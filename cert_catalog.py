@@ -0,0 +1,182 @@
+import re
+from array import array
+
+# Built-in catalog used when keywords/cert_aliases.txt is missing, in the same
+# format: id | issuer | canonical name | variant; variant; ...
+DEFAULT_CERTIFICATIONS = """
+aws-ccp | Amazon Web Services | AWS Certified Cloud Practitioner | AWS Cloud Practitioner; CLF-C01; CLF-C02
+aws-saa | Amazon Web Services | AWS Certified Solutions Architect - Associate | AWS Solutions Architect Associate; AWS SAA; SAA-C02; SAA-C03
+aws-sap | Amazon Web Services | AWS Certified Solutions Architect - Professional | AWS Solutions Architect Professional; AWS SAP; SAP-C02
+aws-dva | Amazon Web Services | AWS Certified Developer - Associate | AWS Developer Associate; DVA-C02
+aws-soa | Amazon Web Services | AWS Certified SysOps Administrator - Associate | AWS SysOps Administrator; SOA-C02
+aws-dop | Amazon Web Services | AWS Certified DevOps Engineer - Professional | AWS DevOps Engineer Professional; DOP-C02
+az-900 | Microsoft | Microsoft Certified: Azure Fundamentals | Azure Fundamentals; AZ-900
+az-104 | Microsoft | Microsoft Certified: Azure Administrator Associate | Azure Administrator Associate; AZ-104
+az-204 | Microsoft | Microsoft Certified: Azure Developer Associate | Azure Developer Associate; AZ-204
+az-305 | Microsoft | Microsoft Certified: Azure Solutions Architect Expert | Azure Solutions Architect Expert; AZ-305
+gcp-ace | Google Cloud | Google Cloud Associate Cloud Engineer | Associate Cloud Engineer; GCP ACE
+gcp-pca | Google Cloud | Google Cloud Professional Cloud Architect | Professional Cloud Architect; GCP PCA
+pmp | Project Management Institute | Project Management Professional | PMP
+capm | Project Management Institute | Certified Associate in Project Management | CAPM
+csm | Scrum Alliance | Certified ScrumMaster | Certified Scrum Master; CSM
+psm-1 | Scrum.org | Professional Scrum Master I | PSM I; PSM 1; PSM-I
+cissp | ISC2 | Certified Information Systems Security Professional | CISSP
+cism | ISACA | Certified Information Security Manager | CISM
+cisa | ISACA | Certified Information Systems Auditor | CISA
+ceh | EC-Council | Certified Ethical Hacker | CEH
+comptia-security-plus | CompTIA | CompTIA Security+ | Security+; CompTIA Security Plus; SY0-601; SY0-701
+comptia-network-plus | CompTIA | CompTIA Network+ | Network+; CompTIA Network Plus
+comptia-a-plus | CompTIA | CompTIA A+ | CompTIA A Plus
+ccna | Cisco | Cisco Certified Network Associate | CCNA
+ccnp | Cisco | Cisco Certified Network Professional | CCNP
+cka | Cloud Native Computing Foundation | Certified Kubernetes Administrator | CKA
+ckad | Cloud Native Computing Foundation | Certified Kubernetes Application Developer | CKAD
+terraform-associate | HashiCorp | HashiCorp Certified: Terraform Associate | Terraform Associate
+ocp-java | Oracle | Oracle Certified Professional Java SE Programmer | OCPJP; Oracle Certified Java Programmer
+itil-4-foundation | Axelos | ITIL 4 Foundation | ITIL Foundation; ITIL v4 Foundation
+six-sigma-green-belt | | Six Sigma Green Belt | Lean Six Sigma Green Belt
+cfa | CFA Institute | Chartered Financial Analyst | CFA
+cpa | AICPA | Certified Public Accountant | CPA
+"""
+
+# Issuer guessed from the first word of a cert_keywords.txt entry that has no alias line
+ISSUER_PREFIXES = {
+    'aws': 'Amazon Web Services', 'amazon': 'Amazon Web Services', 'microsoft': 'Microsoft',
+    'azure': 'Microsoft', 'google': 'Google Cloud', 'gcp': 'Google Cloud', 'cisco': 'Cisco',
+    'comptia': 'CompTIA', 'oracle': 'Oracle', 'salesforce': 'Salesforce', 'hashicorp': 'HashiCorp',
+    'pmi': 'Project Management Institute', 'isaca': 'ISACA', 'redhat': 'Red Hat',
+}
+SMALL_WORDS = {'of', 'in', 'and', 'for', 'on', 'the', 'to', 'a', 'an'}
+
+TOKEN_RE = re.compile(r'[A-Za-z0-9+#]+')
+# What may sit between the words of a variant: "Solutions Architect – Associate", "SAA-C03"
+SEPARATOR_CHARS = ' \t\r\n\f\v-–—:,./()&'
+TERMINAL = ''  # Trie key marking the end of a variant (tokens are never empty)
+
+
+def variant_key(text):
+    """Lookup key for a variant or a matched span: its lowercase words, single-spaced"""
+    return ' '.join(token.lower() for token in TOKEN_RE.findall(text))
+
+
+def parse_alias_lines(lines):
+    """Catalog entries from ``id | issuer | name | variant; variant`` lines"""
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) < 3 or not parts[0] or not parts[2]:
+            print(f"WARNING: Skipping malformed certification alias line: '{line}'")
+            continue
+        variants = [v.strip() for v in parts[3].split(';')] if len(parts) > 3 else []
+        entries.append({'id': parts[0].lower(), 'issuer': parts[1] or None, 'name': parts[2],
+                        'variants': [parts[2]] + [v for v in variants if v]})
+    return entries
+
+
+def _display_name(keyword):
+    words = keyword.split()
+    return ' '.join(word if word in SMALL_WORDS else word.upper() if len(word) <= 3 else word.capitalize()
+                    for word in words)
+
+
+class CertificationCatalog:
+    """Canonical certifications and the textual variants that name them.
+
+    Every variant is tokenized into a word trie of plain dicts. Finding all
+    certifications in a document is a single left-to-right scan over its
+    tokens that takes the longest variant starting at each token, and the
+    trie can be stored in and loaded from the keyword snapshot without
+    rebuilding anything. Short all-caps acronyms (PMP, CKA) only match in
+    capitals.
+    """
+
+    def __init__(self, entries):
+        self.entries = {}
+        self._trie = {}  # lowercase token -> child node; TERMINAL -> certification id
+        self._acronyms = {}  # token as written -> certification id
+        for entry in entries:
+            if entry['id'] not in self.entries:
+                self.entries[entry['id']] = {'id': entry['id'], 'name': entry['name'],
+                                             'issuer': entry.get('issuer')}
+            for variant in entry['variants']:
+                tokens = TOKEN_RE.findall(variant)
+                if not tokens:
+                    continue
+                if len(tokens) == 1 and len(variant) <= 5 and variant.isupper():
+                    self._acronyms.setdefault(tokens[0], entry['id'])
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token.lower(), {})
+                node.setdefault(TERMINAL, entry['id'])
+
+    @classmethod
+    def from_keywords(cls, specific_certifications, alias_lines):
+        """Build from alias lines plus cert_keywords.txt entries not already covered by an alias"""
+        entries = parse_alias_lines(alias_lines)
+        known = {variant_key(variant) for entry in entries for variant in entry['variants']}
+        for keyword in specific_certifications:
+            key = variant_key(keyword)
+            if key and key not in known:
+                known.add(key)
+                entries.append({'id': key.replace(' ', '-'), 'name': _display_name(keyword),
+                                'issuer': ISSUER_PREFIXES.get(key.split()[0]), 'variants': [keyword]})
+        return cls(entries)
+
+    def to_table(self):
+        """Plain-data form of the catalog, for the keyword snapshot"""
+        return {'entries': list(self.entries.values()), 'trie': self._trie, 'acronyms': self._acronyms}
+
+    @classmethod
+    def from_table(cls, table):
+        """Rebuild a catalog from ``to_table`` output without re-deriving the trie"""
+        catalog = cls.__new__(cls)
+        catalog.entries = {entry['id']: entry for entry in table['entries']}
+        catalog._trie = table['trie']
+        catalog._acronyms = table['acronyms']
+        return catalog
+
+    def finditer(self, text):
+        """Yield (entry, start, end) for each certification mention in ``text``"""
+        # Token spans only; compact even for megabyte-sized documents
+        starts, ends = array('q'), array('q')
+        for match in TOKEN_RE.finditer(text):
+            starts.append(match.start())
+            ends.append(match.end())
+        count = len(starts)
+        i = 0
+        while i < count:
+            token = text[starts[i]:ends[i]]
+            match_id, match_end = self._acronyms.get(token), i
+            node = self._trie.get(token.lower())
+            j = i
+            while node is not None:
+                if TERMINAL in node:
+                    match_id, match_end = node[TERMINAL], j
+                j += 1
+                # Variants continue only across separator characters
+                if j == count or text[ends[j - 1]:starts[j]].strip(SEPARATOR_CHARS):
+                    break
+                node = node.get(text[starts[j]:ends[j]].lower())
+            if match_id is not None:
+                yield self.entries[match_id], starts[i], ends[match_end]
+                i = match_end + 1
+            else:
+                i += 1
+
+    def find(self, text):
+        """Distinct certifications mentioned in ``text``, in order of first mention"""
+        found = {}
+        for entry, _, _ in self.finditer(text):
+            found.setdefault(entry['id'], entry)
+        return list(found.values())
+
+    def lookup(self, text):
+        """The first certification mentioned in ``text``, or None"""
+        return next((entry for entry, _, _ in self.finditer(text)), None)
+
+    def __len__(self):
+        return len(self.entries)
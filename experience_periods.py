@@ -0,0 +1,68 @@
+from datetime import date
+
+
+def month_index(today=None):
+    today = today or date.today()
+    return today.year * 12 + today.month
+
+
+def label_index(label):
+    """Month index of a 'YYYY' or 'YYYY-MM' timeline label"""
+    year, _, month = label.partition('-')
+    return int(year) * 12 + (int(month) if month else 1)
+
+
+def position_period(start, end, now_index):
+    """(start, end) month indexes of a position; an open ('present') position runs to this month.
+
+    Month-precision ends include their last month; year-only ends don't.
+    """
+    if end == 'present':
+        end_index = now_index + 1
+    else:
+        end_index = label_index(end) + (1 if '-' in end else 0)
+    return label_index(start), end_index
+
+
+def merge_periods(periods):
+    """Merge overlapping (start, end) month-index periods"""
+    merged = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def current_timeline(timeline, today=None):
+    """An experience timeline with the months of open positions and the total brought up to date.
+
+    Stored and cached timelines were computed on the day of parsing; this
+    recomputes what depends on the current date from the start/end labels.
+    """
+    if not timeline or not timeline.get('positions'):
+        return timeline
+    now_index = month_index(today)
+    positions = []
+    periods = []
+    for position in timeline['positions']:
+        start, end = position_period(position['start'], position['end'], now_index)
+        positions.append(dict(position, months=end - start))
+        periods.append((start, end))
+    total_months = sum(end - start for start, end in merge_periods(periods))
+    return dict(timeline, positions=positions, total_years=round(total_months / 12, 1))
+
+
+def open_since(timeline, today=None):
+    """For a timeline with an open position, the month index its total experience counts from.
+
+    While a position is open, the total grows by a month every month, so it
+    equals (this month + 1 - open_since) months at any later date. None when
+    every position has ended.
+    """
+    if not timeline or not any(p['end'] == 'present' for p in timeline.get('positions') or []):
+        return None
+    now_index = month_index(today)
+    periods = [position_period(p['start'], p['end'], now_index) for p in timeline['positions']]
+    return now_index + 1 - sum(end - start for start, end in merge_periods(periods))
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from field_cache import code_fingerprint, file_fingerprint, hints_digest
+from keyword_profiles import profile_keyword_path
+
+SEED_INPUTS = ('text', 'profile', 'hints')  # Provided by the caller rather than computed
+
+
+class ParseCancelled(Exception):
+    """Raised when a parse is aborted before all extractors have finished"""
+
+
+class ExtractorRegistry:
+    """Registry of extractors and the shared intermediates they depend on.
+
+    Every entry declares the named inputs it needs (``text`` and the keyword
+    ``profile`` name are always available) and a rough relative cost used to
+    start expensive work first.
+    Inputs are passed to the function as keyword arguments, so input names
+    must match the function's parameter names. ``keywords`` names the files
+    in ``keywords_dir`` an entry reads (resolved per keyword profile) and
+    ``config`` the settings it reads from the ``config`` mapping given here
+    (the Flask app config); together with its code they make up the entry's
+    version for the field cache. Entries that read ``hints`` also version
+    on the document's hints.
+    """
+
+    def __init__(self, keywords_dir=None, config=None):
+        self.entries = {}
+        self.keywords_dir = keywords_dir
+        self.config = config if config is not None else {}
+
+    def register(self, name, func, inputs=('text',), cost=1, keywords=(), config=()):
+        """Register an extractor whose result ends up in the parse output"""
+        self._add(name, func, inputs, cost, keywords, config, output=True)
+
+    def intermediate(self, name, func, inputs=('text',), cost=1, keywords=(), config=()):
+        """Register a shared intermediate computed once per document"""
+        self._add(name, func, inputs, cost, keywords, config, output=False)
+
+    def _add(self, name, func, inputs, cost, keywords, config, output):
+        if name in SEED_INPUTS or name in self.entries:
+            raise ValueError(f"Extractor '{name}' is already registered")
+        self.entries[name] = {
+            'name': name,
+            'func': func,
+            'inputs': tuple(inputs),
+            'cost': cost,
+            'keywords': tuple(keywords),
+            'config': tuple(config),
+            'output': output,
+            'code_version': None,
+        }
+
+    def version(self, name, profile=None, hints=None):
+        """Hash of an entry's code, keyword files and settings, the versions of its inputs and any hints it reads"""
+        entry = self.entries[name]
+        if entry['code_version'] is None:
+            entry['code_version'] = code_fingerprint(entry['func'])
+        digest = hashlib.sha256(entry['code_version'].encode('ascii'))
+        for filename in entry['keywords']:
+            path = profile_keyword_path(self.keywords_dir or '', filename, profile)
+            digest.update(f"{filename}={file_fingerprint(path)}".encode('utf-8'))
+        for key in entry['config']:
+            digest.update(f"{key}={self.config.get(key)!r}".encode('utf-8'))
+        for inp in entry['inputs']:
+            if inp == 'hints':
+                digest.update(f"hints={hints_digest(hints)}".encode('utf-8'))
+            elif inp not in SEED_INPUTS:
+                digest.update(f"{inp}={self.version(inp, profile, hints)}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def outputs(self):
+        """Names of all registered extractors, in registration order"""
+        return [name for name, entry in self.entries.items() if entry['output']]
+
+    def plan(self, names=None):
+        """Return the entries needed to compute ``names`` (default: all outputs)"""
+        wanted = list(names) if names is not None else self.outputs()
+        needed = {}
+        stack = list(wanted)
+        while stack:
+            name = stack.pop()
+            if name in SEED_INPUTS or name in needed:
+                continue
+            if name not in self.entries:
+                raise ValueError(f"Unknown extractor or input '{name}'")
+            needed[name] = self.entries[name]
+            stack.extend(needed[name]['inputs'])
+        return needed
+
+
+_worker_pools = {}  # max_workers -> ThreadPoolExecutor
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool(max_workers=None):
+    """Return the process-wide extractor thread pool of this size, creating it on first use.
+
+    Pools are never shut down or resized, since other requests may still be
+    submitting to them; a different size gets a pool of its own.
+    """
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    with _worker_pool_lock:
+        pool = _worker_pools.get(max_workers)
+        if pool is None:
+            pool = _worker_pools[max_workers] = ThreadPoolExecutor(max_workers=max_workers,
+                                                                    thread_name_prefix='extractor')
+        return pool
+
+
+def run_extractors(registry, text, names=None, max_workers=None,
+                   cancel_event=None, timeout=None, trace=None, cache=None, profile=None,
+                   hints=None):
+    """Run the registered extractors over ``text`` and return their results.
+
+    Independent extractors run concurrently on a shared thread pool, shared
+    intermediates are computed once, and the most expensive ready entries are
+    started first. If ``cancel_event`` is set or ``timeout`` seconds elapse,
+    only extractors that have not started yet are cancelled (running ones
+    finish in the background) and ``ParseCancelled`` is raised. The /parse
+    endpoint passes no ``cancel_event``, as WSGI gives no reliable signal
+    that the client went away; there only the timeout applies. If a ``trace`` is given, each call is recorded as a span.
+    With a ``cache`` (a FieldCache), outputs cached at their current version
+    are reused and only the rest are computed and then stored. ``profile``
+    names the keyword profile that keyword-based extractors use, and
+    ``hints`` carries contact details read from the file's link targets and
+    metadata (None for plain text); fields computed from hints are cached
+    per hints, as their versions include them.
+    """
+    wanted = list(names) if names is not None else registry.outputs()
+    values = {'text': text, 'profile': profile, 'hints': hints}
+    if cache is not None:
+        text_key = cache.text_key(text)
+        versions = {name: registry.version(name, profile, hints) for name in wanted}
+        values.update(cache.get(text_key, versions))
+        print(f"DEBUG: Field cache hits for {len(values) - len(SEED_INPUTS)} of {len(wanted)} extractors")
+    needed = registry.plan([name for name in wanted if name not in values])
+    pending = dict(needed)
+    running = {}
+    pool = get_worker_pool(max_workers)
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def cancel_running(reason):
+        for future in running:
+            future.cancel()
+        print(f"DEBUG: Extraction cancelled ({reason}), {len(pending) + len(running)} extractors not completed")
+        raise ParseCancelled(reason)
+
+    try:
+        while pending or running:
+            if cancel_event is not None and cancel_event.is_set():
+                cancel_running('request aborted')
+            if deadline is not None and time.monotonic() > deadline:
+                cancel_running(f'timed out after {timeout}s')
+
+            ready = [entry for entry in pending.values()
+                     if all(inp in values for inp in entry['inputs'])]
+            for entry in sorted(ready, key=lambda e: e['cost'], reverse=True):
+                del pending[entry['name']]
+                kwargs = {inp: values[inp] for inp in entry['inputs']}
+                func = entry['func'] if trace is None else trace.wrap(f"extractor.{entry['name']}", entry['func'])
+                running[pool.submit(func, **kwargs)] = entry['name']
+
+            if not running:
+                raise ValueError(f"Unresolvable extractor inputs for {sorted(pending)}")
+
+            done, _ = wait(running, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                values[name] = future.result()
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
+
+    if cache is not None:
+        cache.put(text_key, {name: (versions[name], values[name]) for name in wanted if name in needed})
+    return {name: values[name] for name in wanted}
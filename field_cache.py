@@ -0,0 +1,186 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+
+from near_duplicate import text_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    text_key TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value_json TEXT NOT NULL,
+    cached_at TEXT NOT NULL,
+    PRIMARY KEY (text_key, extractor)
+) WITHOUT ROWID;
+"""
+
+_SIMPLE_TYPES = (str, bytes, int, float, bool, tuple, list, dict)
+_file_hashes = {}  # path -> ((size, mtime_ns), content hash)
+_file_hashes_lock = threading.Lock()
+
+
+def file_fingerprint(path):
+    """Content hash of a file, re-read only when its size or mtime changes"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return 'missing'
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, 'rb') as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[path] = (signature, content_hash)
+    return content_hash
+
+
+def hints_digest(hints):
+    """Short hash of a document's link and metadata hints; empty when there are none"""
+    if not hints or not any(hints.values()):
+        return ''
+    return hashlib.sha256(json.dumps(hints, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _code_names(code):
+    """Global names referenced by a code object and the code nested in it"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _is_local(obj, directory):
+    module = sys.modules.get(getattr(obj, '__module__', None))
+    source = getattr(module, '__file__', None)
+    return source is not None and os.path.dirname(os.path.abspath(source)) == directory
+
+
+def code_fingerprint(func):
+    """Hash of a function's source plus the project code and constants it uses.
+
+    Functions and classes referenced by name that live in the same directory
+    are followed recursively; module-level constants (UPPER_CASE names) they
+    reference are hashed by value. Other globals are runtime state, and
+    library code is not included.
+    """
+    directory = os.path.dirname(os.path.abspath(inspect.getsourcefile(func)))
+    digest = hashlib.sha256()
+    seen = set()
+    stack = [func]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        try:
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(obj.__qualname__.encode('utf-8'))
+        if inspect.isclass(obj):
+            namespace = vars(sys.modules[obj.__module__])
+            functions = [getattr(member, '__func__', member) for member in vars(obj).values()]
+            names = set()
+            for member in functions:
+                if inspect.isfunction(member):
+                    names |= _code_names(member.__code__)
+        else:
+            namespace = obj.__globals__
+            names = _code_names(obj.__code__)
+        for name in sorted(names):
+            value = namespace.get(name)
+            if inspect.isfunction(value) or inspect.isclass(value):
+                if _is_local(value, directory):
+                    stack.append(value)
+            elif name != name.upper():
+                continue
+            elif isinstance(value, re.Pattern):
+                digest.update(f'{name}={value.pattern!r}/{value.flags}'.encode('utf-8'))
+            elif isinstance(value, (set, frozenset)):
+                digest.update(f'{name}={sorted(map(repr, value))!r}'.encode('utf-8'))
+            elif isinstance(value, _SIMPLE_TYPES):
+                digest.update(f'{name}={value!r}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FieldCache:
+    """Per-field parse results keyed by text, extractor and extractor version.
+
+    The text key is a hash of the text with only line endings and trailing
+    whitespace normalized (not the document id, which also drops case and
+    punctuation that extractors read), so the same resume saved as PDF and
+    as DOCX shares its cached fields when both give the same text. An
+    extractor's version
+    covers its code and the keyword files it reads (see
+    ``ExtractorRegistry.version``), so editing one keyword file only
+    invalidates the fields that depend on it. Each (text, extractor) pair
+    keeps only its latest version.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def text_key(text):
+        return text_hash(text)
+
+    def _versions(self, text_key):
+        return self._connect().execute(
+            'SELECT extractor, version, value_json FROM fields WHERE text_key = ?', (text_key,)).fetchall()
+
+    def get(self, text_key, versions):
+        """Cached values for the extractors in ``versions`` ({name: version}) that are current"""
+        return {extractor: json.loads(value_json) for extractor, version, value_json in self._versions(text_key)
+                if versions.get(extractor) == version}
+
+    def is_current(self, text_key, versions):
+        """True if every extractor in ``versions`` has a cached value at that version"""
+        current = {extractor for extractor, version, _ in self._versions(text_key)
+                   if versions.get(extractor) == version}
+        return current.issuperset(versions)
+
+    def put(self, text_key, fields):
+        """Store {name: (version, value)} for one text, replacing older versions"""
+        if not fields:
+            return
+        cached_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO fields (text_key, extractor, version, value_json, cached_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(text_key, name, version, json.dumps(value), cached_at)
+                 for name, (version, value) in fields.items()])
+
+    def count(self):
+        return self._connect().execute('SELECT count(*) FROM fields').fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+PROFILE_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+def profile_dir(keywords_dir, profile):
+    return os.path.join(keywords_dir, 'profiles', profile)
+
+
+def profile_keyword_path(keywords_dir, filename, profile=None):
+    """A keyword file for a profile: its own copy if it has one, else the base file"""
+    if profile:
+        path = os.path.join(profile_dir(keywords_dir, profile), filename)
+        if os.path.exists(path):
+            return path
+    return os.path.join(keywords_dir, filename)
+
+
+def list_profiles(keywords_dir):
+    directory = os.path.join(keywords_dir, 'profiles')
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory)
+                  if PROFILE_NAME_RE.match(name) and os.path.isdir(os.path.join(directory, name)))
+
+
+def estimate_size(obj):
+    """Approximate bytes held by nested dicts, lists, tuples, sets and strings"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(vars(item))
+    return total
+
+
+class KeywordProfileCache:
+    """LRU of compiled keyword profiles, bounded by their estimated memory.
+
+    ``build(profile)`` compiles a profile; ``get`` rebuilds it only when the
+    caller's ``signature`` (the fingerprints of its keyword files) changes.
+    The least recently used profiles are evicted once the total estimate
+    exceeds ``max_bytes``; the profile just requested is always kept.
+    """
+
+    def __init__(self, build, max_bytes):
+        self.build = build
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # profile -> (signature, compiled, size)
+        self._lock = threading.Lock()
+        self._building = {}  # profile -> lock, so concurrent requests build once
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, profile, signature):
+        with self._lock:
+            cached = self._entries.get(profile)
+            if cached is not None and cached[0] == signature:
+                self._entries.move_to_end(profile)
+                self.hits += 1
+                return cached[1]
+            build_lock = self._building.setdefault(profile, threading.Lock())
+        with build_lock:
+            with self._lock:
+                cached = self._entries.get(profile)
+                if cached is not None and cached[0] == signature:
+                    self._entries.move_to_end(profile)
+                    self.hits += 1
+                    return cached[1]
+            compiled = self.build(profile)
+            size = estimate_size(compiled)
+            with self._lock:
+                self.misses += 1
+                previous = self._entries.pop(profile, None)
+                if previous is not None:
+                    self.bytes -= previous[2]
+                self._entries[profile] = (signature, compiled, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes and len(self._entries) > 1:
+                    evicted, (_, _, evicted_size) = self._entries.popitem(last=False)
+                    self.bytes -= evicted_size
+                    self.evictions += 1
+                    print(f"DEBUG: Evicted keyword profile '{evicted or 'default'}' ({evicted_size} bytes)")
+            return compiled
+
+    def stats(self):
+        with self._lock:
+            return {
+                'profiles': {(name or 'default'): size for name, (_, _, size) in self._entries.items()},
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
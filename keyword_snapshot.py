@@ -0,0 +1,113 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+
+MAGIC = b'RSKW'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHQ32s')  # magic, format version, payload length, payload sha256
+SNAPSHOT_NAME = 'keywords.snapshot'
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is truncated, corrupt or of another format version"""
+
+
+def source_files(keywords_dir, names):
+    """(size, mtime_ns, sha256) per keyword file, or None for files that don't exist"""
+    files = {}
+    for name in names:
+        path = os.path.join(keywords_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+                stat = os.fstat(f.fileno())
+        except FileNotFoundError:
+            files[name] = None
+            continue
+        files[name] = [stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest()]
+    return files
+
+
+def write_snapshot(path, data, keywords_dir, names, code_version):
+    """Write ``data`` (vocabularies and matcher tables) with the state of its sources"""
+    payload = json.dumps({
+        'code_version': code_version,
+        'files': source_files(keywords_dir, names),
+        'data': data,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(payload), hashlib.sha256(payload).digest())
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header + payload)
+    os.replace(tmp_path, path)
+    return len(header) + len(payload)
+
+
+class KeywordSnapshot:
+    """A compiled keyword snapshot, read from disk in one call.
+
+    ``data`` holds whatever the builder stored; ``is_fresh`` says whether the
+    keyword files and the code that built it are still what they were.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            blob = f.read()
+        if len(blob) < HEADER.size:
+            raise SnapshotError('truncated header')
+        magic, version, length, digest = HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise SnapshotError('not a keyword snapshot')
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f'format version {version}, expected {FORMAT_VERSION}')
+        payload = memoryview(blob)[HEADER.size:]
+        if len(payload) != length or hashlib.sha256(payload).digest() != digest:
+            raise SnapshotError('payload is truncated or corrupt')
+        content = json.loads(bytes(payload).decode('utf-8'))
+        self.path = path
+        self.code_version = content['code_version']
+        self.files = content['files']
+        self.data = content['data']
+
+    def stale_reason(self, keywords_dir, code_version):
+        """Why the snapshot no longer matches its sources, or None if it is fresh.
+
+        Files are compared by size and mtime first; only a file whose stat
+        changed is re-hashed, so touching a file without editing it is fine.
+        """
+        if self.code_version != code_version:
+            return 'keyword loading code changed'
+        for name, recorded in self.files.items():
+            path = os.path.join(keywords_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if recorded is not None:
+                    return f'{name} was removed'
+                continue
+            if recorded is None:
+                return f'{name} was added'
+            if [stat.st_size, stat.st_mtime_ns] == recorded[:2]:
+                continue
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != recorded[2]:
+                    return f'{name} changed'
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the keyword files into a binary snapshot')
+    parser.add_argument('--output', help=f'Snapshot path (default: keywords/{SNAPSHOT_NAME})')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import resume_parser
+    path = resume_parser.build_keyword_snapshot(args.output)
+    print(f"DEBUG: Wrote keyword snapshot {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import contextlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CONCURRENCY = '1,4'
+DEFAULT_TIMEOUT = 120.0  # Seconds before a request counts as failed
+DEFAULT_MAX_OUTSTANDING = 256  # Open-loop requests allowed in flight at once
+SERVER_START_TIMEOUT = 60.0
+FILE_TYPES = ('pdf', 'docx', 'txt')
+# The per-client rate limit would throttle a single load generator; a
+# configuration can still set these explicitly
+SERVER_DEFAULTS = {'RATE_LIMIT_PER_MINUTE': 10 ** 9, 'RATE_LIMIT_BURST': 10 ** 9}
+# 'cache' covers both kinds of reuse, so cache=off times parsing even when
+# --requests repeats corpus files
+CONFIG_ALIASES = {'workers': ('EXTRACTOR_WORKERS',), 'cache': ('FIELD_CACHE_ENABLED', 'REUSE_STORED_RESULTS')}
+WARMUP_TEXT = 'Load Test Warmup\nwarmup-{}@example.com\nSkills\nPython, SQL\nEducation\nB.Tech, 2015\n'
+
+
+def parse_value(value):
+    if value.lower() in ('on', 'true', 'yes'):
+        return True
+    if value.lower() in ('off', 'false', 'no'):
+        return False
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def parse_config(spec):
+    """``name:key=value,key=value`` into (name, processes, app config overrides)"""
+    name, _, settings = spec.partition(':') if ':' in spec else (spec, '', spec)
+    processes = 1
+    overrides = {}
+    for setting in filter(None, (part.strip() for part in settings.split(','))):
+        if setting == 'default':
+            continue
+        key, sep, value = setting.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value in configuration '{spec}', got '{setting}'")
+        key = key.strip()
+        if key == 'processes':
+            processes = int(value)
+        else:
+            for config_key in CONFIG_ALIASES.get(key, (key.upper(),)):
+                overrides[config_key] = parse_value(value.strip())
+    return name or 'default', processes, overrides
+
+
+def load_corpus(paths):
+    """(file type, filename, content) for every PDF, DOCX and TXT file under ``paths``"""
+    corpus = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        else:
+            files = [path]
+        for file_path in files:
+            file_type = os.path.splitext(file_path)[1].lstrip('.').lower()
+            if file_type in FILE_TYPES:
+                with open(file_path, 'rb') as f:
+                    corpus.append((file_type, os.path.basename(file_path), f.read()))
+    return corpus
+
+
+def multipart_body(filename, content):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8')
+    body += content + f'\r\n--{boundary}--\r\n'.encode('ascii')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def serve(conn, overrides, data_dir):
+    """Child process: run the app on a free local port and report the port back"""
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull  # DEBUG output of every request
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    import resume_parser
+    from werkzeug.serving import make_server
+    resume_parser.app.config.update(SERVER_DEFAULTS)
+    resume_parser.app.config.update(overrides)
+    resume_parser.app.config['DATA_DIR'] = data_dir
+    server = make_server('127.0.0.1', 0, resume_parser.app, threaded=True)
+    conn.send(server.server_port)
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def running_servers(processes, overrides):
+    """Start ``processes`` app instances sharing a fresh data directory; yields their /parse URLs"""
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as data_dir:
+        children = []
+        try:
+            for _ in range(processes):
+                parent, child = context.Pipe(duplex=False)
+                process = context.Process(target=serve, args=(child, overrides, data_dir), daemon=True)
+                process.start()
+                children.append((process, parent))
+            urls = []
+            for process, parent in children:
+                if not parent.poll(SERVER_START_TIMEOUT):
+                    raise RuntimeError('Server did not start')
+                urls.append(f'http://127.0.0.1:{parent.recv()}/parse')
+            yield urls
+        finally:
+            for process, _ in children:
+                process.terminate()
+                process.join()
+
+
+def send(url, document, timeout, scheduled=None):
+    """POST one document; latency runs from ``scheduled`` when given (open loop)"""
+    file_type, filename, content = document
+    body, content_type = multipart_body(filename, content)
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+    started = time.perf_counter() if scheduled is None else scheduled
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError) as e:
+        status = type(getattr(e, 'reason', e)).__name__
+    return {'file_type': file_type, 'status': status, 'seconds': time.perf_counter() - started,
+            'finished': time.perf_counter()}
+
+
+def warm_up(urls, timeout):
+    """One unique document per server, so keyword loading is not charged to the corpus"""
+    for url in urls:
+        document = ('txt', 'warmup.txt', WARMUP_TEXT.format(uuid.uuid4().hex).encode('utf-8'))
+        send(url, document, timeout)
+
+
+def closed_loop(urls, corpus, concurrency, total, timeout):
+    """``concurrency`` clients, each sending its next document as soon as the last one returns"""
+    results = []
+    next_index = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            result = send(urls[index % len(urls)], corpus[index % len(corpus)], timeout)
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def open_loop(urls, corpus, rate, total, timeout, seed, max_outstanding):
+    """Poisson arrivals at ``rate`` per second, independent of how fast the server answers.
+
+    Latency is measured from each request's scheduled arrival, so time spent
+    waiting for a free client slot counts against the server.
+    """
+    rng = random.Random(seed)
+    with ThreadPoolExecutor(max_workers=max_outstanding) as pool:
+        futures = []
+        due = time.perf_counter()
+        for index in range(total):
+            due += rng.expovariate(rate)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(send, urls[index % len(urls)], corpus[index % len(corpus)], timeout, due))
+        return [future.result() for future in futures]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values), max(1, math.ceil(fraction * len(values)))) - 1]
+
+
+def summarize(results, started):
+    """Latency percentiles (successful requests), docs/sec and error rate"""
+    ok = sorted(r['seconds'] for r in results if r['status'] == 200)
+    elapsed = max((r['finished'] for r in results), default=started) - started
+    errors = Counter(str(r['status']) for r in results if r['status'] != 200)
+    return {
+        'requests': len(results),
+        'docs_per_sec': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'p50': percentile(ok, 0.50),
+        'p95': percentile(ok, 0.95),
+        'p99': percentile(ok, 0.99),
+        'error_rate': sum(errors.values()) / len(results) if results else 0.0,
+        'errors': dict(errors),
+    }
+
+
+def _ms(seconds):
+    return f"{'-':>8}" if seconds is None else f'{seconds * 1000:8.0f}'
+
+
+def format_row(label, summary, width):
+    return (f"  {label:{width}} {summary['requests']:8} {summary['docs_per_sec']:8.2f} "
+            f"{_ms(summary['p50'])} {_ms(summary['p95'])} {_ms(summary['p99'])} {summary['error_rate']:7.1%}")
+
+
+def header(label, width):
+    return f"  {label:{width}} {'requests':>8} {'docs/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a corpus against local /parse servers and report latency and throughput')
+    parser.add_argument('paths', nargs='+', help='Resume files or directories to replay')
+    parser.add_argument('--config', action='append',
+                        help="Server configuration as name:key=value,... (repeatable), e.g. "
+                             "'fast:processes=2,workers=8,cache=off'. Keys: processes, workers, cache, "
+                             "or any app.config key. Default: one 'default' configuration")
+    parser.add_argument('--concurrency', default=None,
+                        help=f'Closed-loop client counts, comma separated (default {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rate', help='Open-loop arrival rates in requests/sec, comma separated')
+    parser.add_argument('--requests', type=int, help='Requests per run (default: one per corpus file)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per request')
+    parser.add_argument('--max-outstanding', type=int, default=DEFAULT_MAX_OUTSTANDING,
+                        help='Open-loop requests allowed in flight')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for open-loop arrival times')
+    parser.add_argument('--json', help='Also write all summaries to this file')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        parser.error('no .pdf, .docx or .txt files found')
+    configs = [parse_config(spec) for spec in (args.config or ['default'])]
+    loads = [('concurrency', int(n)) for n in (args.concurrency or ('' if args.rate else DEFAULT_CONCURRENCY)).split(',') if n]
+    loads += [('rate', float(r)) for r in (args.rate or '').split(',') if r]
+    total = args.requests or len(corpus)
+    print(f"Corpus: {len(corpus)} files ({dict(Counter(file_type for file_type, _, _ in corpus))}), "
+          f"{total} requests per run")
+
+    runs = []
+    for name, processes, overrides in configs:
+        for mode, level in loads:
+            # A fresh server and data directory per run, so stored results don't carry over
+            with running_servers(processes, overrides) as urls:
+                warm_up(urls, args.timeout)
+                started = time.perf_counter()
+                if mode == 'concurrency':
+                    results = closed_loop(urls, corpus, level, total, args.timeout)
+                else:
+                    results = open_loop(urls, corpus, level, total, args.timeout, args.seed, args.max_outstanding)
+            load = f'{level} clients' if mode == 'concurrency' else f'{level:g} req/s'
+            by_type = defaultdict(list)
+            for result in results:
+                by_type[result['file_type']].append(result)
+            run = {'config': name, 'processes': processes, 'overrides': overrides, 'load': load,
+                   'all': summarize(results, started),
+                   'by_type': {file_type: summarize(by_type[file_type], started) for file_type in sorted(by_type)}}
+            runs.append(run)
+
+            print(f"\n{name} ({processes} process{'es' if processes != 1 else ''}"
+                  f"{', ' + ', '.join(f'{k}={v}' for k, v in overrides.items()) if overrides else ''}), {load}:")
+            print(header('file type', 9))
+            print(format_row('all', run['all'], 9))
+            for file_type, summary in run['by_type'].items():
+                print(format_row(file_type, summary, 9))
+            if run['all']['errors']:
+                print(f"  errors by status: {run['all']['errors']}")
+
+    width = max(len(f"{run['config']} @ {run['load']}") for run in runs)
+    print('\nComparison:')
+    print(header('configuration @ load', width))
+    for run in runs:
+        print(format_row(f"{run['config']} @ {run['load']}", run['all'], width))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(runs, f, indent=2)
+        print(f'\nWrote {args.json}')
+
+
+if __name__ == '__main__':
+    main()
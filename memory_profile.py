@@ -0,0 +1,313 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from functools import partial
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extractor_scheduler import SEED_INPUTS, run_extractors
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+MEGABYTE = 1024 * 1024
+DEFAULT_TOP = 15  # Source lines listed in each report
+DEFAULT_FRAMES = 25  # Frames kept per allocation, so library allocations can be traced back to project code
+WATCH_INTERVAL = 0.005  # Seconds between checks for a new allocation high
+WATCH_GROWTH = 1.1  # Traced memory must exceed the last snapshot's by this factor to snapshot again
+WARMUP_TEXT = 'John Smith\njohn.smith@example.com\n+1 415 555 0132\nSkills\nPython, SQL\nEducation\nB.Tech, 2015\n'
+IGNORED_FILES = (tracemalloc.__file__, threading.__file__, '<frozen importlib._bootstrap>',
+                 '<frozen importlib._bootstrap_external>', '<unknown>', '*' + os.path.basename(__file__))
+
+
+def corpus_files(paths, extensions):
+    """(path, file type) for every supported file under the given files and directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            children = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        else:
+            children = [path]
+        for child in children:
+            file_type = os.path.splitext(child)[1].lstrip('.').lower()
+            if file_type in extensions:
+                yield child, file_type
+
+
+def pipeline(registry):
+    """All registry entries, ordered so every entry comes after its inputs"""
+    entries = registry.plan()
+    ordered, available = [], set(SEED_INPUTS)
+    while entries:
+        ready = [entry for entry in entries.values() if all(inp in available for inp in entry['inputs'])]
+        if not ready:
+            raise ValueError(f"Unresolvable extractor inputs for {sorted(entries)}")
+        for entry in ready:
+            ordered.append(entry)
+            available.add(entry['name'])
+            del entries[entry['name']]
+    return ordered
+
+
+def _line_key(traceback):
+    """(allocating line, innermost project line when the allocation happened in a library)"""
+    frames = list(traceback)
+    innermost = frames[-1]
+    project = next((frame for frame in reversed(frames)
+                    if os.path.isabs(frame.filename) and os.path.dirname(frame.filename) == PROJECT_DIR), None)
+    here = f'{innermost.filename}:{innermost.lineno}'
+    via = f'{os.path.basename(project.filename)}:{project.lineno}' if project and project is not innermost else None
+    return here, via
+
+
+def line_sizes(snapshot):
+    """Bytes held per allocating source line in a snapshot"""
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, name) for name in IGNORED_FILES])
+    sizes = defaultdict(int)
+    for stat in snapshot.statistics('traceback'):
+        sizes[_line_key(stat.traceback)] += stat.size
+    return sizes
+
+
+class PeakWatcher:
+    """Snapshots traced memory from a background thread each time it reaches a new high.
+
+    The snapshots themselves are traced allocations, so measure peaks in a
+    separate run; this is only for attributing a peak to source lines.
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self.snapshot = None
+        self.snapshot_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _check(self):
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot is None or current > self.snapshot_bytes * WATCH_GROWTH:
+            self.snapshot = None
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_bytes = current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._check()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._check()
+
+
+def measure(stage, frames, watch=False):
+    """Run ``stage()`` under tracemalloc; returns (result, peak, retained, snapshot, error).
+
+    Tracing restarts for every stage, so peak and retained cover only what
+    the stage itself allocated. ``retained`` is what is still allocated when
+    it returns (its result included) and ``snapshot`` shows where that is,
+    or with ``watch`` where memory was held at the stage's highest point.
+    """
+    gc.collect()
+    tracemalloc.start(frames)
+    result = error = None
+    try:
+        if watch:
+            with PeakWatcher() as watcher:
+                try:
+                    result = stage()
+                except Exception as e:
+                    error = f'{type(e).__name__}: {e}'
+            snapshot = watcher.snapshot
+        else:
+            try:
+                result = stage()
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+        retained, peak = tracemalloc.get_traced_memory()
+        if not watch:
+            snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return result, peak, retained, snapshot, error
+
+
+def run_stages(resume_parser, stages, path, file_type, frames, watch=None):
+    """Extract text and run every extractor in turn, measuring each stage.
+
+    Stage results stay referenced until the document is done, as they do in
+    ``run_extractors``. With ``watch`` naming a stage, only that stage is
+    traced, with a PeakWatcher, and its peak snapshot is returned.
+    """
+    values = {'text': None, 'profile': None, 'hints': resume_parser.new_document_hints()}
+    measurements = []
+    steps = [('extract_text', partial(resume_parser.extract_text, path, file_type, hints=values['hints']), None)]
+    steps += [(entry['name'], entry['func'], entry['inputs']) for entry in stages]
+    for name, func, inputs in steps:
+        if inputs is None:
+            call = func
+        elif any(values.get(inp) is None for inp in inputs if inp not in SEED_INPUTS):
+            measurements.append({'stage': name, 'error': 'input not available'})
+            continue
+        else:
+            call = partial(func, **{inp: values[inp] for inp in inputs})
+        if watch is None or name == watch:
+            result, peak, retained, snapshot, error = measure(call, frames, watch=watch is not None)
+            if watch is not None:
+                return snapshot
+            if name == 'extract_text' and not (result or '').strip():
+                error = error or 'no text extracted'
+            measurements.append({'stage': name, 'peak': peak, 'retained': retained,
+                                 'lines': line_sizes(snapshot), 'error': error})
+        else:
+            try:
+                result = call()
+            except Exception:
+                result = None
+        values['text' if name == 'extract_text' else name] = result
+        if not (values['text'] or '').strip():
+            break
+    return measurements if watch is None else None
+
+
+def document_peak(measurements):
+    """Estimated peak for the whole document if the stages run one after another"""
+    held = peak = 0
+    for m in measurements:
+        if 'peak' in m:
+            peak = max(peak, held + m['peak'])
+            held += m['retained']
+    return peak
+
+
+def _mb(size):
+    return f'{size / MEGABYTE:8.2f}'
+
+
+def print_lines(title, sizes, top):
+    print(f'\n{title}:')
+    for (here, via), size in sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {_mb(size)}MB  {here}" + (f"  (via {via})" if via else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile peak and retained memory of each parse stage over a corpus')
+    parser.add_argument('paths', nargs='+', help='Resume files or directories to profile')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='Source lines to list')
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help='Stack frames stored per allocation')
+    parser.add_argument('--max-peak-mb', type=float,
+                        help='Exit with status 1 if a document is estimated to peak above this')
+    parser.add_argument('--json', help='Also write the full report to this file')
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(devnull):
+        import resume_parser
+        stages = pipeline(resume_parser.EXTRACTOR_REGISTRY)
+        # Keyword lists, compiled matchers and other one-off caches are built
+        # here so that they are not charged to the first document
+        run_extractors(resume_parser.EXTRACTOR_REGISTRY, WARMUP_TEXT)
+
+    files = list(corpus_files(args.paths, resume_parser.ALLOWED_EXTENSIONS))
+    if not files:
+        parser.error('no .pdf, .docx or .txt files found')
+
+    documents = []
+    by_type = defaultdict(lambda: defaultdict(list))  # file type -> stage -> measurements
+    retained_lines = defaultdict(int)  # (stage, line) -> bytes retained, summed over the corpus
+    for path, file_type in files:
+        with contextlib.redirect_stdout(devnull):
+            measurements = run_stages(resume_parser, stages, path, file_type, args.frames)
+        size = os.path.getsize(path)
+        peak = document_peak(measurements)
+        errors = {m['stage']: m['error'] for m in measurements if m.get('error')}
+        documents.append({'path': path, 'file_type': file_type, 'bytes': size, 'document_peak': peak,
+                          'stages': [{key: m.get(key) for key in ('stage', 'peak', 'retained', 'error')}
+                                     for m in measurements],
+                          'errors': errors})
+        for m in measurements:
+            if 'peak' in m:
+                by_type[file_type][m['stage']].append(m)
+                for line, line_size in m.pop('lines').items():
+                    retained_lines[(m['stage'],) + line] += line_size
+        print(f"{file_type:4} {_mb(size)}MB input  {_mb(peak)}MB estimated peak  {path}"
+              + (f"  errors: {errors}" if errors else ''))
+
+    print('\nPer stage and file type (MB: peak max / peak mean / retained max):')
+    file_types = sorted(by_type)
+    print(f"  {'stage':22}" + ''.join(f'{file_type:>32}' for file_type in file_types))
+    for name in ['extract_text'] + [entry['name'] for entry in stages]:
+        cells = []
+        for file_type in file_types:
+            found = by_type[file_type].get(name)
+            if not found:
+                cells.append(f"{'-':>32}")
+                continue
+            peaks = [m['peak'] for m in found]
+            cells.append(f"{_mb(max(peaks))} /{_mb(sum(peaks) / len(peaks))} /{_mb(max(m['retained'] for m in found))}")
+        print(f'  {name:22}' + ''.join(cells))
+
+    print('\nPer document by file type:')
+    summary = {}
+    for file_type in file_types:
+        docs = [doc for doc in documents if doc['file_type'] == file_type]
+        peaks = [doc['document_peak'] for doc in docs]
+        ratio = max(doc['document_peak'] / max(doc['bytes'], 1) for doc in docs)
+        summary[file_type] = {'documents': len(docs), 'peak_max': max(peaks),
+                              'peak_mean': sum(peaks) / len(peaks), 'peak_per_input_byte_max': ratio}
+        print(f"  {file_type:4} {len(docs):5} files  peak max{_mb(max(peaks))}MB  "
+              f"mean{_mb(sum(peaks) / len(peaks))}MB  up to {ratio:.1f}x the input size")
+
+    print_lines('Top retaining lines (memory still held after each stage, summed over the corpus)',
+                {(f'[{stage}] {here}', via): size for (stage, here, via), size in retained_lines.items()},
+                args.top)
+
+    # Attribute the heaviest stage of each file type to source lines at its peak
+    peak_lines = {}
+    for file_type in file_types:
+        heaviest = max((m for found in by_type[file_type].values() for m in found), key=lambda m: m['peak'])
+        doc = next(doc for doc in documents if doc['file_type'] == file_type and any(
+            s['stage'] == heaviest['stage'] and s['peak'] == heaviest['peak'] for s in doc['stages']))
+        with contextlib.redirect_stdout(devnull):
+            snapshot = run_stages(resume_parser, stages, doc['path'], file_type, args.frames, watch=heaviest['stage'])
+        sizes = line_sizes(snapshot) if snapshot is not None else {}
+        peak_lines[file_type] = {'stage': heaviest['stage'], 'path': doc['path'],
+                                 'lines': [{'line': here, 'via': via, 'bytes': size} for (here, via), size in
+                                           sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:args.top]]}
+        print_lines(f"Allocations at the peak of {heaviest['stage']} for {os.path.basename(doc['path'])} ({file_type})",
+                    sizes, args.top)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'documents': documents, 'summary': summary, 'peak_lines': peak_lines,
+                       'retained_lines': [{'stage': stage, 'line': here, 'via': via, 'bytes': size}
+                                          for (stage, here, via), size in sorted(
+                                              retained_lines.items(), key=lambda item: item[1], reverse=True)[:args.top]]},
+                      f, indent=2)
+        print(f'\nWrote {args.json}')
+
+    if resource is not None:
+        # Native allocations (lxml inside python-docx, zlib) are not traced; this includes them
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        print(f'\nProcess peak resident memory, including untraced native allocations: {_mb(max_rss).strip()}MB')
+
+    over = [doc for doc in documents if args.max_peak_mb and doc['document_peak'] > args.max_peak_mb * MEGABYTE]
+    if over:
+        print(f'\n{len(over)} documents above {args.max_peak_mb}MB: {[doc["path"] for doc in over]}')
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+from array import array
+
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16  # 16 bands x 8 rows: candidates above ~0.7 Jaccard similarity
+SHINGLE_SIZE = 5
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 64) - 1
+
+_rng = random.Random(20240611)  # Fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+_NON_WORD_RE = re.compile(r'[^a-z0-9@.+]+')
+_TRAILING_SPACE_RE = re.compile(r'[ \t\f\v]+$', re.MULTILINE)
+
+
+def normalize_text(text):
+    """Normalize extracted text so formatting differences don't affect hashes"""
+    return ' '.join(_NON_WORD_RE.sub(' ', text.lower()).split())
+
+
+def document_id(text):
+    """Content hash of the normalized text, used as the document key"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def text_hash(text):
+    """Content hash of the text as extractors see it.
+
+    Unlike document_id, case, punctuation and line breaks are kept; only line
+    endings and trailing whitespace are normalized.
+    """
+    text = _TRAILING_SPACE_RE.sub('', text.replace('\r\n', '\n').replace('\r', '\n')).strip('\n')
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _shingle_hashes(normalized):
+    """64-bit hashes of the word shingles of a normalized document"""
+    words = normalized.split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {' '.join(words)} if words else set()
+    else:
+        shingles = {' '.join(words[i:i + SHINGLE_SIZE])
+                    for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+            for s in shingles]
+
+
+def minhash_signature(text):
+    """Return the MinHash signature of a document as an array of 64-bit ints"""
+    hashes = _shingle_hashes(normalize_text(text))
+    signature = array('Q')
+    for a, b in _PERMUTATIONS:
+        if hashes:
+            signature.append(min((a * h + b) % MERSENNE_PRIME for h in hashes))
+        else:
+            signature.append(MAX_HASH)
+    return signature
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two documents from their signatures"""
+    matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return matches / len(sig_a)
+
+
+def _band_keys(signature):
+    """Bucket key for every LSH band of a signature"""
+    rows = NUM_PERMUTATIONS // NUM_BANDS
+    keys = []
+    for band in range(NUM_BANDS):
+        chunk = signature[band * rows:(band + 1) * rows].tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        keys.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return keys
+
+
+class NearDuplicateIndex:
+    """On-disk MinHash/LSH index for finding near-duplicate resumes.
+
+    Each document is stored once under its content hash. Lookups only compare
+    signatures of documents that share at least one LSH band bucket, so query
+    cost does not grow with the size of the corpus.
+    """
+
+    def __init__(self, db_path, threshold=0.8):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket);
+        """)
+        self._conn.commit()
+
+    def add(self, doc_id, text=None, signature=None):
+        """Add a document to the index; re-adding an existing id is a no-op"""
+        if signature is None:
+            signature = minhash_signature(text)
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO signatures (doc_id, signature) VALUES (?, ?)',
+                (doc_id, signature.tobytes()))
+            if cursor.rowcount:
+                self._conn.executemany(
+                    'INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)',
+                    [(band, bucket, doc_id) for band, bucket in _band_keys(signature)])
+            self._conn.commit()
+
+    def query(self, text=None, signature=None, threshold=None, exclude=None):
+        """Return [(doc_id, similarity)] of near-duplicates, best match first"""
+        if signature is None:
+            signature = minhash_signature(text)
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            candidates = set()
+            for band, bucket in _band_keys(signature):
+                rows = self._conn.execute(
+                    'SELECT doc_id FROM lsh_buckets WHERE band = ? AND bucket = ?',
+                    (band, bucket)).fetchall()
+                candidates.update(row[0] for row in rows)
+            candidates.discard(exclude)
+
+            matches = []
+            for doc_id in candidates:
+                row = self._conn.execute(
+                    'SELECT signature FROM signatures WHERE doc_id = ?', (doc_id,)).fetchone()
+                similarity = estimate_similarity(signature, array('Q', row[0]))
+                if similarity >= threshold:
+                    matches.append((doc_id, similarity))
+
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def iter_duplicate_groups(self, threshold=None):
+        """Yield groups of near-duplicate doc ids across the whole index.
+
+        Only documents that collide in an LSH bucket are compared, so the
+        corpus is deduplicated without pairwise comparison.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        parent = {}
+
+        def find(doc_id):
+            root = doc_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            parent[doc_id] = root
+            return root
+
+        with self._lock:
+            buckets = self._conn.execute("""
+                SELECT group_concat(doc_id, ' ') FROM lsh_buckets
+                GROUP BY band, bucket HAVING count(*) > 1
+            """).fetchall()
+            signatures = {}
+            for (members,) in buckets:
+                doc_ids = members.split(' ')
+                for doc_id in doc_ids:
+                    if doc_id not in signatures:
+                        row = self._conn.execute(
+                            'SELECT signature FROM signatures WHERE doc_id = ?', (doc_id,)).fetchone()
+                        signatures[doc_id] = array('Q', row[0])
+                for i, first in enumerate(doc_ids):
+                    for other in doc_ids[i + 1:]:
+                        if find(first) != find(other) and \
+                                estimate_similarity(signatures[first], signatures[other]) >= threshold:
+                            parent[find(other)] = find(first)
+
+        groups = {}
+        for doc_id in parent:
+            groups.setdefault(find(doc_id), set()).add(doc_id)
+        for members in groups.values():
+            if len(members) > 1:
+                yield sorted(members)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT count(*) FROM signatures').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,323 @@
+import json
+import os
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from search_index import tokenize
+
+SKILL_WEIGHT = 3.0  # Extracted skills count as this many occurrences of a text term
+COMPACT_EVERY = 1000  # Pending documents before the ingest log is folded into the snapshot
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'in', 'is', 'it', 'of', 'on', 'or', 'our', 'the', 'their', 'to', 'was', 'we',
+    'will', 'with', 'you', 'your', 'i', 'my', 'me', 'this', 'that', 'who'
+}
+
+
+def _skill_values(skills):
+    """Flatten the skills table returned by extract_skills into lowercase names"""
+    if isinstance(skills, dict):
+        values = [skill for group in skills.values() for skill in group]
+    else:
+        values = list(skills or [])
+    return [skill.lower() for skill in values if skill and skill != 'None identified']
+
+
+def term_counts(text, skills=None):
+    """Term frequencies of a document: text tokens plus weighted skill features"""
+    counts = {}
+    for token in tokenize(text or ''):
+        if token not in STOP_WORDS:
+            counts[token] = counts.get(token, 0) + 1
+    for skill in _skill_values(skills):
+        key = f'skill:{skill}'
+        counts[key] = counts.get(key, 0) + SKILL_WEIGHT
+    return counts
+
+
+class RankingEngine:
+    """Sparse TF-IDF index of resumes for ranking against job descriptions.
+
+    Resumes are vectorized once at ingest time (sublinear term frequency) and
+    kept in a CSR snapshot plus an append-only ingest log. Queries use a
+    column-oriented copy of the snapshot, so scoring only touches the columns
+    of terms that occur in the job description; rows ingested since the
+    snapshot are scored from a small matrix of their own.
+
+    Document frequencies are updated on every ingest, so IDF is always
+    current. Document norms are computed with the IDF of the time a row is
+    ingested and recomputed for the whole snapshot at each compaction, which
+    runs on a background thread. Row numbers do not change while the index
+    is loaded: a replaced document's row is masked, emptied at the next
+    compaction and dropped on the next load.
+    """
+
+    def __init__(self, directory, compact_every=COMPACT_EVERY):
+        self.directory = directory
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()  # One compaction at a time
+        self._compacting = False
+        self._vocab = {}
+        self._terms = []  # column -> term
+        self._df = np.zeros(1024, dtype=np.float64)  # Live documents per column
+        self._doc_ids = []  # row -> document id; None for rows emptied by a compaction
+        self._doc_rows = {}  # live document id -> row
+        self._deleted = set()
+        self._base = sp.csr_matrix((0, 0), dtype=np.float32)
+        self._base_csc = self._base.tocsc()
+        self._base_norms = np.ones(0, dtype=np.float32)
+        self._pending = []  # (columns, weights, norm) per row ingested since the snapshot
+        self._pending_matrix = None
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, 'meta.json')
+        self._matrix_path = os.path.join(directory, 'matrix.npz')
+        self._log_path = os.path.join(directory, 'ingest.jsonl')
+        # The log being folded into the snapshot; ingests meanwhile go to a new log
+        self._compacting_log_path = self._log_path + '.compacting'
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self._meta_path) and os.path.exists(self._matrix_path):
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self._terms = meta['vocab']
+            self._vocab = {term: i for i, term in enumerate(self._terms)}
+            self._base = sp.load_npz(self._matrix_path).tocsr()
+            self._doc_ids = meta['doc_ids']
+            if None in self._doc_ids:
+                # Nothing holds row numbers yet, so emptied rows can be dropped
+                keep = [i for i, doc_id in enumerate(self._doc_ids) if doc_id is not None]
+                self._base = self._base[keep]
+                self._doc_ids = [self._doc_ids[i] for i in keep]
+            self._doc_rows = {doc_id: i for i, doc_id in enumerate(self._doc_ids)}
+            self._grow_df()
+            self._df[:self._base.shape[1]] = np.bincount(self._base.indices, minlength=self._base.shape[1])
+            self._base_csc = self._base.tocsc()
+            self._base_norms = self._norms(self._base, self._idf(np.arange(self._base.shape[1])))
+        if os.path.exists(self._compacting_log_path):
+            # A compaction was interrupted: its rows go back in front of the log
+            with open(self._compacting_log_path, 'r', encoding='utf-8') as f:
+                entries = f.read()
+            if os.path.exists(self._log_path):
+                with open(self._log_path, 'r', encoding='utf-8') as f:
+                    entries += f.read()
+            with open(self._log_path, 'w', encoding='utf-8') as f:
+                f.write(entries)
+            os.remove(self._compacting_log_path)
+        if os.path.exists(self._log_path):
+            with open(self._log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        self._append_row(entry['doc_id'], entry['terms'])
+        print(f"DEBUG: Ranking index loaded with {len(self)} documents, {len(self._vocab)} terms")
+
+    def _grow_df(self):
+        if len(self._vocab) > len(self._df):
+            size = max(len(self._vocab), 2 * len(self._df))
+            self._df = np.concatenate([self._df, np.zeros(size - len(self._df))])
+
+    def _idf(self, columns):
+        """Current IDF of ``columns``"""
+        return (np.log((1.0 + len(self)) / (1.0 + self._df[columns])) + 1.0).astype(np.float32)
+
+    @staticmethod
+    def _norms(matrix, idf):
+        """TF-IDF norm of every row of a term-frequency matrix; 1 for empty rows"""
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix) @ (idf[:matrix.shape[1]] ** 2)).ravel())
+        norms[norms == 0] = 1.0
+        return norms.astype(np.float32)
+
+    def _row_columns(self, row):
+        if row < self._base.shape[0]:
+            return self._base.indices[self._base.indptr[row]:self._base.indptr[row + 1]]
+        return self._pending[row - self._base.shape[0]][0]
+
+    def _append_row(self, doc_id, counts):
+        if doc_id in self._doc_rows:
+            old_row = self._doc_rows[doc_id]
+            self._deleted.add(old_row)
+            np.subtract.at(self._df, np.asarray(self._row_columns(old_row), dtype=np.int64), 1)
+        columns = []
+        for term in counts:
+            if term not in self._vocab:
+                self._vocab[term] = len(self._vocab)
+                self._terms.append(term)
+            columns.append(self._vocab[term])
+        self._grow_df()
+        np.add.at(self._df, np.asarray(columns, dtype=np.int64), 1)
+        weights = [1.0 + np.log(count) for count in counts.values()]
+        self._doc_rows[doc_id] = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        norm = float(np.sqrt(np.sum((np.array(weights) * self._idf(columns)) ** 2))) if columns else 0.0
+        self._pending.append((columns, weights, norm or 1.0))
+        self._pending_matrix = None
+
+    def add(self, doc_id, text, skills=None):
+        """Vectorize and ingest one parsed resume (re-adding replaces it)"""
+        self.add_many([(doc_id, text, skills)])
+
+    def add_many(self, documents):
+        """Ingest a batch of (doc_id, text, skills) tuples"""
+        with self._lock:
+            with open(self._log_path, 'a', encoding='utf-8') as log:
+                for doc_id, text, skills in documents:
+                    counts = term_counts(text, skills)
+                    log.write(json.dumps({'doc_id': doc_id, 'terms': counts}) + '\n')
+                    self._append_row(doc_id, counts)
+            if len(self._pending) >= self.compact_every and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self._compact, name='ranking-compact', daemon=True).start()
+
+    @staticmethod
+    def _rows_matrix(rows, vocab_size):
+        """CSR matrix of (columns, weights, norm) rows"""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(columns) for columns, _, _ in rows])
+        indices = np.fromiter((c for columns, _, _ in rows for c in columns),
+                              dtype=np.int32, count=int(indptr[-1]))
+        data = np.fromiter((w for _, weights, _ in rows for w in weights),
+                           dtype=np.float32, count=int(indptr[-1]))
+        return sp.csr_matrix((data, indices, indptr), shape=(len(rows), vocab_size))
+
+    def _compact(self):
+        """Fold pending rows into the on-disk snapshot and empty replaced rows.
+
+        The engine lock is only held to take the snapshot and to swap the
+        result in; rows ingested meanwhile stay pending and are logged anew.
+        """
+        with self._compact_lock:
+            try:
+                with self._lock:
+                    base = self._base
+                    pending = list(self._pending)
+                    deleted = set(self._deleted)
+                    doc_ids = self._doc_ids[:base.shape[0] + len(pending)]
+                    vocab_size = len(self._terms)
+                    idf = self._idf(np.arange(vocab_size))
+                    self._rotate_log()
+
+                base = sp.csr_matrix((base.data, base.indices, base.indptr), shape=(base.shape[0], vocab_size))
+                matrix = sp.vstack([base, self._rows_matrix(pending, vocab_size)], format='csr')
+                if deleted:
+                    live = np.ones(matrix.shape[0], dtype=np.float32)
+                    live[list(deleted)] = 0
+                    matrix = (sp.diags(live) @ matrix).tocsr()
+                    matrix.eliminate_zeros()
+                    doc_ids = [None if i in deleted else doc_id for i, doc_id in enumerate(doc_ids)]
+                matrix = matrix.astype(np.float32)
+
+                tmp_matrix = self._matrix_path + '.tmp.npz'
+                tmp_meta = self._meta_path + '.tmp'
+                sp.save_npz(tmp_matrix, matrix)
+                with open(tmp_meta, 'w', encoding='utf-8') as f:
+                    json.dump({'vocab': self._terms[:vocab_size], 'doc_ids': doc_ids}, f)
+                os.replace(tmp_matrix, self._matrix_path)
+                os.replace(tmp_meta, self._meta_path)
+                if os.path.exists(self._compacting_log_path):
+                    os.remove(self._compacting_log_path)
+                matrix_csc = matrix.tocsc()
+                norms = self._norms(matrix, idf)
+
+                with self._lock:
+                    self._base = matrix
+                    self._base_csc = matrix_csc
+                    self._base_norms = norms
+                    self._pending = self._pending[len(pending):]
+                    self._pending_matrix = None
+                    for row in deleted:
+                        self._doc_ids[row] = None
+                print(f"DEBUG: Ranking index compacted to {matrix.shape[0]} rows, {len(self)} documents")
+            finally:
+                self._compacting = False
+
+    def _rotate_log(self):
+        """Move the ingest log aside for compaction (caller holds the lock)"""
+        if not os.path.exists(self._log_path):
+            return
+        if os.path.exists(self._compacting_log_path):
+            # A failed compaction left its log behind: its rows are folded in too
+            with open(self._log_path, 'r', encoding='utf-8') as src:
+                with open(self._compacting_log_path, 'a', encoding='utf-8') as dst:
+                    dst.write(src.read())
+            os.remove(self._log_path)
+        else:
+            os.replace(self._log_path, self._compacting_log_path)
+
+    def compact(self):
+        """Compact now, on the calling thread"""
+        self._compact()
+
+    def rank(self, job_descriptions, top_k=10, job_skills=None):
+        """Return the top-k resumes for each job description.
+
+        ``job_descriptions`` may be a single string or a list; all of them are
+        scored in one sparse matrix product. ``job_skills`` optionally gives the
+        skills table extracted from each description so skill features match.
+        """
+        if top_k < 1:
+            raise ValueError('top_k must be at least 1')
+        single = isinstance(job_descriptions, str)
+        if single:
+            job_descriptions = [job_descriptions]
+            job_skills = [job_skills]
+        elif job_skills is None:
+            job_skills = [None] * len(job_descriptions)
+
+        with self._lock:
+            if not self._doc_rows:
+                return [] if single else [[] for _ in job_descriptions]
+            rows, columns, counts = [], [], []
+            for q, (text, skills) in enumerate(zip(job_descriptions, job_skills)):
+                for term, count in term_counts(text, skills).items():
+                    column = self._vocab.get(term)
+                    if column is not None:
+                        rows.append(q)
+                        columns.append(column)
+                        counts.append(count)
+            used = np.unique(np.array(columns, dtype=np.int64))
+            used_idf = self._idf(used)
+            vocab_size = len(self._vocab)
+            base_csc, base_norms = self._base_csc, self._base_norms
+            if self._pending_matrix is None:
+                self._pending_matrix = (self._rows_matrix(self._pending, vocab_size).tocsc(),
+                                        np.array([norm for _, _, norm in self._pending], dtype=np.float32))
+            pending, pending_norms = self._pending_matrix
+            deleted = np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))
+            # Rows are only ever appended, so the list can be read after the lock is released
+            doc_ids = self._doc_ids
+
+        idf = used_idf[np.searchsorted(used, columns)]
+        data = (1.0 + np.log(np.array(counts, dtype=np.float32))) * idf
+        queries = sp.csr_matrix((data, (rows, columns)), shape=(len(job_descriptions), vocab_size))
+        query_norms = np.sqrt(np.asarray(queries.multiply(queries).sum(axis=1)).ravel())
+        query_norms[query_norms == 0] = 1.0
+
+        # Only the columns used by some query contribute to the dot products;
+        # each is weighted by its IDF once more for the document side
+        weighted_queries = (queries[:, used] @ sp.diags(used_idf)).T.tocsr()
+        in_base = used < base_csc.shape[1]
+        base_scores = (base_csc[:, used[in_base]] @ weighted_queries[in_base]).toarray()
+        pending_scores = (pending[:, used] @ weighted_queries).toarray()
+        scores = np.vstack([base_scores, pending_scores])
+        scores /= np.concatenate([base_norms, pending_norms])[:, None]
+        scores /= query_norms[None, :]
+        scores[deleted] = 0
+
+        results = []
+        for q in range(len(job_descriptions)):
+            column = scores[:, q]
+            k = min(top_k, len(column))
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([{'document_id': doc_ids[i], 'score': round(float(column[i]), 4)}
+                            for i in top if column[i] > 0])
+        return results[0] if single else results
+
+    def __len__(self):
+        return len(self._doc_rows)
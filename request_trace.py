@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class RequestTrace:
+    """Per-request timing spans, safe to record from extractor worker threads.
+
+    Spans are either explicit (``span`` / ``wrap``) or phases started with
+    ``checkpoint``, which run until the next checkpoint or ``end_phase``; the
+    phase form works inside generators such as the text block iterators.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self._phase = None
+        self._lock = threading.Lock()
+
+    def _record(self, name, start, end):
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'start_ms': round((start - self.started) * 1000, 2),
+                'duration_ms': round((end - start) * 1000, 2),
+            })
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def wrap(self, name, func):
+        """Return ``func`` wrapped so that each call is recorded as a span"""
+        def traced(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return traced
+
+    def checkpoint(self, name):
+        """End the current phase (if any) and start a new one called ``name``"""
+        now = time.perf_counter()
+        with self._lock:
+            previous, self._phase = self._phase, (name, now)
+        if previous is not None:
+            self._record(previous[0], previous[1], now)
+
+    def end_phase(self):
+        with self._lock:
+            previous, self._phase = self._phase, None
+        if previous is not None:
+            self._record(previous[0], previous[1], time.perf_counter())
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Spans in Server-Timing header format, plus the total so far"""
+        with self._lock:
+            spans = list(self.spans)
+        entries = [f"{span['name']};dur={span['duration_ms']}" for span in spans]
+        entries.append(f"total;dur={round(self.elapsed() * 1000, 2)}")
+        return ', '.join(entries)
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['start_ms'])
+        return {'total_ms': round(self.elapsed() * 1000, 2), 'spans': spans}
+
+
+class _NullTrace:
+    """Stand-in used when no trace is being recorded"""
+
+    @contextmanager
+    def span(self, name):
+        yield
+
+    def wrap(self, name, func):
+        return func
+
+    def checkpoint(self, name):
+        pass
+
+    def end_phase(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SlowRequestQuarantine:
+    """Bounded directory of slow inputs kept with their traces for reproduction.
+
+    Each entry is a directory holding a copy of the input and ``trace.json``.
+    Once there are more than ``max_entries`` entries or they take more than
+    ``max_bytes``, the oldest are removed. An input whose content hash is
+    already quarantined is not stored twice.
+    """
+
+    def __init__(self, directory, max_entries=50, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _entries(self):
+        """(name, size_in_bytes) of each entry, oldest first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+                entries.append((entry.name, size))
+        return sorted(entries)
+
+    def keep(self, file_path, filename, trace, **details):
+        """Copy a slow request's input and trace into the quarantine; returns the entry name"""
+        content_hash = file_sha256(file_path)
+        extension = os.path.splitext(filename or '')[1]
+        with self._lock:
+            if any(name.endswith(content_hash[:16]) for name, _ in self._entries()):
+                print(f"DEBUG: Slow input {content_hash[:16]} already quarantined")
+                return None
+            name = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{content_hash[:16]}"
+            # Build the entry under a hidden name so a partial entry is never listed
+            staging = os.path.join(self.directory, '.' + name)
+            os.makedirs(staging)
+            shutil.copyfile(file_path, os.path.join(staging, 'input' + extension))
+            with open(os.path.join(staging, 'trace.json'), 'w', encoding='utf-8') as f:
+                json.dump(dict(details, filename=filename, content_sha256=content_hash,
+                               trace=trace.to_dict()), f, indent=2)
+            os.replace(staging, os.path.join(self.directory, name))
+
+            entries = self._entries()
+            total = sum(size for _, size in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                oldest, size = entries.pop(0)
+                shutil.rmtree(os.path.join(self.directory, oldest), ignore_errors=True)
+                total -= size
+        print(f"DEBUG: Quarantined slow request input as {name}")
+        return name
@@ -0,0 +1,122 @@
+import argparse
+import csv
+import io
+import json
+import os
+
+from result_store import ResultStore, PLACEHOLDERS
+
+EXPORT_COLUMNS = [
+    'document_id', 'name', 'email', 'phone',
+    'technical_skills', 'functional_skills', 'domain_skills',
+    'education', 'certificates', 'experience',
+    'source_file', 'file_type', 'parsed_at'
+]
+SKILL_COLUMNS = {
+    'Technical Skills': 'technical_skills',
+    'Functional Skills': 'functional_skills',
+    'Domain Skills': 'domain_skills',
+}
+LIST_SEPARATOR = '; '
+ROWS_PER_CHUNK = 200  # CSV rows buffered before a chunk is yielded
+
+
+def _values(value):
+    """Flatten a result field into a list of display strings"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [] if value in PLACEHOLDERS else [value]
+    if isinstance(value, dict):
+        return [', '.join(str(v) for v in value.values() if v not in (None, '') and v not in PLACEHOLDERS)]
+    if isinstance(value, (list, tuple)):
+        return [item for nested in value for item in _values(nested)]
+    return [str(value)]
+
+
+def flatten_record(record):
+    """Flatten one stored record into a dict of list/str columns"""
+    result = record['result']
+    skills = result.get('skills') or {}
+    flat = {
+        'document_id': record['document_id'],
+        'name': ''.join(_values(result.get('name'))),
+        'email': _values(result.get('email')),
+        'phone': _values(result.get('phones') or result.get('phone')),
+        'education': _values(result.get('education')),
+        'certificates': _values(result.get('certificates')),
+        'experience': _values(result.get('experience')),
+        'source_file': record.get('source_file') or '',
+        'file_type': record.get('file_type') or '',
+        'parsed_at': record.get('parsed_at') or '',
+    }
+    for category, column in SKILL_COLUMNS.items():
+        flat[column] = _values(skills.get(category))
+    return flat
+
+
+def iter_jsonl(records):
+    """Yield one JSON line per record"""
+    for record in records:
+        yield json.dumps(flatten_record(record), ensure_ascii=False) + '\n'
+
+
+def iter_csv(records):
+    """Yield CSV text in chunks of ROWS_PER_CHUNK rows, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    for record in records:
+        flat = flatten_record(record)
+        writer.writerow([LIST_SEPARATOR.join(flat[column]) if isinstance(flat[column], list) else flat[column]
+                         for column in EXPORT_COLUMNS])
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson'),
+}
+
+
+def iter_export(store, export_format, since=None):
+    """Stream the store's records in the requested format"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{export_format}'")
+    serializer, _ = EXPORT_FORMATS[export_format]
+    return serializer(store.iter_results(since=since))
+
+
+def write_export(store, output_path, export_format, since=None):
+    """Write an export file atomically; returns the number of bytes written"""
+    tmp_path = output_path + '.tmp'
+    written = 0
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_export(store, export_format, since=since):
+            data = chunk.encode('utf-8')
+            f.write(data)
+            written += len(data)
+    os.replace(tmp_path, output_path)
+    print(f"DEBUG: Exported {written} bytes to {output_path}")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export stored parse results as CSV or JSONL')
+    parser.add_argument('output', help='Output file path')
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'results.db'),
+                        help='Path to the result store database')
+    parser.add_argument('--since', help='Only export results parsed at or after this ISO timestamp')
+    args = parser.parse_args()
+    write_export(ResultStore(args.db), args.output, args.format, since=args.since)
+
+
+if __name__ == '__main__':
+    main()
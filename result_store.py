@@ -0,0 +1,387 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from experience_periods import current_timeline, month_index, open_since
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    document_id TEXT NOT NULL UNIQUE,
+    name TEXT,
+    source_file TEXT,
+    file_type TEXT,
+    parsed_at TEXT NOT NULL,
+    experience_years REAL,
+    experience_since INTEGER,
+    fields_version TEXT,
+    text_hash TEXT,
+    result_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS emails (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    email TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS phones (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    phone TEXT NOT NULL,
+    phone_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS education (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    degree TEXT,
+    field TEXT,
+    institution TEXT,
+    year INTEGER,
+    score TEXT
+);
+CREATE TABLE IF NOT EXISTS skills (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    skill_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS certificates (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS certifications (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    cert_id TEXT NOT NULL,
+    issuer TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates (experience_years);
+CREATE INDEX IF NOT EXISTS idx_candidates_experience_since ON candidates (experience_since);
+CREATE INDEX IF NOT EXISTS idx_emails_email ON emails (email);
+CREATE INDEX IF NOT EXISTS idx_emails_candidate ON emails (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_phones_key ON phones (phone_key);
+CREATE INDEX IF NOT EXISTS idx_phones_candidate ON phones (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_education_candidate ON education (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_skills_key ON skills (skill_key, candidate_id);
+CREATE INDEX IF NOT EXISTS idx_skills_candidate ON skills (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_certificates_candidate ON certificates (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_certifications_id ON certifications (cert_id, candidate_id);
+CREATE INDEX IF NOT EXISTS idx_certifications_candidate ON certifications (candidate_id);
+"""
+
+PLACEHOLDERS = ('Not found', 'None identified')
+EDUCATION_COLUMNS = (('degree', 'TEXT'), ('field', 'TEXT'), ('institution', 'TEXT'), ('year', 'INTEGER'),
+                     ('score', 'TEXT'))
+
+
+def phone_key(phone):
+    """Lookup key for a phone number: its last ten digits"""
+    return re.sub(r'\D', '', phone or '')[-10:]
+
+
+def _present(values):
+    """Drop the 'Not found' style placeholders extractors return"""
+    if isinstance(values, str):
+        values = [values]
+    return [value for value in values or [] if value and value not in PLACEHOLDERS]
+
+
+def _education_row(candidate_id, position, record):
+    """Education row from a structured record (or a plain string from older results)"""
+    if isinstance(record, str):
+        return (candidate_id, position, record) + (None,) * len(EDUCATION_COLUMNS)
+    fields = tuple(record.get(name) for name, _ in EDUCATION_COLUMNS)
+    entry = ', '.join(str(value) for value in fields if value is not None)
+    return (candidate_id, position, entry) + fields
+
+
+CHILD_TABLES = ('emails', 'phones', 'education', 'skills', 'certificates', 'certifications')
+
+
+def _collect_child_rows(rows, candidate_id, result):
+    """Append the per-table rows of one result to ``rows`` ({table: [row, ...]})"""
+    for email in _present(result.get('email')):
+        rows['emails'].append((candidate_id, email.lower()))
+    for phone in _present(result.get('phones') or result.get('phone')):
+        rows['phones'].append((candidate_id, phone, phone_key(phone)))
+    for position, entry in enumerate(_present(result.get('education'))):
+        rows['education'].append(_education_row(candidate_id, position, entry))
+    for category, values in (result.get('skills') or {}).items():
+        for skill in _present(values):
+            rows['skills'].append((candidate_id, category, skill, skill.lower()))
+    for position, entry in enumerate(_present(result.get('certificates'))):
+        rows['certificates'].append((candidate_id, position, entry))
+    for entry in _present(result.get('certifications')):
+        rows['certifications'].append((candidate_id, entry['id'], entry.get('issuer')))
+
+
+def _insert_child_rows(conn, rows):
+    conn.executemany('INSERT INTO emails (candidate_id, email) VALUES (?, ?)', rows['emails'])
+    conn.executemany('INSERT INTO phones (candidate_id, phone, phone_key) VALUES (?, ?, ?)', rows['phones'])
+    conn.executemany('INSERT INTO education (candidate_id, position, entry, degree, field, institution, '
+                     'year, score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows['education'])
+    conn.executemany('INSERT INTO skills (candidate_id, category, skill, skill_key) VALUES (?, ?, ?, ?)',
+                     rows['skills'])
+    conn.executemany('INSERT INTO certificates (candidate_id, position, entry) VALUES (?, ?, ?)',
+                     rows['certificates'])
+    conn.executemany('INSERT INTO certifications (candidate_id, cert_id, issuer) VALUES (?, ?, ?)',
+                     rows['certifications'])
+
+
+class ResultStore:
+    """Normalized SQLite store for parse results.
+
+    The full result is kept as JSON on the candidate row so it can be returned
+    as-is, and the searchable fields are split into child tables with indexes
+    for lookups by email, phone and skill. Each thread gets its own
+    connection; WAL mode lets readers run while a batch is being written.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(candidates)')}
+            if columns and 'experience_years' not in columns:
+                conn.execute('ALTER TABLE candidates ADD COLUMN experience_years REAL')
+            if columns and 'fields_version' not in columns:
+                conn.execute('ALTER TABLE candidates ADD COLUMN fields_version TEXT')
+            if columns and 'text_hash' not in columns:
+                conn.execute('ALTER TABLE candidates ADD COLUMN text_hash TEXT')
+            if columns and 'experience_since' not in columns:
+                conn.execute('ALTER TABLE candidates ADD COLUMN experience_since INTEGER')
+                # Results stored before open positions were tracked
+                for row in conn.execute(
+                        "SELECT id, result_json FROM candidates WHERE result_json LIKE '%\"present\"%'").fetchall():
+                    since = open_since(json.loads(row['result_json']).get('experience_timeline'))
+                    if since is not None:
+                        conn.execute('UPDATE candidates SET experience_since = ? WHERE id = ?', (since, row['id']))
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(education)')}
+            for name, column_type in EDUCATION_COLUMNS:
+                if columns and name not in columns:
+                    conn.execute(f'ALTER TABLE education ADD COLUMN {name} {column_type}')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def save_result(self, document_id, result, source_file=None, file_type=None, fields_version=None,
+                    text_hash=None):
+        """Insert or replace one parse result; returns the candidate id.
+
+        ``fields_version`` identifies the extractor versions that produced the
+        result, so a stored result can be checked for staleness later.
+        ``text_hash`` (near_duplicate.text_hash) identifies the exact text it
+        was parsed from, which the document id does not.
+        """
+        return self.save_results([(document_id, result, source_file, file_type, fields_version, text_hash)])[0]
+
+    def save_results(self, batch):
+        """Insert or replace (document_id, result, source_file, file_type, fields_version, text_hash)
+        tuples in one transaction"""
+        conn = self._connect()
+        parsed_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        rows = {table: [] for table in CHILD_TABLES}
+        candidate_ids = []
+        with conn:
+            for document_id, result, source_file, file_type, fields_version, text_hash in batch:
+                name = result.get('name')
+                timeline = result.get('experience_timeline') or {}
+                conn.execute('DELETE FROM candidates WHERE document_id = ?', (document_id,))
+                candidate_id = conn.execute(
+                    'INSERT INTO candidates (document_id, name, source_file, file_type, parsed_at, '
+                    'experience_years, experience_since, fields_version, text_hash, result_json) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (document_id, name if name not in PLACEHOLDERS else None, source_file, file_type,
+                     parsed_at, timeline.get('total_years'), open_since(timeline), fields_version, text_hash,
+                     json.dumps(result))).lastrowid
+                candidate_ids.append(candidate_id)
+                _collect_child_rows(rows, candidate_id, result)
+            _insert_child_rows(conn, rows)
+        print(f"DEBUG: Stored {len(candidate_ids)} parse results")
+        return candidate_ids
+
+    def update_results(self, batch):
+        """Replace the results of already stored documents, keeping their candidate ids.
+
+        ``batch`` holds (document_id, result, fields_version, text_hash)
+        tuples, where a fields_version or text_hash of None keeps the stored
+        one; ids that are not stored are skipped. Returns the number of
+        results updated.
+        """
+        conn = self._connect()
+        parsed_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        rows = {table: [] for table in CHILD_TABLES}
+        updated = 0
+        with conn:
+            for document_id, result, fields_version, text_hash in batch:
+                row = conn.execute('SELECT id FROM candidates WHERE document_id = ?', (document_id,)).fetchone()
+                if row is None:
+                    continue
+                candidate_id = row['id']
+                name = result.get('name')
+                timeline = result.get('experience_timeline') or {}
+                conn.execute(
+                    'UPDATE candidates SET name = ?, parsed_at = ?, experience_years = ?, experience_since = ?, '
+                    'fields_version = coalesce(?, fields_version), text_hash = coalesce(?, text_hash), '
+                    'result_json = ? WHERE id = ?',
+                    (name if name not in PLACEHOLDERS else None, parsed_at, timeline.get('total_years'),
+                     open_since(timeline), fields_version, text_hash, json.dumps(result), candidate_id))
+                for table in CHILD_TABLES:
+                    conn.execute(f'DELETE FROM {table} WHERE candidate_id = ?', (candidate_id,))
+                _collect_child_rows(rows, candidate_id, result)
+                updated += 1
+            _insert_child_rows(conn, rows)
+        print(f"DEBUG: Updated {updated} parse results")
+        return updated
+
+    def _rows_to_results(self, rows):
+        """Records with the experience of open positions brought up to date"""
+        records = []
+        for row in rows:
+            result = json.loads(row['result_json'])
+            experience_years = row['experience_years']
+            if row['experience_since'] is not None:
+                result['experience_timeline'] = current_timeline(result.get('experience_timeline'))
+                experience_years = result['experience_timeline']['total_years']
+            records.append({
+                'candidate_id': row['id'],
+                'document_id': row['document_id'],
+                'source_file': row['source_file'],
+                'file_type': row['file_type'],
+                'parsed_at': row['parsed_at'],
+                'experience_years': experience_years,
+                'fields_version': row['fields_version'],
+                'text_hash': row['text_hash'],
+                'result': result,
+            })
+        return records
+
+    def get(self, document_id):
+        """Return the stored record for a document id, or None"""
+        rows = self._connect().execute(
+            'SELECT * FROM candidates WHERE document_id = ?', (document_id,)).fetchall()
+        results = self._rows_to_results(rows)
+        return results[0] if results else None
+
+    def get_many(self, document_ids):
+        """Return stored records for several document ids, in the order given"""
+        if not document_ids:
+            return []
+        placeholders = ','.join('?' * len(document_ids))
+        rows = self._connect().execute(
+            f'SELECT * FROM candidates WHERE document_id IN ({placeholders})', list(document_ids)).fetchall()
+        by_id = {record['document_id']: record for record in self._rows_to_results(rows)}
+        return [by_id[doc_id] for doc_id in document_ids if doc_id in by_id]
+
+    def find_by_email(self, email, limit=50):
+        rows = self._connect().execute("""
+            SELECT DISTINCT c.* FROM emails e JOIN candidates c ON c.id = e.candidate_id
+            WHERE e.email = ? ORDER BY c.id LIMIT ?
+        """, (email.strip().lower(), limit)).fetchall()
+        return self._rows_to_results(rows)
+
+    def find_by_phone(self, phone, limit=50):
+        key = phone_key(phone)
+        if not key:
+            return []
+        rows = self._connect().execute("""
+            SELECT DISTINCT c.* FROM phones p JOIN candidates c ON c.id = p.candidate_id
+            WHERE p.phone_key = ? ORDER BY c.id LIMIT ?
+        """, (key, limit)).fetchall()
+        return self._rows_to_results(rows)
+
+    def filter_by_skills(self, skills, match='all', limit=50, offset=0):
+        """Candidates having all (or any) of the given skills, case-insensitive"""
+        keys = sorted({skill.strip().lower() for skill in skills if skill.strip()})
+        if not keys:
+            return []
+        placeholders = ','.join('?' * len(keys))
+        having = 'HAVING count(DISTINCT s.skill_key) = ?' if match == 'all' else ''
+        params = keys + ([len(keys)] if match == 'all' else []) + [limit, offset]
+        rows = self._connect().execute(f"""
+            SELECT c.* FROM candidates c JOIN (
+                SELECT s.candidate_id FROM skills s WHERE s.skill_key IN ({placeholders})
+                GROUP BY s.candidate_id {having}
+            ) matched ON matched.candidate_id = c.id
+            ORDER BY c.id LIMIT ? OFFSET ?
+        """, params).fetchall()
+        return self._rows_to_results(rows)
+
+    def filter_by_certification(self, cert_ids, limit=50, offset=0):
+        """Candidates holding any of the given canonical certification ids"""
+        keys = sorted({cert_id.strip().lower() for cert_id in cert_ids if cert_id.strip()})
+        if not keys:
+            return []
+        placeholders = ','.join('?' * len(keys))
+        rows = self._connect().execute(f"""
+            SELECT c.* FROM candidates c WHERE c.id IN (
+                SELECT candidate_id FROM certifications WHERE cert_id IN ({placeholders})
+            ) ORDER BY c.id LIMIT ? OFFSET ?
+        """, keys + [limit, offset]).fetchall()
+        return self._rows_to_results(rows)
+
+    def find_by_experience(self, min_years=None, max_years=None, limit=50, offset=0):
+        """Candidates whose total experience lies in a range, most experienced first.
+
+        Served by two index range scans: experience_years for candidates whose
+        positions have all ended, and experience_since for those with an open
+        position, whose experience keeps growing after parsing.
+        """
+        low = min_years if min_years is not None else 0
+        high = max_years if max_years is not None else 1000
+        months_end = month_index() + 1
+        rows = self._connect().execute("""
+            SELECT * FROM (
+                SELECT *, experience_years AS current_years FROM candidates
+                WHERE experience_years BETWEEN ? AND ? AND experience_since IS NULL
+                UNION ALL
+                SELECT *, round((? - experience_since) / 12.0, 1) AS current_years FROM candidates
+                WHERE experience_since BETWEEN ? AND ?
+            ) ORDER BY current_years DESC, id LIMIT ? OFFSET ?
+        """, (low, high, months_end, months_end - high * 12, months_end - low * 12, limit, offset)).fetchall()
+        return self._rows_to_results(rows)
+
+    def iter_results(self, batch_size=500, since=None):
+        """Yield every stored record in id order without loading them all at once.
+
+        Uses keyset pagination so each batch is an index range scan and memory
+        stays bounded by ``batch_size`` regardless of the store size.
+        """
+        conn = self._connect()
+        last_id = 0
+        while True:
+            if since:
+                rows = conn.execute(
+                    'SELECT * FROM candidates WHERE id > ? AND parsed_at >= ? ORDER BY id LIMIT ?',
+                    (last_id, since, batch_size)).fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT * FROM candidates WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for record in self._rows_to_results(rows):
+                yield record
+            last_id = rows[-1]['id']
+
+    def count(self):
+        return self._connect().execute('SELECT count(*) FROM candidates').fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -1,37 +1,98 @@
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, request, render_template, jsonify, Response, stream_with_context, g
+import hashlib
+import json
 import os
 import re
 import PyPDF2
 from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE
 import tempfile
+import threading
+import time
+from functools import lru_cache, wraps
+from datetime import date
+from itertools import islice
+from urllib.parse import unquote
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
+from extractor_scheduler import ExtractorRegistry, ParseCancelled, run_extractors
+from near_duplicate import NearDuplicateIndex, document_id, minhash_signature, text_hash
+from experience_periods import current_timeline, merge_periods, position_period
+from search_index import SearchIndex, QuerySyntaxError
+from ranking import RankingEngine
+from skill_bitmap import SkillBitmap
+from cert_catalog import DEFAULT_CERTIFICATIONS, CertificationCatalog
+from field_cache import FieldCache, code_fingerprint, file_fingerprint
+from keyword_snapshot import SNAPSHOT_NAME, KeywordSnapshot, SnapshotError, write_snapshot
+from keyword_profiles import KeywordProfileCache, PROFILE_NAME_RE, list_profiles, profile_dir, profile_keyword_path
+from result_store import ResultStore
+from text_store import TextStore
+from result_export import EXPORT_FORMATS, iter_export
+from upload_triage import TriageLog, triage_upload
+from admission import AdmissionController, Overloaded, TokenBucketLimiter
+from request_trace import NULL_TRACE, RequestTrace, SlowRequestQuarantine
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['EXTRACTOR_WORKERS'] = min(8, os.cpu_count() or 1)  # Concurrent extractors per process
+app.config['PARSE_TIMEOUT'] = 60  # Seconds before remaining extractors are cancelled
+app.config['DATA_DIR'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+app.config['NEAR_DUPLICATE_THRESHOLD'] = 0.8  # Estimated Jaccard similarity of normalized text
+app.config['PHONE_DEFAULT_REGION'] = 'US'  # Region assumed for numbers without a country code
+app.config['ADMISSION_MAX_IN_FLIGHT'] = 4  # Concurrent /parse requests per worker process
+app.config['ADMISSION_MAX_QUEUE'] = 16  # Requests allowed to wait for a slot
+app.config['ADMISSION_QUEUE_TIMEOUT'] = 5  # Seconds a request may wait before a 503
+app.config['RATE_LIMIT_PER_MINUTE'] = 60  # Sustained /parse requests per client
+app.config['RATE_LIMIT_BURST'] = 10  # Requests a client may send back to back
+app.config['TRUSTED_PROXY_HOPS'] = 0  # Reverse proxies in front of the app whose X-Forwarded-For is trusted
+app.config['SLOW_REQUEST_SECONDS'] = 5.0  # /parse requests slower than this keep their input and trace
+app.config['QUARANTINE_MAX_ENTRIES'] = 50  # Slow inputs kept before the oldest are removed
+app.config['QUARANTINE_MAX_BYTES'] = 256 * 1024 * 1024
+app.config['FIELD_CACHE_ENABLED'] = True  # Reuse extractor results whose code and keyword files are unchanged
+app.config['REUSE_STORED_RESULTS'] = True  # Answer an upload of already parsed text with its stored result
+app.config['KEYWORD_PROFILE_CACHE_BYTES'] = 64 * 1024 * 1024  # Compiled keyword profiles kept in memory
+app.config['TEXT_STORE_ENABLED'] = True  # Keep extracted text so backfill.py can re-run extractors
+
+if app.config['TRUSTED_PROXY_HOPS']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'])
 
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
 
+KEYWORDS_DIR = os.path.join(os.path.dirname(__file__), 'keywords')
+EDUCATION_KEYWORD_FILES = ('education_keywords.txt',)
+SKILL_KEYWORD_FILES = ('technical_skills.txt', 'functional_skills.txt', 'domain_skills.txt')
+CERTIFICATE_KEYWORD_FILES = ('cert_keywords.txt', 'cert_aliases.txt')
+KEYWORD_FILES = EDUCATION_KEYWORD_FILES + SKILL_KEYWORD_FILES + CERTIFICATE_KEYWORD_FILES
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file with enhanced header detection"""
-    text = ""
+def iter_pdf_pages(file_path, trace=NULL_TRACE, hints=None):
+    """Yield the text of each PDF page lazily, one page in memory at a time.
+
+    With a ``hints`` dict, link targets and the document author are recorded
+    in it as the pages are read.
+    """
     try:
         with open(file_path, 'rb') as file:
+            trace.checkpoint('pdf.open')
             pdf_reader = PyPDF2.PdfReader(file)
+            if hints is not None:
+                add_pdf_metadata_hints(pdf_reader, hints)
             for page_num, page in enumerate(pdf_reader.pages):
+                trace.checkpoint(f'pdf.page{page_num + 1}')
+                if hints is not None:
+                    add_pdf_link_hints(page, hints)
                 page_text = page.extract_text()
                 print(f"DEBUG: Page {page_num + 1} text length: {len(page_text)}")
                 if page_text.strip():
-                    # Split into lines and show first few lines (likely header)
-                    lines = page_text.split('\n')
+                    # Show first few lines (likely header) without splitting the whole page
                     print(f"DEBUG: First 5 lines of page {page_num + 1}:")
-                    for i, line in enumerate(lines[:5]):
+                    for i, line in enumerate(islice(iter_lines(page_text), 5)):
                         if line.strip():
                             print(f"  Line {i+1}: {line.strip()}")
                     
-                    text += page_text + "\n"
+                    yield page_text + "\n"
                 
                 # Try alternative extraction methods if standard method fails
                 if not page_text.strip():
@@ -41,67 +102,78 @@ def extract_text_from_pdf(file_path):
                         if hasattr(page, 'extractText'):
                             alt_text = page.extractText()
                             if alt_text.strip():
-                                text += alt_text + "\n"
                                 print(f"DEBUG: Alternative extraction successful: {len(alt_text)} chars")
+                                yield alt_text + "\n"
                     except:
                         pass
                         
     except Exception as e:
         print(f"Error reading PDF: {e}")
-    
-    print(f"DEBUG: Total PDF text extracted: {len(text)} characters")
-    
-    return text
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file including headers and footers"""
-    text = ""
+def iter_docx_blocks(file_path, trace=NULL_TRACE, hints=None):
+    """Yield DOCX text block by block: headers, paragraphs, footers, then tables.
+
+    With a ``hints`` dict, hyperlink targets and the document author are
+    recorded in it before the first block.
+    """
     try:
+        trace.checkpoint('docx.open')
         doc = Document(file_path)
+        if hints is not None:
+            add_docx_hints(doc, hints)
         
         # Extract text from headers
+        trace.checkpoint('docx.headers')
         for section in doc.sections:
             header = section.header
             for paragraph in header.paragraphs:
                 if paragraph.text.strip():
-                    text += paragraph.text + "\n"
                     print(f"DEBUG: Header text: {paragraph.text}")
+                    yield paragraph.text + "\n"
         
         # Extract text from main document
+        trace.checkpoint('docx.body')
         for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+            yield paragraph.text + "\n"
         
         # Extract text from footers
+        trace.checkpoint('docx.footers')
         for section in doc.sections:
             footer = section.footer
             for paragraph in footer.paragraphs:
                 if paragraph.text.strip():
-                    text += paragraph.text + "\n"
                     print(f"DEBUG: Footer text: {paragraph.text}")
+                    yield paragraph.text + "\n"
         
         # Extract text from tables (if any) with enhanced structure handling
         for table_num, table in enumerate(doc.tables):
+            trace.checkpoint(f'docx.table{table_num + 1}')
             print(f"DEBUG: Processing table {table_num + 1}")
             
             # Try to detect if this is a contact info table or structured resume table
-            table_text = ""
+            table_cells = []
             structured_data = {}
             
-            for row_num, row in enumerate(table.rows):
+            # row.cells rebuilds the whole table's cell grid on every call, which is
+            # quadratic in the number of rows; build the grid once and slice it
+            grid = table._cells
+            column_count = len(table.columns)
+            for row_num in range(len(grid) // column_count if column_count else 0):
                 row_text = []
-                for cell_num, cell in enumerate(row.cells):
+                cells = grid[row_num * column_count:(row_num + 1) * column_count]
+                for cell_num, cell in enumerate(cells):
                     cell_text = cell.text.strip()
                     if cell_text:
                         row_text.append(cell_text)
-                        table_text += cell_text + " "
+                        table_cells.append(cell_text)
                         print(f"DEBUG: Table {table_num + 1}, Row {row_num + 1}, Cell {cell_num + 1}: '{cell_text}'")
                         
                         # Check if this cell contains contact information
                         cell_lower = cell_text.lower()
                         if any(indicator in cell_lower for indicator in ['name', 'email', 'phone', 'contact']):
                             # This might be a label cell, check adjacent cells for values
-                            if cell_num + 1 < len(row.cells):
-                                next_cell = row.cells[cell_num + 1].text.strip()
+                            if cell_num + 1 < len(cells):
+                                next_cell = cells[cell_num + 1].text.strip()
                                 if next_cell:
                                     structured_data[cell_text] = next_cell
                                     print(f"DEBUG: Found structured data - {cell_text}: {next_cell}")
@@ -109,46 +181,163 @@ def extract_text_from_docx(file_path):
                 # Add row as a single line if it has multiple meaningful cells
                 if len(row_text) > 1:
                     combined_row = " | ".join(row_text)
-                    text += combined_row + "\n"
                     print(f"DEBUG: Combined table row: '{combined_row}'")
+                    yield combined_row + "\n"
                 elif len(row_text) == 1:
-                    text += row_text[0] + "\n"
+                    yield row_text[0] + "\n"
             
             # Add structured data to main text with proper labels
             for label, value in structured_data.items():
                 formatted_entry = f"{label}: {value}"
-                text += formatted_entry + "\n"
                 print(f"DEBUG: Added structured entry: '{formatted_entry}'")
+                yield formatted_entry + "\n"
             
             # Add the whole table text as well for fallback parsing
-            if table_text.strip():
-                text += "\n" + table_text.strip() + "\n"
-        
-        print(f"DEBUG: Total DOCX text extracted: {len(text)} characters")
+            if table_cells:
+                yield "\n" + " ".join(table_cells) + "\n"
         
     except Exception as e:
         print(f"Error reading DOCX: {e}")
-    
-    return text
 
-def extract_text_from_txt(file_path):
-    """Extract text from TXT file"""
-    text = ""
+def iter_txt_lines(file_path):
+    """Yield a text file line by line"""
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            text = file.read()
+            for line in file:
+                yield line
     except Exception as e:
         print(f"Error reading TXT: {e}")
-    
+
+def iter_lines(blocks):
+    """Lazily split text (a string or an iterable of blocks) into lines"""
+    if isinstance(blocks, str):
+        blocks = (blocks,)
+    pending = []
+    for block in blocks:
+        start = 0
+        newline = block.find('\n')
+        while newline != -1:
+            pending.append(block[start:newline])
+            yield ''.join(pending)
+            pending = []
+            start = newline + 1
+            newline = block.find('\n', start)
+        if start < len(block):
+            pending.append(block[start:])
+    yield ''.join(pending)
+
+def new_document_hints():
+    """Contact details read from link targets and metadata rather than the text"""
+    return {'emails': [], 'phones': [], 'author': None}
+
+def add_link_hint(hints, uri):
+    """Record a mailto: or tel: link target as an email or phone hint"""
+    scheme, _, target = uri.strip().partition(':')
+    scheme = scheme.lower()
+    # Drop "?subject=..." and ";ext=..." parameters
+    target = unquote(re.split(r'[?;]', target, 1)[0]).strip()
+    if scheme == 'mailto':
+        for address in target.split(','):
+            email = address.strip().lower()
+            if re.fullmatch(EMAIL_ADDRESS, email) and email not in hints['emails']:
+                print(f"DEBUG: Email from mailto link: {email}")
+                hints['emails'].append(email)
+    elif scheme in ('tel', 'callto'):
+        phone = normalize_phone(target, app.config['PHONE_DEFAULT_REGION'])
+        if phone and phone not in hints['phones']:
+            print(f"DEBUG: Phone from tel link: {phone}")
+            hints['phones'].append(phone)
+
+def set_author_hint(hints, author):
+    if author and str(author).strip():
+        hints['author'] = str(author).strip()
+        print(f"DEBUG: Document author metadata: '{hints['author']}'")
+
+def add_pdf_metadata_hints(pdf_reader, hints):
+    """Record the Author entry of the PDF document information"""
+    try:
+        metadata = pdf_reader.metadata
+        if metadata is not None:
+            set_author_hint(hints, metadata.author)
+    except Exception as e:
+        print(f"DEBUG: Could not read PDF metadata: {e}")
+
+def add_pdf_link_hints(page, hints):
+    """Record the URI targets of a PDF page's link annotations"""
+    try:
+        if '/Annots' not in page:
+            return
+        for annotation in page['/Annots']:
+            annotation = annotation.get_object()
+            if annotation.get('/Subtype') != '/Link' or '/A' not in annotation:
+                continue
+            action = annotation['/A']
+            uri = action.get('/URI') if '/URI' in action else None
+            if uri is None:
+                continue
+            uri = uri.get_object()
+            if isinstance(uri, bytes):
+                uri = uri.decode('latin-1')
+            add_link_hint(hints, str(uri))
+    except Exception as e:
+        print(f"DEBUG: Could not read PDF link annotations: {e}")
+
+def add_docx_hints(doc, hints):
+    """Record external hyperlink targets of every DOCX part and the core Author property"""
+    try:
+        set_author_hint(hints, doc.core_properties.author)
+        for part in doc.part.package.iter_parts():
+            for rel in part.rels.values():
+                if rel.reltype == RELATIONSHIP_TYPE.HYPERLINK and rel.is_external:
+                    add_link_hint(hints, rel.target_ref)
+    except Exception as e:
+        print(f"DEBUG: Could not read DOCX hyperlinks: {e}")
+
+def extract_text_from_pdf(file_path, trace=NULL_TRACE, hints=None):
+    """Extract text from PDF file with enhanced header detection"""
+    text = ''.join(iter_pdf_pages(file_path, trace, hints))
+    trace.end_phase()
+    print(f"DEBUG: Total PDF text extracted: {len(text)} characters")
     return text
 
-def extract_email(text):
+def extract_text_from_docx(file_path, trace=NULL_TRACE, hints=None):
+    """Extract text from DOCX file including headers and footers"""
+    text = ''.join(iter_docx_blocks(file_path, trace, hints))
+    trace.end_phase()
+    print(f"DEBUG: Total DOCX text extracted: {len(text)} characters")
+    return text
+
+def extract_text_from_txt(file_path, trace=NULL_TRACE):
+    """Extract text from TXT file"""
+    with trace.span('txt.read'):
+        return ''.join(iter_txt_lines(file_path))
+
+# Email address parts with their RFC length limits. Bounded runs, and only
+# starting an unprefixed local part at the beginning of a word, keep every
+# email pattern linear on long lines that contain no '@'.
+EMAIL_LOCAL = r'[a-zA-Z0-9._%+-]{1,64}'
+EMAIL_ADDRESS = EMAIL_LOCAL + r'@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,}'
+EMAIL_START = r'(?<![a-zA-Z0-9._%+-])'
+
+def extract_email(text, lines=None, hints=None):
     """Extract email addresses from text, including hyperlinked emails"""
+    if lines is None:
+        lines = text.split('\n')
+    # A mailto: link target is trusted when its address also heads the resume;
+    # links further down may be a referee's or a former employer's
+    if hints and hints.get('emails'):
+        header = header_text(lines).lower()
+        shown = [email for email in hints['emails'] if email.lower() in header]
+        if shown:
+            email = min(shown, key=lambda email: header.find(email.lower()))
+            print(f"DEBUG: Returning email from link target: {email}")
+            return email
+        print(f"DEBUG: Link target emails {hints['emails']} not found near the top of the text")
+    
     print(f"DEBUG: Raw text length: {len(text)}")
     print(f"DEBUG: First 200 chars: {repr(text[:200])}")  # Show actual characters including special ones
     
     # Show all lines that contain common email indicators
-    lines = text.split('\n')
     for i, line in enumerate(lines):
         if any(indicator in line.lower() for indicator in ['@', 'mail', 'skype']):
             print(f"DEBUG: Line {i+1}: {repr(line)}")
@@ -156,17 +345,17 @@ def extract_email(text):
     # Enhanced patterns to handle hyperlinked emails and various formats
     hyperlink_patterns = [
         # HTML-style links: <a href="mailto:email@domain.com">email@domain.com</a>
-        r'<a\s+[^>]*href\s*=\s*["\']?mailto:([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})["\']?[^>]*>.*?</a>',
+        r'<a\s+[^>]{0,1000}href\s*=\s*["\']?mailto:(' + EMAIL_ADDRESS + r')["\']?[^>]{0,1000}>.{0,1000}?</a>',
         # Markdown-style links: [email@domain.com](mailto:email@domain.com)
-        r'\[([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\]\s*\(\s*mailto:[^)]+\)',
+        r'\[(' + EMAIL_ADDRESS + r')\]\s*\(\s*mailto:[^)]+\)',
         # Simple mailto links: mailto:email@domain.com
-        r'mailto\s*:\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        r'mailto\s*:\s*(' + EMAIL_ADDRESS + ')',
         # Underlined or styled emails (often appear as _email@domain.com_ or similar)
-        r'[_*]([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})[_*]',
+        r'[_*](' + EMAIL_ADDRESS + ')[_*]',
         # Emails wrapped in angle brackets: <email@domain.com>
-        r'<([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})>',
+        r'<(' + EMAIL_ADDRESS + ')>',
         # Emails with various separators/decorators
-        r'[\[\(\{]([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})[\]\)\}]',
+        r'[\[\(\{](' + EMAIL_ADDRESS + r')[\]\)\}]',
     ]
     
     # First, try to extract emails from hyperlink patterns
@@ -183,9 +372,9 @@ def extract_email(text):
     # Most aggressive email search - find ANY email pattern (with multiple attempts)
     # Try multiple regex patterns with different levels of strictness
     email_patterns = [
-        r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # Standard pattern
-        r'[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\s*\.\s*[a-zA-Z]{2,}',  # With optional whitespace
-        r'[a-zA-Z0-9._%-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,4}',  # Slightly different character set
+        EMAIL_START + EMAIL_ADDRESS,  # Standard pattern
+        EMAIL_START + EMAIL_LOCAL + r'\s*@\s*[a-zA-Z0-9.-]{1,255}\s*\.\s*[a-zA-Z]{2,}',  # With optional whitespace
+        r'(?<![a-zA-Z0-9._%-])[a-zA-Z0-9._%-]{1,64}@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,4}',  # Slightly different character set
     ]
     
     for pattern in email_patterns:
@@ -232,7 +421,7 @@ def extract_email(text):
     
     # Look for emails again in the cleaned text
     if cleaned_text != text:
-        cleaned_emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', cleaned_text, re.IGNORECASE)
+        cleaned_emails = re.findall(EMAIL_START + EMAIL_ADDRESS, cleaned_text, re.IGNORECASE)
         print(f"DEBUG: Emails found in cleaned text: {cleaned_emails}")
         if cleaned_emails:
             for email in cleaned_emails:
@@ -243,10 +432,10 @@ def extract_email(text):
     
     # Look for table-formatted contact information (common in structured resumes)
     table_patterns = [
-        r'\|\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\s*\|',  # Email between table separators
-        r'email\s*[\|:]\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',  # Email after "Email |" or "Email:"
-        r'contact\s*[\|:]\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',  # Email after "Contact |"
-        r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\s*\|',  # Email before table separator
+        r'\|\s*(' + EMAIL_ADDRESS + r')\s*\|',  # Email between table separators
+        r'email\s*[\|:]\s*(' + EMAIL_ADDRESS + ')',  # Email after "Email |" or "Email:"
+        r'contact\s*[\|:]\s*(' + EMAIL_ADDRESS + ')',  # Email after "Contact |"
+        EMAIL_START + '(' + EMAIL_ADDRESS + r')\s*\|',  # Email before table separator
     ]
     
     for pattern in table_patterns:
@@ -259,16 +448,16 @@ def extract_email(text):
     # Look for emails after specific labels (including enhanced hyperlink patterns)
     label_patterns = [
         # Standard label patterns
-        r'mailto\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'mail\s*to\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'mailid\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'skypeid\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'skype\s*id\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'email\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        r'mailto\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'mail\s*to\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'mailid\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'skypeid\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'skype\s*id\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'email\s*:?\s*(' + EMAIL_ADDRESS + ')',
         # Enhanced patterns for emails that might be linked or formatted
-        r'e[\-\s]*mail\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'email\s*address\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'contact\s*email\s*:?\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        r'e[\-\s]*mail\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'email\s*address\s*:?\s*(' + EMAIL_ADDRESS + ')',
+        r'contact\s*email\s*:?\s*(' + EMAIL_ADDRESS + ')',
     ]
     
     for pattern in label_patterns:
@@ -290,7 +479,7 @@ def extract_email(text):
             continue
             
         # Check for email patterns in this line
-        email_in_line = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', line_clean, re.IGNORECASE)
+        email_in_line = re.search(EMAIL_START + '(' + EMAIL_ADDRESS + ')', line_clean, re.IGNORECASE)
         if email_in_line:
             email = email_in_line.group(1).strip().lower()
             print(f"DEBUG: Found email in cleaned line {i+1}: '{email}' from line: '{line_clean}'")
@@ -303,64 +492,167 @@ def extract_email(text):
             continue
             
         # Check for email patterns in this line
-        email_in_line = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', line_clean, re.IGNORECASE)
+        email_in_line = re.search(EMAIL_START + '(' + EMAIL_ADDRESS + ')', line_clean, re.IGNORECASE)
         if email_in_line:
             email = email_in_line.group(1).strip().lower()
             print(f"DEBUG: Found email in original line {i+1}: '{email}' from line: '{line_clean}'")
             return email
     
+    # No address in the text at all, so the link was behind text such as "Email me"
+    if hints and hints.get('emails'):
+        print(f"DEBUG: Returning email from link target: {hints['emails'][0]}")
+        return hints['emails'][0]
     print("DEBUG: No email found anywhere")
     return "Not found"
 
-def extract_phone(text):
-    """Extract phone numbers from text"""
-    phone_patterns = [
-        r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b',
-        r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
-        r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}',
-        r'\+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',  # International format
-        r'Phone\s*:?\s*([+]?[\d\s\-\(\)\.]{10,})',  # After "Phone:" label
-        r'Tel\s*:?\s*([+]?[\d\s\-\(\)\.]{10,})',    # After "Tel:" label
-        r'Mobile\s*:?\s*([+]?[\d\s\-\(\)\.]{10,})',  # After "Mobile:" label
-        r'Cell\s*:?\s*([+]?[\d\s\-\(\)\.]{10,})',   # After "Cell:" label
-    ]
-    
-    # Clean text for better matching
-    text_cleaned = text.replace('\n', ' ').replace('\r', ' ')
-    
-    for pattern in phone_patterns:
-        phones = re.findall(pattern, text_cleaned, re.IGNORECASE)
-        if phones:
-            phone = phones[0]
-            if isinstance(phone, tuple):
-                # Format as (XXX) XXX-XXXX
-                return f"({phone[0]}) {phone[1]}-{phone[2]}"
-            else:
-                # Clean and format the phone number
-                cleaned = re.sub(r'[^\d+]', '', str(phone))
-                if len(cleaned) >= 10:
-                    if cleaned.startswith('+1'):
-                        cleaned = cleaned[2:]
-                    elif cleaned.startswith('1') and len(cleaned) == 11:
-                        cleaned = cleaned[1:]
-                    
-                    if len(cleaned) == 10:
-                        return f"({cleaned[:3]}) {cleaned[3:6]}-{cleaned[6:]}"
-                    else:
-                        return phone  # Return as-is if not standard format
-    
-    # Look for phone-like patterns line by line
-    lines = text.split('\n')
-    for line in lines:
-        # Look for sequences of digits that could be phone numbers
-        digits_only = re.sub(r'[^\d]', '', line)
-        if len(digits_only) == 10:
-            return f"({digits_only[:3]}) {digits_only[3:6]}-{digits_only[6:]}"
-        elif len(digits_only) == 11 and digits_only.startswith('1'):
-            cleaned = digits_only[1:]
-            return f"({cleaned[:3]}) {cleaned[3:6]}-{cleaned[6:]}"
-    
-    return "Not found"
+# Calling code, national trunk prefix and valid national number lengths per region
+PHONE_REGIONS = {
+    'US': ('1', None, {10}),
+    'CA': ('1', None, {10}),
+    'IN': ('91', '0', {10}),
+    'GB': ('44', '0', {9, 10}),
+    'AU': ('61', '0', {9}),
+    'NZ': ('64', '0', {8, 9, 10}),
+    'IE': ('353', '0', {7, 8, 9}),
+    'DE': ('49', '0', {6, 7, 8, 9, 10, 11}),
+    'FR': ('33', '0', {9}),
+    'SG': ('65', None, {8}),
+    'AE': ('971', '0', {8, 9}),
+    'ZA': ('27', '0', {9}),
+}
+PHONE_COUNTRY_CODES = {}
+for _code, _trunk, _lengths in PHONE_REGIONS.values():
+    _known = PHONE_COUNTRY_CODES.setdefault(_code, (_trunk, set()))
+    _known[1].update(_lengths)
+
+MAX_PHONE_CANDIDATES = 50  # Bounds the per-document cost on digit-heavy input
+PHONE_LABEL_WINDOW = 40  # Characters after a label within which a number counts as labelled
+
+# One scanner for labels and number candidates. The number body is a bounded
+# run of digits and separators (never two blanks in a row) on a single line,
+# so every character has one way to match and scanning stays linear.
+PHONE_SCANNER = re.compile(r"""
+    (?P<label>\b(?:mobile|mob|cell(?:phone)?|tel(?:ephone)?|phone|ph|contact|whatsapp)\b)
+  | (?P<fax>\bfax\b)
+  | (?P<number>(?<![\w+])(?:\+|\b00)?\(?\d(?:[\d().\-]|[ \t](?![ \t])){5,20}\d(?!\w))
+""", re.IGNORECASE | re.VERBOSE)
+PHONE_NOT_NUMBER_RE = re.compile(
+    r'^(?:(?:19|20)\d{2}\s*[-.]\s*(?:19|20)\d{2}|\d{1,2}[.\-]\d{1,2}[.\-]\d{2,4}|\d{4}[.\-]\d{1,2}[.\-]\d{1,2})$')
+
+def normalize_phone(raw, default_region='US'):
+    """Normalize a phone number to E.164, or return None if it isn't plausible"""
+    digits = re.sub(r'\D', '', raw)
+    stripped = raw.lstrip('( ')
+    
+    if stripped.startswith('+') or stripped.startswith('00'):
+        international = digits[2:] if not stripped.startswith('+') else digits
+        for length in (3, 2, 1):
+            code = international[:length]
+            if code in PHONE_COUNTRY_CODES:
+                trunk, lengths = PHONE_COUNTRY_CODES[code]
+                national = international[length:]
+                # "+44 (0) 7700 900123" style numbers repeat the trunk prefix
+                if trunk and national.startswith(trunk) and len(national) - 1 in lengths:
+                    national = national[1:]
+                return f"+{code}{national}" if len(national) in lengths else None
+        return f"+{international}" if 8 <= len(international) <= 15 else None
+    
+    code, trunk, lengths = PHONE_REGIONS.get(default_region.upper(), PHONE_REGIONS['US'])
+    national = digits
+    if trunk and national.startswith(trunk) and len(national) - 1 in lengths:
+        national = national[1:]
+    if len(national) in lengths:
+        return f"+{code}{national}"
+    
+    # Number written with a country code but without the leading '+'
+    if len(digits) > max(lengths):
+        for other_code, (_, other_lengths) in PHONE_COUNTRY_CODES.items():
+            if digits.startswith(other_code) and len(digits) - len(other_code) in other_lengths:
+                return f"+{digits}"
+    return None
+
+def phones_in(text, default_region):
+    """E.164 form of every plausible number written in ``text``"""
+    phones = set()
+    for match in PHONE_SCANNER.finditer(text):
+        if match.lastgroup != 'number':
+            continue
+        raw = match.group('number').strip()
+        phones.update(normalize_phone(part, default_region) for part in [raw] + raw.split())
+    phones.discard(None)
+    return phones
+
+def extract_phone(text, lines=None, default_region=None, hints=None):
+    """Extract phone numbers from text as a ranked list of E.164 numbers"""
+    if default_region is None:
+        default_region = app.config['PHONE_DEFAULT_REGION']
+    if lines is None:
+        lines = text.split('\n')
+    # tel: link targets, in document order, are trusted when the number also
+    # heads the resume; links further down may be a referee's or an employer's
+    if hints and hints.get('phones'):
+        shown = phones_in(header_text(lines), default_region)
+        linked = [phone for phone in hints['phones'] if phone in shown]
+        if linked:
+            print(f"DEBUG: Returning phones from link targets: {linked}")
+            return linked
+        print(f"DEBUG: Link target phones {hints['phones']} not found near the top of the text")
+    
+    candidates = {}
+    last_label_end = None
+    last_label_is_fax = False
+    numbers_seen = 0
+    
+    for match in PHONE_SCANNER.finditer(text):
+        if match.lastgroup in ('label', 'fax'):
+            last_label_end = match.end()
+            last_label_is_fax = match.lastgroup == 'fax'
+            continue
+        
+        numbers_seen += 1
+        if numbers_seen > MAX_PHONE_CANDIDATES:
+            print(f"DEBUG: Phone candidate limit reached ({MAX_PHONE_CANDIDATES}), stopping scan")
+            break
+        
+        raw = match.group('number').strip()
+        if PHONE_NOT_NUMBER_RE.match(raw):
+            continue
+        phone = normalize_phone(raw, default_region)
+        if phone is None and len(re.sub(r'\D', '', raw)) > 15:
+            # Two numbers separated by a single blank ("Tel 555 1234 Mobile ...")
+            parts = [normalize_phone(part, default_region) for part in raw.split()]
+            phone = next((part for part in parts if part), None)
+        if phone is None:
+            continue
+        
+        score = 10
+        if raw.startswith('+'):
+            score += 15
+        # Prefer numbers right after a Mobile/Tel/Cell label on the same line
+        if last_label_end is not None:
+            gap = text[last_label_end:match.start()]
+            if len(gap) <= PHONE_LABEL_WINDOW and '\n' not in gap:
+                score += -60 if last_label_is_fax else 50 - len(gap)
+        # Contact details usually sit near the top of the document
+        score -= min(match.start() // 500, 10)
+        
+        print(f"DEBUG: Phone candidate '{raw}' -> {phone} (score: {score})")
+        if phone not in candidates or candidates[phone][0] < score:
+            candidates[phone] = (score, match.start())
+    
+    ranked = sorted(candidates.items(), key=lambda item: (-item[1][0], item[1][1]))
+    phones = [phone for phone, (score, _) in ranked if score > 0]
+    if not phones and hints and hints.get('phones'):
+        # No number in the text at all, so the link was behind text such as "Call me"
+        print(f"DEBUG: Returning phones from link targets: {hints['phones']}")
+        return list(hints['phones'])
+    return phones if phones else ["Not found"]
+
+def primary_phone(phones):
+    """Best-ranked phone number"""
+    return phones[0]
+
+HEADER_LINES = 10  # Non-empty lines searched for the author's name and link target emails and phones
 
 def calculate_name_score(name, line_number):
     """Calculate a score for how likely this is to be a real name"""
@@ -723,11 +1015,36 @@ def clean_name_candidate(name_candidate):
         print(f"DEBUG: Cleaning would make name invalid, keeping original: '{name_candidate}'")
         return name_candidate
 
-def extract_name(text):
+def header_text(lines):
+    """The first HEADER_LINES non-empty lines"""
+    return '\n'.join(islice((line for line in lines if line.strip()), HEADER_LINES))
+
+def name_from_author(author, lines):
+    """The Author metadata as a name, if it is one and also heads the resume.
+
+    Author is often a template's or a recruiter's name, or the name of the
+    program that wrote the file, so it is only trusted when it reads as a
+    person's name and appears in the first few non-empty lines.
+    """
+    name = clean_name_candidate(author.strip())
+    if not is_likely_person_name(name):
+        return None
+    if name.lower() in header_text(lines).lower():
+        return name
+    print(f"DEBUG: Author '{name}' not found near the top of the text")
+    return None
+
+def extract_name(text, lines=None, hints=None):
     """Extract name from text with enhanced header detection"""
     print(f"DEBUG: Name extraction from text length: {len(text)}")
     
-    lines = text.split('\n')
+    if lines is None:
+        lines = text.split('\n')
+    if hints and hints.get('author'):
+        name = name_from_author(hints['author'], lines)
+        if name:
+            print(f"DEBUG: Selected name from document author: '{name}'")
+            return name
     print(f"DEBUG: First 15 lines for name extraction:")
     for i, line in enumerate(lines[:15]):
         if line.strip():
@@ -1040,9 +1357,107 @@ def extract_name(text):
     print("DEBUG: No valid name found")
     return "Not found"
 
-def load_education_keywords():
-    """Load education keywords from external file"""
-    keywords_file = os.path.join(os.path.dirname(__file__), 'keywords', 'education_keywords.txt')
+# Full-line patterns for section headers, used to split a resume into sections
+SECTION_HEADER_PATTERNS = {
+    'summary': r'(?:professional\s+|career\s+|executive\s+)?(?:summary|profile|objective)',
+    'experience': r'(?:work|professional|employment|career|relevant)?\s*(?:experience|history)(?:\s+summary)?|employment|work\s+history',
+    'education': r'(?:educational|academic)?\s*(?:education|qualifications?|background)(?:\s+details)?',
+    'skills': r'(?:technical|core|key|professional)?\s*(?:skills|competencies|expertise)(?:\s*(?:&|and)\s*\w+)?',
+    'certificates': r'(?:certifications?|certificates?|licenses?|trainings?)(?:\s*(?:&|and)\s*\w+)?',
+    'projects': r'(?:key\s+|major\s+|academic\s+)?projects?',
+}
+SECTION_HEADER_RE = re.compile(
+    r'^[\s•▪○►→*\-]*(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_HEADER_PATTERNS.items()) +
+    r')\s*:?\s*$', re.IGNORECASE)
+
+def detect_sections(lines):
+    """Map section names to the (start, end) line ranges of their bodies"""
+    sections = {}
+    current = None
+    start = 0
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or len(stripped) > 50:
+            continue
+        match = SECTION_HEADER_RE.match(stripped)
+        if match:
+            if current is not None:
+                sections.setdefault(current, []).append((start, i))
+            current = match.lastgroup
+            start = i + 1
+    if current is not None:
+        sections.setdefault(current, []).append((start, len(lines)))
+    print(f"DEBUG: Detected sections: { {name: ranges for name, ranges in sections.items()} }")
+    return sections
+
+def keyword_snapshot_data():
+    """Vocabularies and matcher tables compiled from the keyword text files"""
+    technical_skills, functional_skills, domain_skills = load_skills_keywords(use_snapshot=False)
+    certificate_keywords, specific_certifications = load_certificate_keywords(use_snapshot=False)
+    return {
+        'education_keywords': load_education_keywords(use_snapshot=False),
+        'technical_skills': technical_skills,
+        'functional_skills': functional_skills,
+        'domain_skills': domain_skills,
+        'certificate_keywords': certificate_keywords,
+        'specific_certifications': specific_certifications,
+        'cert_aliases': load_certificate_aliases(use_snapshot=False),
+        'certification_catalog': build_certification_catalog(use_snapshot=False).to_table(),
+    }
+
+def build_keyword_snapshot(path=None):
+    """Compile all keyword files into the binary snapshot workers load at start-up"""
+    path = path or os.path.join(KEYWORDS_DIR, SNAPSHOT_NAME)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_snapshot(path, keyword_snapshot_data(), KEYWORDS_DIR, KEYWORD_FILES, keyword_snapshot_code_version())
+    return path
+
+_keyword_snapshot = None
+_keyword_snapshot_stat = None
+_keyword_snapshot_code_version = None
+_keyword_snapshot_warning = None
+_keyword_snapshot_lock = threading.Lock()
+
+def keyword_snapshot_code_version():
+    """Fingerprint of the code that turns keyword files into snapshot data"""
+    global _keyword_snapshot_code_version
+    if _keyword_snapshot_code_version is None:
+        _keyword_snapshot_code_version = code_fingerprint(keyword_snapshot_data)
+    return _keyword_snapshot_code_version
+
+def get_keyword_snapshot():
+    """Return the precompiled keyword data, or None to fall back to the text files"""
+    global _keyword_snapshot, _keyword_snapshot_stat, _keyword_snapshot_warning
+    path = os.path.join(KEYWORDS_DIR, SNAPSHOT_NAME)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    with _keyword_snapshot_lock:
+        if (stat.st_size, stat.st_mtime_ns) != _keyword_snapshot_stat:
+            _keyword_snapshot_stat = (stat.st_size, stat.st_mtime_ns)
+            try:
+                _keyword_snapshot = KeywordSnapshot(path)
+                print(f"DEBUG: Loaded keyword snapshot {path}")
+            except (OSError, ValueError, SnapshotError) as e:
+                print(f"WARNING: Ignoring unreadable keyword snapshot {path}: {e}")
+                _keyword_snapshot = None
+        if _keyword_snapshot is None:
+            return None
+        reason = _keyword_snapshot.stale_reason(KEYWORDS_DIR, keyword_snapshot_code_version())
+        if reason is not None:
+            if reason != _keyword_snapshot_warning:
+                print(f"WARNING: Keyword snapshot is stale ({reason}), using the text files")
+                _keyword_snapshot_warning = reason
+            return None
+        return _keyword_snapshot.data
+
+def load_education_keywords(use_snapshot=True, profile=None):
+    """Load education keywords from the keyword snapshot or the external file"""
+    snapshot = get_keyword_snapshot() if use_snapshot and profile is None else None
+    if snapshot is not None:
+        return snapshot['education_keywords']
+    keywords_file = profile_keyword_path(KEYWORDS_DIR, 'education_keywords.txt', profile)
     education_keywords = []
     
     try:
@@ -1062,230 +1477,175 @@ def load_education_keywords():
             '10th', '12th', 'sslc', 'hsc', 'graduation', 'education'
         ]
     
-    return education_keywords
+    return list(dict.fromkeys(education_keywords))
 
-def extract_education(text):
-    import re  # Make sure re is imported
-    
-    print("DEBUG: Starting education extraction...")
-    
-    # Load education keywords from external file
-    education_keywords = load_education_keywords()
-    
-    print(f"DEBUG: Loaded {len(education_keywords)} education keywords")
-    
-    # Keywords that should NOT be considered educational (EXCLUDE these)
-    exclude_keywords = [
-        'experience', 'work', 'job', 'employment', 'company', 'project', 'skill',
-        'software', 'programming', 'development', 'management',
-        'responsibility', 'achievement', 'award', 'training', 'workshop',
-        'seminar', 'conference', 'publication', 'research', 'objective',
-        'summary', 'profile', 'career', 'professional', 'expertise', 'knowledge',
-        'tools', 'framework', 'database', 'language', 'platform', 'environment', 
-        'private', 'limited', 'technologies', 'solutions', 'services', 'systems'
-    ]
-    
-    # University/institution keywords that should not be treated as degrees
-    institution_keywords = [
-        'university', 'college', 'institute', 'school', 'academy', 'campus',
-        'board', 'cbse', 'icse', 'state board', 'central board'
-    ]
-    
-    lines = text.split('\n')
-    education_info = []
-    
-    print(f"DEBUG: Processing {len(lines)} lines for education...")
-    
-    for i, line in enumerate(lines):
-        line_clean = line.strip()
-        line_lower = line_clean.lower()
-        
-        # Skip empty lines or very short lines
-        if len(line_clean) < 5:
-            continue
-            
-        # FIRST: Check if line contains exclude keywords (reject immediately)
-        exclude_found = [word for word in exclude_keywords if word in line_lower]
-        if exclude_found:
-            print(f"DEBUG: Line {i+1} EXCLUDED (contains {exclude_found}): '{line_clean[:50]}...'")
+# Degree patterns with their display label; a None label keeps the degree as written
+DEGREE_PATTERNS = [
+    ('Ph.D.', r'ph\.?\s?d\.?|doctorate|doctor\s+of\s+philosophy'),
+    ('M.Tech', r'm\.?\s?tech'),
+    ('M.E.', r'm\.e\.?'),
+    ('M.Sc', r'm\.?\s?sc'),
+    ('MBA', r'm\.?b\.?a\.?'),
+    ('MCA', r'm\.?c\.?a\.?'),
+    ('M.Com', r'm\.?\s?com'),
+    ('M.S.', r'm\.?s\.?(?=\s+in\b)'),
+    ('M.A.', r'm\.a\.?'),
+    (None, r"master(?:'?s)?(?:\s+of\s+[a-z]+(?:\s+administration|\s+applications)?)?(?:\s+degree)?"),
+    ('B.Tech', r'b\.?\s?tech'),
+    ('B.E.', r'b\.e\.?'),
+    ('B.Sc', r'b\.?\s?sc'),
+    ('BCA', r'b\.?c\.?a\.?'),
+    ('BBA', r'b\.?b\.?a\.?'),
+    ('B.Com', r'b\.?\s?com'),
+    ('B.S.', r'b\.?s\.?(?=\s+in\b)'),
+    ('B.A.', r'b\.a\.?'),
+    (None, r"bachelor(?:'?s)?(?:\s+of\s+[a-z]+(?:\s+administration|\s+applications)?)?(?:\s+degree)?"),
+    (None, r'(?:advanced\s+|post\s*graduate\s+)?diploma'),
+    ('Class 12', r'12th|class\s+(?:xii|12)|hsc|higher\s+secondary|senior\s+secondary'),
+    ('Class 10', r'10th|class\s+(?:x|10)|sslc|ssc|matriculation|secondary\s+school'),
+]
+# Keywords from education_keywords.txt that name a section or an institution, not a degree
+EDUCATION_GENERIC_TERMS = {
+    'education', 'educational', 'graduation', 'degree', 'qualification', 'qualifications',
+    'academic', 'academics', 'university', 'college', 'institute', 'school',
+}
+MAX_EDUCATION_RECORDS = 10
+MAX_EDUCATION_LINE = 200  # Longer lines are prose, not education entries
+EDUCATION_CONTINUATION_LINES = 2  # Outside an education section, lines after a degree that may complete it
+
+INSTITUTION_RE = re.compile(
+    r'\b(?:university|college|institute|institution|school|academy|polytechnic|'
+    r'iit|nit|iiit|iim|bits|cbse|icse|board)\b', re.IGNORECASE)
+EDUCATION_YEAR_RE = re.compile(r'\b(?:19[5-9]\d|20\d{2})\b')
+EDUCATION_SCORE_RE = re.compile(
+    r'\b(?:c?gpa|grade\s+point\s+average)\s*[:\-]?\s*\d{1,2}(?:\.\d{1,2})?(?:\s*/\s*\d{1,2}(?:\.\d{1,2})?)?'
+    r'|\b\d{1,2}(?:\.\d{1,2})?(?:\s*/\s*\d{1,2}(?:\.\d{1,2})?)?\s*c?gpa\b'
+    r'|\b\d{1,3}(?:\.\d{1,2})?\s*(?:%|percent(?:age)?\b)'
+    r'|\b(?:first|second|third)\s+class(?:\s+with\s+distinction)?\b|\bdistinction\b'
+    r'|\bgrade\s*[:\-]?\s*[a-f][+\-]?(?![a-z])', re.IGNORECASE)
+# Separators between the parts of an entry: "B.Tech (CSE) | XYZ University, 2015 - 78%"
+EDUCATION_SEGMENT_RE = re.compile(
+    r'\s*[|;,()\t–—]\s*|\s+-\s+|\s{2,}|\s+from\s+', re.IGNORECASE)
+EDUCATION_PREFIX_RE = re.compile(
+    r'^[\s•▪○►→*\-:]*(?:(?:education|qualifications?|academics?|degrees?)\s*:\s*)?', re.IGNORECASE)
+FIELD_INTRO_RE = re.compile(r'^[\s.:\-]*(?:(?:in|of)\s+)?', re.IGNORECASE)
+
+@lru_cache(maxsize=8)
+def compile_degree_matcher(keywords):
+    """One regex for the built-in degrees plus any extra degree names from the keywords file.
+
+    Returns (pattern, labels) where group ``d<i>`` matching means labels[i].
+    """
+    labels = [label for label, _ in DEGREE_PATTERNS]
+    alternatives = [pattern for _, pattern in DEGREE_PATTERNS]
+    builtin = re.compile('|'.join(f'(?:{pattern})' for pattern in alternatives), re.IGNORECASE)
+    for keyword in keywords:
+        if keyword in EDUCATION_GENERIC_TERMS or builtin.fullmatch(keyword):
             continue
-        
-        # SECOND: Check if line contains education keywords (using word boundaries for better matching)
-        matched_keywords = []
-        for keyword in education_keywords:
-            # Use word boundaries for short keywords to avoid substring matches
-            if len(keyword) <= 4:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                if re.search(pattern, line_lower):
-                    matched_keywords.append(keyword)
-            else:
-                # For longer keywords, use simple substring matching
-                if keyword in line_lower:
-                    matched_keywords.append(keyword)
-        
-        if matched_keywords:
-            print(f"DEBUG: Line {i+1} MATCHED keywords {matched_keywords}: '{line_clean}'")
-            
-            # Check if this is just an institution name (not a degree)
-            is_just_institution = False
-            if any(inst in line_lower for inst in institution_keywords):
-                # If it only contains institution keywords and no degree keywords
-                degree_keywords = ['bachelor', 'master', 'diploma', 'b.tech', 'b.e', 'b.sc', 'm.sc', 
-                                 'mba', 'phd', 'bca', 'mca', '10th', '12th', 'sslc', 'hsc', 'degree']
-                if not any(deg in line_lower for deg in degree_keywords):
-                    # Additional check: if line is very short and mostly institution name
-                    clean_line_words = line_clean.split()
-                    if len(clean_line_words) <= 4 and any(inst in line_lower for inst in ['university', 'college', 'institute']):
-                        is_just_institution = True
-                        print(f"DEBUG: Line {i+1} REJECTED (just institution name): '{line_clean}'")
-                        continue
-            
-            # Additional validation - check if this looks like a real education entry
-            is_valid_education = False
-            
-            # Must contain at least one strong education indicator
-            strong_indicators = [
-                'degree', 'bachelor', 'master', 'diploma', 'certificate', 'graduation',
-                'b.tech', 'b.e', 'b.sc', 'm.sc', 'mba', 'phd', 'bca', 'mca', 
-                '10th', '12th', 'sslc', 'hsc', 'class 10', 'class 12'
-            ]
-            
-            if any(indicator in line_lower for indicator in strong_indicators):
-                is_valid_education = True
-            
-            # OR section headers with years
-            elif any(edu_word in line_lower for edu_word in ['education', 'qualification', 'academic']):
-                if re.search(r'\b(19|20)\d{2}\b', line_clean):
-                    is_valid_education = True
-            
-            if not is_valid_education:
-                print(f"DEBUG: Line {i+1} REJECTED (not strong enough education indicator): '{line_clean}'")
-                continue
-            
-            # Clean up qualification name
-            qualification = line_clean
-            
-            # Remove common prefixes/suffixes
-            for prefix in ['•', '-', '*', ':', '▪', '○', '►', '→']:
-                if qualification.startswith(prefix):
-                    qualification = qualification[1:].strip()
-            
-            # Remove common section headers
-            section_headers = ['education:', 'qualification:', 'academic:', 'degrees:', 'qualifications:']
-            for header in section_headers:
-                if qualification.lower().startswith(header):
-                    qualification = qualification[len(header):].strip()
-            
-            # Skip if qualification is too generic or empty
-            if (len(qualification) < 8 or 
-                qualification.lower() in ['education', 'qualification', 'academic', 'qualifications']):
-                print(f"DEBUG: Line {i+1} SKIPPED (too generic): '{qualification}'")
+        labels.append(keyword.upper() if len(keyword) <= 4 else keyword.title())
+        alternatives.append(re.escape(keyword))
+    pattern = re.compile(
+        r'(?<![a-z0-9])(?:' + '|'.join(f'(?P<d{i}>{p})' for i, p in enumerate(alternatives)) + r')(?![a-z])',
+        re.IGNORECASE)
+    return pattern, labels
+
+def _looks_like_field(segment, degree_re):
+    return (2 <= len(segment) <= 60 and not any(ch.isdigit() for ch in segment)
+            and not INSTITUTION_RE.search(segment) and not degree_re.search(segment))
+
+def parse_education_line(line, degree_re, labels):
+    """Split one line into whichever of degree, field, institution, year and score it holds"""
+    found = {}
+    line = EDUCATION_PREFIX_RE.sub('', line)
+    years = EDUCATION_YEAR_RE.findall(line)
+    if years:
+        found['year'] = int(years[-1])  # "2011 - 2015" is the completion year
+    score = EDUCATION_SCORE_RE.search(line)
+    if score:
+        found['score'] = ' '.join(score.group().split())
+    segments = [segment.strip(' .') for segment in EDUCATION_SEGMENT_RE.split(line)]
+    segments = [segment for segment in segments if segment]
+    for index, segment in enumerate(segments):
+        degree = degree_re.search(segment) if 'degree' not in found else None
+        if degree:
+            label = labels[int(degree.lastgroup[1:])]
+            found['degree'] = label or ' '.join(degree.group().split())
+            field = FIELD_INTRO_RE.sub('', segment[degree.end():]).strip(' .')
+            if not field and index + 1 < len(segments):
+                field = segments[index + 1]
+            if field and _looks_like_field(field, degree_re) and not EDUCATION_SCORE_RE.search(field):
+                found['field'] = field
+        elif 'institution' not in found and INSTITUTION_RE.search(segment):
+            # "Pune University 2014 First Class" -> "Pune University"
+            institution = EDUCATION_YEAR_RE.sub(' ', EDUCATION_SCORE_RE.sub(' ', segment))
+            found['institution'] = ' '.join(institution.split()).strip(' .-')
+    return found
+
+def extract_education(text, lines=None, sections=None, keywords=None):
+    """Parse education entries into records of degree, field, institution, year and score.
+
+    Works in one pass over the education section: a line naming a degree
+    starts a record and following lines fill in what it lacks. Without an
+    education section every line is scanned, and only the few lines after a
+    degree may complete it.
+    """
+    print("DEBUG: Starting education extraction...")
+    if lines is None:
+        lines = text.split('\n')
+    degree_re, labels = (keywords or get_keyword_profile())['degree_matcher']
+    ranges = (sections or {}).get('education')
+    in_section = bool(ranges)
+    if not in_section:
+        ranges = [(0, len(lines))]
+
+    records = []
+    for start, end in ranges:
+        current = None
+        since_degree = 0
+        for i in range(start, end):
+            line = lines[i].strip()
+            if len(line) < 2 or len(line) > MAX_EDUCATION_LINE:
                 continue
-            
-            # Check if the line already contains structured information (year and grade/percentage)
-            # If it does, use it as-is without extracting separately
-            contains_year = bool(re.search(r'\b(19|20)\d{2}\b', qualification))
-            contains_percentage = bool(re.search(r'\d+(?:\.\d+)?\s*%|\d+(?:\.\d+)?\s*(?:gpa|cgpa)|first\s+class|second\s+class|distinction', qualification.lower()))
-            
-            if contains_year and contains_percentage:
-                # Line already contains complete information
-                education_entry = qualification
-                print(f"DEBUG: Using complete line as-is: {education_entry}")
-            else:
-                # Extract missing information from nearby lines
-                year = "Not specified"
-                percentage = "Not specified"
-                
-                # Search only in current line first, then next 1 line to avoid cross-contamination
-                search_text = qualification
-                
-                # First try to extract from current line only
-                if not contains_year:
-                    year_matches = re.findall(r'\b(19|20)(\d{2})\b', qualification)
-                    if year_matches:
-                        year = year_matches[0][0] + year_matches[0][1]
-                        print(f"DEBUG: Found year in current line: {year}")
-                
-                if not contains_percentage:
-                    percentage_patterns = [
-                        r'(\d{1,3}(?:\.\d{1,2})?)\s*%',
-                        r'(\d{1,3}(?:\.\d{1,2})?)\s*percent',
-                        r'(\d\.\d+)\s*(?:gpa|cgpa)',
-                        r'grade\s*[:\-]?\s*([a-f][\+\-]?)',
-                        r'(first\s+class|second\s+class|third\s+class)',
-                        r'(distinction|merit|pass)',
-                        r'(\d{1,3})\s*marks?'
-                    ]
-                    
-                    for pattern in percentage_patterns:
-                        matches = re.findall(pattern, qualification, re.IGNORECASE)
-                        if matches:
-                            if isinstance(matches[0], tuple):
-                                non_empty_parts = [str(part) for part in matches[0] if part]
-                                if non_empty_parts:
-                                    percentage = ' '.join(non_empty_parts).strip()
-                            else:
-                                percentage = str(matches[0]).strip()
-                            print(f"DEBUG: Found percentage/grade in current line: {percentage}")
-                            break
-                
-                # If still not found, try next line only (and only if it's related)
-                if (year == "Not specified" or percentage == "Not specified") and i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if (len(next_line) > 3 and 
-                        not any(exclude in next_line.lower() for exclude in exclude_keywords) and
-                        not any(keyword in next_line.lower() for keyword in education_keywords[:20])):  # Avoid picking up other education entries
-                        
-                        if year == "Not specified":
-                            year_matches = re.findall(r'\b(19|20)(\d{2})\b', next_line)
-                            if year_matches:
-                                year = year_matches[0][0] + year_matches[0][1]
-                                print(f"DEBUG: Found year in next line: {year}")
-                        
-                        if percentage == "Not specified":
-                            for pattern in percentage_patterns:
-                                matches = re.findall(pattern, next_line, re.IGNORECASE)
-                                if matches:
-                                    if isinstance(matches[0], tuple):
-                                        non_empty_parts = [str(part) for part in matches[0] if part]
-                                        if non_empty_parts:
-                                            percentage = ' '.join(non_empty_parts).strip()
-                                    else:
-                                        percentage = str(matches[0]).strip()
-                                    print(f"DEBUG: Found percentage/grade in next line: {percentage}")
-                                    break
-                
-                # Format the education entry
-                if year != "Not specified" or percentage != "Not specified":
-                    education_entry = f"{qualification} - {year} - {percentage}"
+            found = parse_education_line(line, degree_re, labels)
+            since_degree += 1
+            if 'degree' in found:
+                if current is not None and 'degree' not in current:
+                    # Institution line came before its degree
+                    for key, value in found.items():
+                        current.setdefault(key, value)
                 else:
-                    education_entry = qualification
-            
-            print(f"DEBUG: Formatted entry: {education_entry}")
-            
-            # Avoid duplicates and overly long entries
-            if education_entry not in education_info and len(qualification) < 200:
-                education_info.append(education_entry)
-                print(f"DEBUG: ADDED education entry: {education_entry}")
-            else:
-                print(f"DEBUG: DUPLICATE or TOO LONG, skipping: {education_entry}")
-    
-    print(f"DEBUG: Total education entries found: {len(education_info)}")
-    
-    # Remove duplicates while preserving order
+                    current = found
+                    records.append(current)
+                since_degree = 0
+            elif not found:
+                continue
+            elif in_section and 'institution' in found and (current is None or 'institution' in current):
+                # A second institution begins the next entry, its degree may follow
+                current = found
+                records.append(current)
+            elif current is not None and (in_section or since_degree <= EDUCATION_CONTINUATION_LINES):
+                for key, value in found.items():
+                    current.setdefault(key, value)
+
+    education = []
     seen = set()
-    unique_education = []
-    for edu in education_info:
-        if edu not in seen:
-            seen.add(edu)
-            unique_education.append(edu)
-    
-    print(f"DEBUG: Final education list: {unique_education}")
-    return unique_education[:10] if unique_education else ["Not found"]
+    for record in records:
+        if 'degree' not in record:
+            continue
+        entry = {key: record.get(key) for key in ('degree', 'field', 'institution', 'year', 'score')}
+        identity = (entry['degree'], entry['field'], entry['institution'], entry['year'])
+        if identity not in seen:
+            seen.add(identity)
+            education.append(entry)
+            print(f"DEBUG: Education record: {entry}")
+    print(f"DEBUG: Total education records found: {len(education)}")
+    return education[:MAX_EDUCATION_RECORDS] if education else ["Not found"]
 
-def load_skills_keywords():
-    """Load skills keywords from external files"""
-    keywords_dir = os.path.join(os.path.dirname(__file__), 'keywords')
+def load_skills_keywords(use_snapshot=True, profile=None):
+    """Load skills keywords from the keyword snapshot or the external files"""
+    snapshot = get_keyword_snapshot() if use_snapshot and profile is None else None
+    if snapshot is not None:
+        return snapshot['technical_skills'], snapshot['functional_skills'], snapshot['domain_skills']
     
     technical_skills = []
     functional_skills = []
@@ -1293,7 +1653,7 @@ def load_skills_keywords():
     
     # Load technical skills
     try:
-        with open(os.path.join(keywords_dir, 'technical_skills.txt'), 'r', encoding='utf-8') as f:
+        with open(profile_keyword_path(KEYWORDS_DIR, 'technical_skills.txt', profile), 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line and not line.startswith('#'):
@@ -1304,7 +1664,7 @@ def load_skills_keywords():
     
     # Load functional skills
     try:
-        with open(os.path.join(keywords_dir, 'functional_skills.txt'), 'r', encoding='utf-8') as f:
+        with open(profile_keyword_path(KEYWORDS_DIR, 'functional_skills.txt', profile), 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line and not line.startswith('#'):
@@ -1315,7 +1675,7 @@ def load_skills_keywords():
     
     # Load domain skills
     try:
-        with open(os.path.join(keywords_dir, 'domain_skills.txt'), 'r', encoding='utf-8') as f:
+        with open(profile_keyword_path(KEYWORDS_DIR, 'domain_skills.txt', profile), 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line and not line.startswith('#'):
@@ -1324,13 +1684,17 @@ def load_skills_keywords():
         print("WARNING: domain_skills.txt not found, using fallback")
         domain_skills = ['healthcare', 'finance', 'manufacturing', 'retail']
     
-    return technical_skills, functional_skills, domain_skills
+    return (list(dict.fromkeys(technical_skills)), list(dict.fromkeys(functional_skills)),
+            list(dict.fromkeys(domain_skills)))
 
-def extract_skills(text):
+def extract_skills(text, lines=None, keywords=None):
     """Extract skills from text and categorize into technical, functional, and domain skills"""
     
-    # Load skills keywords from external files
-    technical_skills, functional_skills, domain_skills = load_skills_keywords()
+    # Skills keywords of the requested keyword profile
+    keywords = keywords or get_keyword_profile()
+    technical_skills = keywords['technical_skills']
+    functional_skills = keywords['functional_skills']
+    domain_skills = keywords['domain_skills']
     
     print(f"DEBUG: Loaded {len(technical_skills)} technical, {len(functional_skills)} functional, and {len(domain_skills)} domain skills")
     
@@ -1365,7 +1729,8 @@ def extract_skills(text):
             found_domain.append(skill.title())
     
     # Look for skills section specifically for additional parsing
-    lines = text.split('\n')
+    if lines is None:
+        lines = text.split('\n')
     
     for i, line in enumerate(lines):
         line_lower = line.lower()
@@ -1449,14 +1814,15 @@ def extract_skills(text):
     print(f"  Domain Skills: {len(found_domain)} found")
     
     return skills_table
-def extract_experience(text):
+def extract_experience(text, lines=None):
     """Extract work experience"""
     experience_keywords = [
         'experience', 'work', 'employment', 'career', 'position',
         'job', 'role', 'worked', 'employed', 'served'
     ]
     
-    lines = text.split('\n')
+    if lines is None:
+        lines = text.split('\n')
     experience_info = []
     
     # Look for years in format 2019-2022, 2019 - 2022, etc.
@@ -1482,9 +1848,129 @@ def extract_experience(text):
     
     return experience_info[:3] if experience_info else ["Not found"]
 
-def load_certificate_keywords():
-    """Load certificate keywords from external file"""
-    keywords_file = os.path.join(os.path.dirname(__file__), 'keywords', 'cert_keywords.txt')
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH_NAME = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?'
+
+def _date_pattern(suffix):
+    # A two-digit year needs a month name and an apostrophe or hyphen ("Jan'19", "Mar-19")
+    return (rf'(?:(?P<short_month{suffix}>{_MONTH_NAME})\s*[\'’\-]\s*(?P<short_year{suffix}>\d{{2}})(?![\d/.])'
+            rf'|(?:(?P<month_name{suffix}>{_MONTH_NAME})\s*[,\']?\s*|(?P<month_num{suffix}>\d{{1,2}})\s*[/.\-]\s*)?'
+            rf'(?P<year{suffix}>(?:19|20)\d{{2}}))')
+
+DATE_RANGE_RE = re.compile(
+    _date_pattern('1') +
+    r'\s*(?:-|–|—|to|till|until)\s*' +
+    r'(?:' + _date_pattern('2') + r'|(?P<present>present|current|now|today|till\s+date|date))',
+    re.IGNORECASE)
+
+def _range_month(match, suffix):
+    """Month number of one end of a date range, or None if only a year is given"""
+    name = match.group(f'month_name{suffix}') or match.group(f'short_month{suffix}')
+    if name:
+        return MONTHS[name[:3].lower()]
+    number = match.group(f'month_num{suffix}')
+    if number and 1 <= int(number) <= 12:
+        return int(number)
+    return None
+
+def _range_year(match, suffix, today):
+    """Four-digit year of one end of a date range; two-digit years are taken as the latest past one"""
+    short_year = match.group(f'short_year{suffix}')
+    if short_year is None:
+        return int(match.group(f'year{suffix}'))
+    year = 2000 + int(short_year)
+    return year if year <= today.year else year - 100
+
+def _range_label(match, suffix, today):
+    month = _range_month(match, suffix)
+    year = _range_year(match, suffix, today)
+    return f"{year}-{month:02d}" if month else str(year)
+
+# Degree and school words; outside an experience section, date ranges on
+# such lines are study periods rather than jobs
+TIMELINE_EDUCATION_RE = re.compile(
+    r'\b(?:b\.?\s?tech|m\.?\s?tech|b\.\s?e\b|m\.\s?e\b|b\.?\s?sc|m\.?\s?sc|b\.?\s?com|m\.?\s?com|'
+    r'b\.\s?a\b|m\.\s?a\b|bca|mca|mba|ph\.?\s?d|bachelor\w*|master\w*|degree|diploma|university|college|'
+    r'school|class|10th|12th|ssc|hsc|cbse|icse|cgpa|gpa|graduat\w*|intermediate|matriculation|semester)\b',
+    re.IGNORECASE)
+
+MAX_TIMELINE_POSITIONS = 100  # Bounds the per-document cost on date-heavy input
+TIMELINE_CONTEXT_CHARS = 120  # Text either side of a date range considered for its title
+
+def extract_experience_timeline(lines, sections, today=None):
+    """Parse date ranges in the experience section into structured positions.
+
+    Without an experience header, the lines outside other known sections are
+    scanned instead, skipping study periods. Open positions end 'present';
+    their months and the total are as of ``today`` (see current_timeline).
+    """
+    today = today or date.today()
+    now_index = today.year * 12 + today.month
+    
+    ranges = sections.get('experience')
+    fallback = not ranges
+    if fallback:
+        other_lines = set()
+        for name, section_ranges in sections.items():
+            for start_line, end_line in section_ranges:
+                other_lines.update(range(start_line, end_line))
+        ranges = [(0, len(lines))]
+    positions = []
+    
+    for start_line, end_line in ranges:
+        previous = ''
+        for i in range(start_line, end_line):
+            line = lines[i].strip()
+            if not line or len(positions) >= MAX_TIMELINE_POSITIONS:
+                continue
+            if fallback and i in other_lines:
+                continue
+            for match in DATE_RANGE_RE.finditer(line):
+                start_label = _range_label(match, '1', today)
+                end_label = 'present' if match.group('present') else _range_label(match, '2', today)
+                start_index, end_index = position_period(start_label, end_label, now_index)
+                
+                if end_index <= start_index or end_index > now_index + 1 or start_index < 1950 * 12:
+                    print(f"DEBUG: Ignoring implausible date range '{match.group(0)}'")
+                    continue
+                
+                context = (line[max(0, match.start() - TIMELINE_CONTEXT_CHARS):match.start()] +
+                           line[match.end():match.end() + TIMELINE_CONTEXT_CHARS]).strip(' -–—|,()')
+                if len(context) < 3:
+                    context = previous
+                if fallback and TIMELINE_EDUCATION_RE.search(context):
+                    print(f"DEBUG: Ignoring study period '{match.group(0)}' ({context})")
+                    continue
+                positions.append({
+                    'title': context,
+                    'start': start_label,
+                    'end': end_label,
+                    'months': end_index - start_index,
+                    '_period': (start_index, end_index)
+                })
+                print(f"DEBUG: Experience period '{match.group(0)}' -> {end_index - start_index} months")
+                if len(positions) >= MAX_TIMELINE_POSITIONS:
+                    print(f"DEBUG: Stopping after {MAX_TIMELINE_POSITIONS} experience periods")
+                    break
+            previous = line[:TIMELINE_CONTEXT_CHARS]
+    
+    merged = merge_periods([position.pop('_period') for position in positions])
+    total_months = sum(end - start for start, end in merged)
+    
+    return {
+        'positions': positions,
+        'total_years': round(total_months / 12, 1)
+    }
+
+def load_certificate_keywords(use_snapshot=True, profile=None):
+    """Load certificate keywords from the keyword snapshot or the external file"""
+    snapshot = get_keyword_snapshot() if use_snapshot and profile is None else None
+    if snapshot is not None:
+        return snapshot['certificate_keywords'], snapshot['specific_certifications']
+    keywords_file = profile_keyword_path(KEYWORDS_DIR, 'cert_keywords.txt', profile)
     certificate_keywords = []
     specific_certifications = []
     
@@ -1519,14 +2005,106 @@ def load_certificate_keywords():
             'aws certified', 'microsoft certified', 'azure certified', 'pmp', 'scrum master'
         ]
     
-    return certificate_keywords, specific_certifications
+    return list(dict.fromkeys(certificate_keywords)), list(dict.fromkeys(specific_certifications))
+
+def load_certificate_aliases(use_snapshot=True, profile=None):
+    """Load certification alias lines (id | issuer | name | variants) from the snapshot or external file"""
+    snapshot = get_keyword_snapshot() if use_snapshot and profile is None else None
+    if snapshot is not None:
+        return snapshot['cert_aliases']
+    aliases_file = profile_keyword_path(KEYWORDS_DIR, 'cert_aliases.txt', profile)
+    try:
+        with open(aliases_file, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except FileNotFoundError:
+        print("WARNING: cert_aliases.txt not found, using built-in certification catalog")
+        return DEFAULT_CERTIFICATIONS.splitlines()
+
+def build_certification_catalog(use_snapshot=True, profile=None):
+    _, specific_certifications = load_certificate_keywords(use_snapshot, profile)
+    return CertificationCatalog.from_keywords(specific_certifications, load_certificate_aliases(use_snapshot, profile))
+
+_certification_catalog = None
+_certification_catalog_files = None
+_certification_catalog_lock = threading.Lock()
+
+def get_certification_catalog():
+    """Return the compiled certification catalog, rebuilding it when its keyword files change"""
+    global _certification_catalog, _certification_catalog_files
+    files = tuple(file_fingerprint(os.path.join(KEYWORDS_DIR, name)) for name in CERTIFICATE_KEYWORD_FILES)
+    with _certification_catalog_lock:
+        if _certification_catalog is None or files != _certification_catalog_files:
+            snapshot = get_keyword_snapshot()
+            if snapshot is not None:
+                _certification_catalog = CertificationCatalog.from_table(snapshot['certification_catalog'])
+            else:
+                _certification_catalog = build_certification_catalog(use_snapshot=False)
+            _certification_catalog_files = files
+            print(f"DEBUG: Compiled certification catalog with {len(_certification_catalog)} certifications")
+        return _certification_catalog
+
+def compile_keyword_profile(profile=None):
+    """Keyword lists and compiled matchers for one keyword profile (None is the base keywords)"""
+    education_keywords = tuple(load_education_keywords(profile=profile))
+    technical_skills, functional_skills, domain_skills = load_skills_keywords(profile=profile)
+    certificate_keywords, specific_certifications = load_certificate_keywords(profile=profile)
+    if profile is None:
+        catalog = get_certification_catalog()
+    else:
+        catalog = build_certification_catalog(profile=profile)
+    print(f"DEBUG: Compiled keyword profile '{profile or 'default'}'")
+    return {
+        'profile': profile,
+        'education_keywords': education_keywords,
+        'degree_matcher': compile_degree_matcher(education_keywords),
+        'technical_skills': technical_skills,
+        'functional_skills': functional_skills,
+        'domain_skills': domain_skills,
+        'certificate_keywords': certificate_keywords,
+        'specific_certifications': specific_certifications,
+        'certification_catalog': catalog,
+    }
+
+_keyword_profile_cache = None
+_keyword_profile_cache_lock = threading.Lock()
 
-def extract_certificates(text):
+def get_keyword_profile_cache():
+    global _keyword_profile_cache
+    if _keyword_profile_cache is None:
+        with _keyword_profile_cache_lock:
+            if _keyword_profile_cache is None:
+                _keyword_profile_cache = KeywordProfileCache(
+                    compile_keyword_profile, app.config['KEYWORD_PROFILE_CACHE_BYTES'])
+    return _keyword_profile_cache
+
+def keyword_profile_exists(profile):
+    return profile is None or (bool(PROFILE_NAME_RE.match(profile))
+                               and os.path.isdir(profile_dir(KEYWORDS_DIR, profile)))
+
+def get_keyword_profile(profile=None):
+    """Return a compiled keyword profile, recompiling it when one of its keyword files changes"""
+    if not keyword_profile_exists(profile):
+        raise ValueError(f"Unknown keyword profile '{profile}'")
+    signature = tuple(file_fingerprint(profile_keyword_path(KEYWORDS_DIR, name, profile))
+                      for name in KEYWORD_FILES)
+    return get_keyword_profile_cache().get(profile, signature)
+
+def extract_certifications(text, keywords=None):
+    """Canonical certifications (id, name, issuer) mentioned anywhere in the text"""
+    catalog = (keywords or get_keyword_profile())['certification_catalog']
+    certifications = [dict(entry) for entry in catalog.find(text)]
+    print(f"DEBUG: Catalog certifications found: {[entry['id'] for entry in certifications]}")
+    return certifications if certifications else ["Not found"]
+
+def extract_certificates(text, lines=None, keywords=None):
     """Extract certificates and certifications from text"""
     print("DEBUG: Starting certificate extraction...")
     
-    # Load certificate keywords from external file
-    certificate_keywords, specific_certifications = load_certificate_keywords()
+    # Certificate keywords and catalog of the requested keyword profile
+    keywords = keywords or get_keyword_profile()
+    certificate_keywords = keywords['certificate_keywords']
+    specific_certifications = keywords['specific_certifications']
+    catalog = keywords['certification_catalog']
     
     print(f"DEBUG: Loaded {len(certificate_keywords)} general keywords and {len(specific_certifications)} specific certifications")
     
@@ -1536,7 +2114,8 @@ def extract_certificates(text):
         'license', 'credential', 'achievement', 'award', 'honor'
     ]
     
-    lines = text.split('\n')
+    if lines is None:
+        lines = text.split('\n')
     certificate_info = []
     in_certificate_section = False
     section_depth = 0
@@ -1595,7 +2174,7 @@ def extract_certificates(text):
                 if (len(cert_line) > 8 and 
                     not cert_line.lower() in ['certificates', 'certifications', 'training', 'courses']):
                     
-                    formatted_cert = format_certificate_entry(cert_line)
+                    formatted_cert = format_certificate_entry(cert_line, catalog)
                     if formatted_cert and formatted_cert not in certificate_info:
                         certificate_info.append(formatted_cert)
                         print(f"DEBUG: ADDED from section: {formatted_cert}")
@@ -1615,7 +2194,7 @@ def extract_certificates(text):
                 if cert_line.startswith(prefix):
                     cert_line = cert_line[len(prefix):].strip()
             
-            formatted_cert = format_certificate_entry(cert_line)
+            formatted_cert = format_certificate_entry(cert_line, catalog)
             if formatted_cert and formatted_cert not in certificate_info:
                 certificate_info.append(formatted_cert)
                 print(f"DEBUG: ADDED specific certification: {formatted_cert}")
@@ -1637,7 +2216,7 @@ def extract_certificates(text):
                         cert_line = cert_line[len(prefix):].strip()
                 
                 if len(cert_line) > 10:
-                    formatted_cert = format_certificate_entry(cert_line)
+                    formatted_cert = format_certificate_entry(cert_line, catalog)
                     if formatted_cert and formatted_cert not in certificate_info:
                         certificate_info.append(formatted_cert)
                         print(f"DEBUG: ADDED general certificate: {formatted_cert}")
@@ -1649,17 +2228,20 @@ def extract_certificates(text):
     seen = set()
     
     for cert in certificate_info:
-        # Use the main certificate name for deduplication
-        cert_name = cert.split(' - Year:')[0].strip().lower()
-        if cert_name not in seen and len(cert_name) > 5:
-            seen.add(cert_name)
+        # Variants of a catalog certification share its id; others dedupe by name.
+        # The catalog sees the original case, since acronyms such as PMP match case-sensitively
+        cert_name = cert.split(' - Issuer:')[0].strip()
+        entry = catalog.lookup(cert_name)
+        key = entry['id'] if entry else cert_name.lower()
+        if key not in seen and (entry or len(cert_name) > 5):
+            seen.add(key)
             unique_certificates.append(cert)
     
     print(f"DEBUG: Final unique certificates: {unique_certificates}")
     return unique_certificates[:15] if unique_certificates else ["Not found"]
 
 # Helper method for formatting certificate entries
-def format_certificate_entry(cert_text):
+def format_certificate_entry(cert_text, catalog=None):
     """Format a certificate entry with issuer extraction (year removed)"""
     if not cert_text or len(cert_text.strip()) < 5:
         return None
@@ -1679,6 +2261,12 @@ def format_certificate_entry(cert_text):
         r'issued by\s+([A-Za-z\s&,.-]+?)(?:\s|$)'  # "issued by XYZ"
     ]
     
+    # Catalog certifications have a known issuer, skipping the pattern guesses
+    entry = (catalog or get_certification_catalog()).lookup(cert_name)
+    if entry and entry['issuer']:
+        issuer = entry['issuer']
+        issuer_patterns = []
+    
     for pattern in issuer_patterns:
         issuer_match = re.search(pattern, cert_name, re.IGNORECASE)
         if issuer_match:
@@ -1689,7 +2277,8 @@ def format_certificate_entry(cert_text):
                 cert_name = re.sub(pattern, '', cert_name, flags=re.IGNORECASE).strip()
                 break
     
-    # Clean up certificate name
+    # Clean up certificate name (parentheses left empty by the year removal too)
+    cert_name = re.sub(r'\(\s*\)', '', cert_name)
     cert_name = re.sub(r'\s+', ' ', cert_name).strip()
     cert_name = cert_name.rstrip('- ').strip()
     
@@ -1698,45 +2287,303 @@ def format_certificate_entry(cert_text):
     
     return f"{cert_name} - Issuer: {issuer}"
 
-def parse_resume(file_path, file_extension):
-    """Main function to parse resume and extract information"""
-    
-    # Extract text based on file type
+def split_lines(text):
+    """Split document text into lines once for all extractors"""
+    return text.split('\n')
+
+# Extractors and the intermediates they share. Costs are rough relative
+# weights; the scheduler starts the most expensive ready extractors first.
+# Keyword files are listed so the field cache invalidates only dependent fields.
+EXTRACTOR_REGISTRY = ExtractorRegistry(keywords_dir=KEYWORDS_DIR, config=app.config)
+EXTRACTOR_REGISTRY.intermediate('keywords', get_keyword_profile, inputs=('profile',), cost=1)
+EXTRACTOR_REGISTRY.intermediate('lines', split_lines, inputs=('text',), cost=1)
+EXTRACTOR_REGISTRY.intermediate('sections', detect_sections, inputs=('lines',), cost=1)
+EXTRACTOR_REGISTRY.register('name', extract_name, inputs=('text', 'lines', 'hints'), cost=3)
+EXTRACTOR_REGISTRY.register('email', extract_email, inputs=('text', 'lines', 'hints'), cost=2)
+EXTRACTOR_REGISTRY.register('phone', primary_phone, inputs=('phones',), cost=1)
+EXTRACTOR_REGISTRY.register('phones', extract_phone, inputs=('text', 'lines', 'hints'), cost=1,
+                            config=('PHONE_DEFAULT_REGION',))
+EXTRACTOR_REGISTRY.register('education', extract_education, inputs=('text', 'lines', 'sections', 'keywords'), cost=2,
+                            keywords=EDUCATION_KEYWORD_FILES)
+EXTRACTOR_REGISTRY.register('skills', extract_skills, inputs=('text', 'lines', 'keywords'), cost=3,
+                            keywords=SKILL_KEYWORD_FILES)
+EXTRACTOR_REGISTRY.register('experience', extract_experience, inputs=('text', 'lines'), cost=1)
+EXTRACTOR_REGISTRY.register('experience_timeline', extract_experience_timeline, inputs=('lines', 'sections'), cost=1)
+EXTRACTOR_REGISTRY.register('certificates', extract_certificates, inputs=('text', 'lines', 'keywords'), cost=3,
+                            keywords=CERTIFICATE_KEYWORD_FILES)
+EXTRACTOR_REGISTRY.register('certifications', extract_certifications, inputs=('text', 'keywords'), cost=1,
+                            keywords=CERTIFICATE_KEYWORD_FILES)
+
+def extract_text(file_path, file_extension, trace=NULL_TRACE, hints=None):
+    """Extract raw text from a resume file based on its type.
+
+    A ``hints`` dict (see new_document_hints) is filled with the emails, phones
+    and author found in PDF and DOCX link targets and metadata.
+    """
     if file_extension == 'pdf':
-        text = extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, trace, hints)
     elif file_extension == 'docx':
-        text = extract_text_from_docx(file_path)
+        return extract_text_from_docx(file_path, trace, hints)
     elif file_extension == 'txt':
-        text = extract_text_from_txt(file_path)
-    else:
-        return None
+        return extract_text_from_txt(file_path, trace)
+    return None
+
+def parse_text(text, cancel_event=None, trace=None, profile=None, hints=None):
+    """Run all registered extractors over already extracted resume text with a keyword profile
+    and the document's link and metadata hints"""
+    # Extract information (independent extractors run concurrently)
+    results = run_extractors(
+        EXTRACTOR_REGISTRY, text,
+        max_workers=app.config['EXTRACTOR_WORKERS'],
+        cancel_event=cancel_event,
+        timeout=app.config['PARSE_TIMEOUT'],
+        trace=trace,
+        cache=get_field_cache() if app.config['FIELD_CACHE_ENABLED'] else None,
+        profile=profile,
+        hints=hints
+    )
+    # A cached timeline was computed on an earlier day
+    if 'experience_timeline' in results:
+        results['experience_timeline'] = current_timeline(results['experience_timeline'])
+    return results
+
+def field_versions(profile=None, hints=None):
+    """Current version of every output extractor for a document's hints, as used by the field cache"""
+    return {name: EXTRACTOR_REGISTRY.version(name, profile, hints) for name in EXTRACTOR_REGISTRY.outputs()}
+
+def fields_version(profile=None, hints=None):
+    """One hash of all current extractor versions, stored with each parse result"""
+    versions = field_versions(profile, hints)
+    return hashlib.sha256(json.dumps(versions, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def parse_resume(file_path, file_extension, cancel_event=None):
+    """Main function to parse resume and extract information"""
     
-    if not text.strip():
-        return None
+    # Extract text based on file type
+    hints = new_document_hints()
+    text = extract_text(file_path, file_extension, hints=hints)
     
-    # Extract information
-    resume_data = {
-        'name': extract_name(text),
-        'email': extract_email(text),
-        'phone': extract_phone(text),
-        'education': extract_education(text),
-        'skills': extract_skills(text),
-        'experience': extract_experience(text),
-        'certificates': extract_certificates(text)
-    }
+    if text is None or not text.strip():
+        return None
     
-    return resume_data
+    return parse_text(text, cancel_event=cancel_event, hints=hints)
+
+_near_duplicate_index = None
+_near_duplicate_lock = threading.Lock()
+
+def get_near_duplicate_index():
+    """Return the shared near-duplicate index, opening it on first use"""
+    global _near_duplicate_index
+    with _near_duplicate_lock:
+        if _near_duplicate_index is None:
+            db_path = os.path.join(app.config['DATA_DIR'], 'near_duplicates.db')
+            _near_duplicate_index = NearDuplicateIndex(
+                db_path, threshold=app.config['NEAR_DUPLICATE_THRESHOLD'])
+        return _near_duplicate_index
+
+_field_cache = None
+_field_cache_lock = threading.Lock()
+
+def get_field_cache():
+    """Return the shared per-field result cache, opening it on first use"""
+    global _field_cache
+    with _field_cache_lock:
+        if _field_cache is None:
+            _field_cache = FieldCache(os.path.join(app.config['DATA_DIR'], 'field_cache.db'))
+        return _field_cache
+
+_text_store = None
+_text_store_lock = threading.Lock()
+
+def get_text_store():
+    """Return the shared store of compressed extracted text"""
+    global _text_store
+    with _text_store_lock:
+        if _text_store is None:
+            _text_store = TextStore(os.path.join(app.config['DATA_DIR'], 'texts.db'))
+        return _text_store
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+def get_search_index():
+    """Return the shared full-text search index, opening it on first use"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex(os.path.join(app.config['DATA_DIR'], 'search_index.db'))
+        return _search_index
+
+_ranking_engine = None
+_ranking_engine_lock = threading.Lock()
+
+def get_ranking_engine():
+    """Return the shared job-description ranking engine, loading it on first use"""
+    global _ranking_engine
+    with _ranking_engine_lock:
+        if _ranking_engine is None:
+            _ranking_engine = RankingEngine(os.path.join(app.config['DATA_DIR'], 'ranking'))
+        return _ranking_engine
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+def get_result_store():
+    """Return the shared parse result store, opening it on first use"""
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            _result_store = ResultStore(os.path.join(app.config['DATA_DIR'], 'results.db'))
+        return _result_store
+
+_skill_bitmap = None
+_skill_bitmap_lock = threading.Lock()
+
+def get_skill_bitmap():
+    """Return the shared skill bitmap, seeding its vocabulary from the keyword files"""
+    global _skill_bitmap
+    with _skill_bitmap_lock:
+        if _skill_bitmap is None:
+            technical_skills, functional_skills, domain_skills = load_skills_keywords()
+            _skill_bitmap = SkillBitmap(os.path.join(app.config['DATA_DIR'], 'skill_bitmap'), keywords={
+                'Technical Skills': technical_skills,
+                'Functional Skills': functional_skills,
+                'Domain Skills': domain_skills,
+            })
+            # Results stored before the bitmap existed are encoded once on first use
+            store = get_result_store()
+            if len(_skill_bitmap) < store.count():
+                batch = [(record['document_id'], record['result'].get('skills')) for record in store.iter_results()]
+                _skill_bitmap.add_many(batch)
+                print(f"DEBUG: Encoded {len(batch)} stored results into the skill bitmap")
+        return _skill_bitmap
+
+_triage_log = None
+_triage_log_lock = threading.Lock()
+
+def get_triage_log():
+    """Return the shared upload triage decision log"""
+    global _triage_log
+    with _triage_log_lock:
+        if _triage_log is None:
+            _triage_log = TriageLog(os.path.join(app.config['DATA_DIR'], 'triage.jsonl'))
+        return _triage_log
+
+def ingest_parsed_resume(doc_id, text, resume_data, source_file=None, file_type=None, signature=None,
+                         hints=None):
+    """Persist a parse result and add it to the duplicate, search and ranking indexes"""
+    get_result_store().save_result(doc_id, resume_data, source_file=source_file, file_type=file_type,
+                                   fields_version=fields_version(resume_data.get('keyword_profile'), hints),
+                                   text_hash=text_hash(text))
+    if app.config['TEXT_STORE_ENABLED']:
+        get_text_store().put(text, doc_id, hints=hints)
+    get_near_duplicate_index().add(doc_id, text=text, signature=signature)
+    get_search_index().add_document(doc_id, text, resume_data)
+    get_ranking_engine().add(doc_id, text, resume_data['skills'])
+    get_skill_bitmap().add(doc_id, resume_data['skills'])
+
+def ingest_parsed_resumes(batch):
+    """Persist and index a batch of (doc_id, text, resume_data, source_file, file_type, hints) tuples,
+    one transaction per store"""
+    get_result_store().save_results([(doc_id, resume_data, source_file, file_type,
+                                      fields_version(resume_data.get('keyword_profile'), hints), text_hash(text))
+                                     for doc_id, text, resume_data, source_file, file_type, hints in batch])
+    if app.config['TEXT_STORE_ENABLED']:
+        text_store = get_text_store()
+        for doc_id, text, _, _, _, hints in batch:
+            text_store.put(text, doc_id, hints=hints)
+    near_duplicate_index = get_near_duplicate_index()
+    for doc_id, text, _, _, _, _ in batch:
+        near_duplicate_index.add(doc_id, text=text)
+    get_search_index().add_documents([(doc_id, text, resume_data) for doc_id, text, resume_data, _, _, _ in batch])
+    get_ranking_engine().add_many([(doc_id, text, resume_data['skills'])
+                                   for doc_id, text, resume_data, _, _, _ in batch])
+    get_skill_bitmap().add_many([(doc_id, resume_data['skills']) for doc_id, _, resume_data, _, _, _ in batch])
+
+_quarantine = None
+_quarantine_lock = threading.Lock()
+
+def get_quarantine():
+    """Return the bounded store of slow request inputs and their traces"""
+    global _quarantine
+    with _quarantine_lock:
+        if _quarantine is None:
+            _quarantine = SlowRequestQuarantine(
+                os.path.join(app.config['DATA_DIR'], 'quarantine'),
+                max_entries=app.config['QUARANTINE_MAX_ENTRIES'],
+                max_bytes=app.config['QUARANTINE_MAX_BYTES'])
+        return _quarantine
+
+_admission = None
+_rate_limiter = None
+_admission_lock = threading.Lock()
+
+def get_admission_control():
+    """Return the process-wide admission controller and per-client rate limiter"""
+    global _admission, _rate_limiter
+    with _admission_lock:
+        if _admission is None:
+            _admission = AdmissionController(
+                app.config['ADMISSION_MAX_IN_FLIGHT'],
+                app.config['ADMISSION_MAX_QUEUE'],
+                app.config['ADMISSION_QUEUE_TIMEOUT'])
+            _rate_limiter = TokenBucketLimiter(
+                app.config['RATE_LIMIT_PER_MINUTE'] / 60.0,
+                app.config['RATE_LIMIT_BURST'])
+        return _admission, _rate_limiter
+
+def admission_controlled(endpoint):
+    """Apply per-client rate limits and bounded concurrency before the upload is read"""
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        admission, rate_limiter = get_admission_control()
+        # X-Forwarded-For is set by the client; behind trusted proxies ProxyFix
+        # has already moved the real client address into remote_addr
+        client = request.remote_addr or ''
+        
+        allowed, retry_after = rate_limiter.allow(client)
+        if not allowed:
+            response = jsonify({'error': 'Rate limit exceeded'})
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+        
+        try:
+            admission.acquire()
+        except Overloaded as e:
+            print(f"DEBUG: Rejected request from {client}: {e.reason}")
+            response = jsonify({'error': f'Server overloaded ({e.reason})'})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 503
+        
+        started = time.monotonic()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            admission.release(time.monotonic() - started)
+    return wrapper
+
+@app.after_request
+def add_server_timing(response):
+    """Expose the request's stage spans in a Server-Timing header"""
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
 
 @app.route('/')
 def index():
     return render_template('resume_parser.html')
 
 @app.route('/parse', methods=['POST'])
+@admission_controlled
 def parse_resume_endpoint():
-    if 'file' not in request.files:
+    trace = g.trace = RequestTrace()
+    with trace.span('upload.receive'):
+        files = request.files
+    if 'file' not in files:
         return jsonify({'error': 'No file uploaded'}), 400
     
-    file = request.files['file']
+    file = files['file']
     
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
@@ -1744,7 +2591,13 @@ def parse_resume_endpoint():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type'}), 400
     
+    # Optional keyword profile (keywords/profiles/<name>/) to parse with
+    profile = request.form.get('profile') or request.args.get('profile') or None
+    if not keyword_profile_exists(profile):
+        return jsonify({'error': f"Unknown keyword profile '{profile}'"}), 400
+    
     tmp_file_path = None
+    filename = None
     try:
         # Save file temporarily
         filename = secure_filename(file.filename)
@@ -1756,20 +2609,83 @@ def parse_resume_endpoint():
         tmp_file.close()  # Close the file handle
         
         # Save uploaded file to temporary location
-        file.save(tmp_file_path)
+        with trace.span('upload.save'):
+            file.save(tmp_file_path)
         
-        # Parse the resume
-        resume_data = parse_resume(tmp_file_path, file_extension)
+        # Cheap checks before the expensive extraction path
+        with trace.span('triage'):
+            decision = triage_upload(tmp_file_path, file_extension)
+        get_triage_log().record(filename, decision)
+        if decision['action'] != 'accept':
+            return jsonify({'error': f"Rejected upload: {decision['reason']}", 'triage': decision}), 422
+        file_extension = decision['detected_type']
         
-        if resume_data is None:
+        # Extract text and check it against previously parsed resumes
+        hints = new_document_hints()
+        text = extract_text(tmp_file_path, file_extension, trace, hints)
+        
+        if text is None or not text.strip():
             return jsonify({'error': 'Could not extract text from file'}), 400
         
+        # Identical text was parsed before: return the stored result, unless
+        # extractor code or keyword files changed since (then re-run, reusing
+        # the field cache for the fields that did not change)
+        with trace.span('dedupe.exact'):
+            doc_id = document_id(text)
+            stored = get_result_store().get(doc_id) if app.config['REUSE_STORED_RESULTS'] else None
+            # The document id ignores case, punctuation and layout, which the extractors don't
+            if stored is not None and stored['text_hash'] != text_hash(text):
+                print(f"DEBUG: Stored result for {doc_id} was parsed from differently formatted text")
+                stored = None
+            if stored is not None and stored['result'].get('keyword_profile') != profile:
+                print(f"DEBUG: Stored result for {doc_id} used another keyword profile")
+                stored = None
+            if stored is not None and stored['fields_version'] != fields_version(profile, hints):
+                print(f"DEBUG: Stored result for {doc_id} is stale, parsing again")
+                stored = None
+        if stored is not None:
+            print(f"DEBUG: Returning stored result for {doc_id}")
+            return jsonify(stored['result'])
+        
+        with trace.span('dedupe.near'):
+            signature = minhash_signature(text)
+            matches = get_near_duplicate_index().query(signature=signature, exclude=doc_id)
+        
+        # Parse the resume
+        with trace.span('extractors'):
+            resume_data = parse_text(text, trace=trace, profile=profile, hints=hints)
+        resume_data['document_id'] = doc_id
+        if profile is not None:
+            resume_data['keyword_profile'] = profile
+        if matches:
+            duplicate_id, similarity = matches[0]
+            print(f"DEBUG: Near-duplicate of {duplicate_id} (similarity {similarity:.2f})")
+            resume_data['near_duplicate_of'] = {
+                'document_id': duplicate_id,
+                'similarity': round(similarity, 3)
+            }
+        with trace.span('ingest'):
+            ingest_parsed_resume(doc_id, text, resume_data, filename, file_extension, signature=signature,
+                                 hints=hints)
+        
         return jsonify(resume_data)
     
+    except ParseCancelled as e:
+        return jsonify({'error': f'Parsing aborted: {str(e)}'}), 504
+    
     except Exception as e:
         return jsonify({'error': f'Error processing file: {str(e)}'}), 500
     
     finally:
+        # Keep slow inputs for reproduction before the temporary file is removed
+        elapsed = trace.elapsed()
+        if tmp_file_path and os.path.exists(tmp_file_path) and elapsed > app.config['SLOW_REQUEST_SECONDS']:
+            print(f"WARNING: Slow request ({elapsed:.2f}s) for {filename}")
+            try:
+                get_quarantine().keep(tmp_file_path, filename, trace, elapsed_seconds=round(elapsed, 3))
+            except Exception as e:
+                print(f"WARNING: Could not quarantine slow input: {e}")
+        
         # Clean up temporary file
         if tmp_file_path and os.path.exists(tmp_file_path):
             try:
@@ -1777,5 +2693,144 @@ def parse_resume_endpoint():
             except Exception:
                 pass  # Ignore cleanup errors
 
+@app.route('/search', methods=['GET'])
+def search_endpoint():
+    """Boolean and phrase search over previously parsed resumes"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing query parameter q'}), 400
+    
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    
+    try:
+        return jsonify(get_search_index().search(query, limit=limit, offset=offset))
+    except QuerySyntaxError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
+
+@app.route('/rank', methods=['POST'])
+def rank_endpoint():
+    """Rank parsed resumes against a job description"""
+    payload = request.get_json(silent=True) or {}
+    job_description = (payload.get('job_description') or request.form.get('job_description', '')).strip()
+    if not job_description:
+        return jsonify({'error': 'Missing job_description'}), 400
+    
+    try:
+        top_k = min(int(payload.get('top_k', request.form.get('top_k', 10))), 1000)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    if top_k < 1:
+        return jsonify({'error': 'top_k must be at least 1'}), 400
+    
+    job_skills = extract_skills(job_description)
+    matches = get_ranking_engine().rank(job_description, top_k=top_k, job_skills=job_skills)
+    return jsonify({'top_k': top_k, 'results': matches})
+
+def _query_limits():
+    """Read limit/offset query parameters with sane bounds"""
+    limit = min(int(request.args.get('limit', 50)), 500)
+    offset = max(int(request.args.get('offset', 0)), 0)
+    return limit, offset
+
+@app.route('/candidates', methods=['GET'])
+def candidates_endpoint():
+    """Look up stored parse results by email or phone, or filter them by skill or certification"""
+    try:
+        limit, offset = _query_limits()
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    
+    store = get_result_store()
+    email = request.args.get('email', '').strip()
+    phone = request.args.get('phone', '').strip()
+    skills = [skill for value in request.args.getlist('skill') for skill in value.split(',')]
+    cert_ids = [cert_id for value in request.args.getlist('certification') for cert_id in value.split(',')]
+    try:
+        min_years, max_years = [float(request.args[key]) if request.args.get(key) else None
+                                for key in ('min_years', 'max_years')]
+    except ValueError:
+        return jsonify({'error': 'min_years and max_years must be numbers'}), 400
+    
+    if email:
+        results = store.find_by_email(email, limit=limit)
+    elif phone:
+        results = store.find_by_phone(phone, limit=limit)
+    elif skills and request.args.get('min_match'):
+        try:
+            min_match = int(request.args['min_match'])
+        except ValueError:
+            return jsonify({'error': 'min_match must be an integer'}), 400
+        total, document_ids = get_skill_bitmap().filter(skills, min_match=min_match, limit=limit, offset=offset)
+        results = store.get_many(document_ids)
+        return jsonify({'count': len(results), 'total': total, 'results': results})
+    elif skills:
+        match = request.args.get('match', 'all')
+        if match not in ('all', 'any'):
+            return jsonify({'error': "match must be 'all' or 'any'"}), 400
+        results = store.filter_by_skills(skills, match=match, limit=limit, offset=offset)
+    elif cert_ids:
+        results = store.filter_by_certification(cert_ids, limit=limit, offset=offset)
+    elif min_years is not None or max_years is not None:
+        results = store.find_by_experience(min_years, max_years, limit=limit, offset=offset)
+    else:
+        return jsonify({'error': 'Provide email, phone, skill, certification, min_years or max_years'}), 400
+    
+    return jsonify({'count': len(results), 'results': results})
+
+@app.route('/candidates/<document_id>', methods=['GET'])
+def candidate_endpoint(document_id):
+    """Return one stored parse result"""
+    stored = get_result_store().get(document_id)
+    if stored is None:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify(stored)
+
+@app.route('/skills/stats', methods=['GET'])
+def skill_stats_endpoint():
+    """Most common skills across stored candidates, optionally for one category"""
+    try:
+        top = min(int(request.args.get('top', 20)), 500)
+    except ValueError:
+        return jsonify({'error': 'top must be an integer'}), 400
+    bitmap = get_skill_bitmap()
+    return jsonify({'candidates': len(bitmap),
+                    'skills': bitmap.frequencies(top=top, category=request.args.get('category'))})
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats_endpoint():
+    """Queue depth, in-flight requests and rejection counts for /parse"""
+    admission, rate_limiter = get_admission_control()
+    stats = admission.stats()
+    stats['rejected_rate_limited'] = rate_limiter.rejected
+    return jsonify(stats)
+
+@app.route('/triage/stats', methods=['GET'])
+def triage_stats_endpoint():
+    """Counts of triage decisions since startup, keyed by action and reason"""
+    return jsonify(get_triage_log().stats())
+
+@app.route('/keywords/profiles', methods=['GET'])
+def keyword_profiles_endpoint():
+    """Available keyword profiles and the compiled profiles currently held in memory"""
+    return jsonify({'profiles': list_profiles(KEYWORDS_DIR), 'cache': get_keyword_profile_cache().stats()})
+
+@app.route('/export', methods=['GET'])
+def export_endpoint():
+    """Stream all stored parse results as CSV or JSONL"""
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {sorted(EXPORT_FORMATS)}"}), 400
+    
+    since = request.args.get('since')
+    _, mimetype = EXPORT_FORMATS[export_format]
+    chunks = iter_export(get_result_store(), export_format, since=since)
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=resumes.{export_format}'
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
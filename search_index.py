@@ -0,0 +1,299 @@
+import os
+import re
+import sqlite3
+import threading
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*')
+QUERY_TOKEN_RE = re.compile(r'[\w.]+:"[^"]*"|"[^"]*"|\(|\)|[^\s()"]+')
+FIELD_VALUE_GAP = 100  # Position gap between values of one field, so phrases don't span values
+MAX_QUERY_TOKENS = 200  # Keeps the compiled query within SQLite's compound select and depth limits
+TERM_SQL = 'SELECT doc_num FROM postings WHERE term = ?'
+ALL_DOCS_SQL = 'SELECT doc_num FROM documents'
+NO_DOCS_SQL = 'SELECT doc_num FROM documents WHERE 0'
+# Verified phrase matches of the query being evaluated, per connection
+PHRASE_MATCHES_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS phrase_matches (
+    phrase INTEGER NOT NULL,
+    doc_num INTEGER NOT NULL,
+    PRIMARY KEY (phrase, doc_num)
+) WITHOUT ROWID
+"""
+INDEXED_FIELDS = ['name', 'email', 'phone', 'education', 'skills', 'experience', 'certificates']
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a search query cannot be parsed"""
+
+
+def tokenize(text):
+    """Lowercase word tokens used for both indexing and querying"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _field_values(value):
+    """Flatten a structured parse field into its string values"""
+    if isinstance(value, str):
+        return [] if value in ('Not found', 'None identified') else [value]
+    if isinstance(value, dict):
+        return [item for nested in value.values() for item in _field_values(nested)]
+    if isinstance(value, (list, tuple)):
+        return [item for nested in value for item in _field_values(nested)]
+    if value is None:
+        return []
+    return [str(value)]
+
+
+def _encode_positions(positions):
+    """Delta + varint encode a sorted list of positions"""
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        delta = position - previous
+        previous = position
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def _decode_positions(blob):
+    positions = []
+    value = shift = previous = 0
+    for byte in blob:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        positions.append(previous)
+        value = shift = 0
+    return positions
+
+
+class SearchIndex:
+    """Persistent positional inverted index over parsed resumes.
+
+    Postings are stored per (term, document) in a clustered SQLite table, so
+    looking up a term is a single range scan. Structured fields are indexed
+    under ``field:term`` keys next to the full text.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._phrases = 0  # Phrases registered in phrase_matches by the current query
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_num INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                name TEXT
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_num INTEGER NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (term, doc_num)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_num);
+        """)
+        self._conn.commit()
+
+    def add_document(self, doc_id, text, fields=None):
+        """Index (or re-index) one document's text and structured fields"""
+        self.add_documents([(doc_id, text, fields)])
+
+    def add_documents(self, documents):
+        """Index a batch of (doc_id, text, fields) tuples in one transaction"""
+        with self._lock:
+            with self._conn:
+                for doc_id, text, fields in documents:
+                    self._index_one(doc_id, text, fields or {})
+
+    def _index_one(self, doc_id, text, fields):
+        row = self._conn.execute('SELECT doc_num FROM documents WHERE doc_id = ?', (doc_id,)).fetchone()
+        name = fields.get('name') if isinstance(fields.get('name'), str) else None
+        if row:
+            doc_num = row[0]
+            self._conn.execute('DELETE FROM postings WHERE doc_num = ?', (doc_num,))
+            self._conn.execute('UPDATE documents SET name = ? WHERE doc_num = ?', (name, doc_num))
+        else:
+            doc_num = self._conn.execute(
+                'INSERT INTO documents (doc_id, name) VALUES (?, ?)', (doc_id, name)).lastrowid
+
+        postings = {}
+        for position, token in enumerate(tokenize(text or '')):
+            postings.setdefault(token, []).append(position)
+        for field in INDEXED_FIELDS:
+            position = 0
+            for value in _field_values(fields.get(field)):
+                for token in tokenize(value):
+                    postings.setdefault(f'{field}:{token}', []).append(position)
+                    position += 1
+                position += FIELD_VALUE_GAP
+
+        self._conn.executemany(
+            'INSERT INTO postings (term, doc_num, positions) VALUES (?, ?, ?)',
+            [(term, doc_num, _encode_positions(positions)) for term, positions in postings.items()])
+
+    def remove_document(self, doc_id):
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute('SELECT doc_num FROM documents WHERE doc_id = ?', (doc_id,)).fetchone()
+                if row:
+                    self._conn.execute('DELETE FROM postings WHERE doc_num = ?', (row[0],))
+                    self._conn.execute('DELETE FROM documents WHERE doc_num = ?', (row[0],))
+
+    def search(self, query, limit=20, offset=0):
+        """Evaluate a boolean/phrase query and return matching documents.
+
+        Supports AND, OR, NOT, parentheses, "quoted phrases" and field
+        restrictions such as ``skills:python`` or ``certificates:"aws certified"``.
+        Adjacent terms are combined with AND. The query is compiled to one
+        SQL compound select, so intersections, unions and exclusions are
+        merged by SQLite over the sorted postings; only phrase positions are
+        checked in Python.
+        """
+        tokens = QUERY_TOKEN_RE.findall(query)
+        if not tokens:
+            raise QuerySyntaxError('Empty query')
+        if len(tokens) > MAX_QUERY_TOKENS:
+            raise QuerySyntaxError(f'Query has more than {MAX_QUERY_TOKENS} terms and operators')
+        with self._lock:
+            with self._conn:
+                self._conn.execute(PHRASE_MATCHES_SCHEMA)
+                self._conn.execute('DELETE FROM phrase_matches')
+                self._phrases = 0
+                sql, params, _ = _QueryParser(tokens, self).parse()
+            total = self._conn.execute(f'SELECT count(*) FROM ({sql} ORDER BY 1)', params).fetchone()[0]
+            page = [row[0] for row in self._conn.execute(
+                f'{sql} ORDER BY 1 LIMIT ? OFFSET ?', params + [max(limit, 0), offset])]
+            rows = self._conn.execute(
+                f"SELECT doc_num, doc_id, name FROM documents WHERE doc_num IN ({','.join('?' * len(page))})", page)
+            names = {doc_num: (doc_id, name) for doc_num, doc_id, name in rows}
+        results = [{'document_id': names[doc_num][0], 'name': names[doc_num][1]} for doc_num in page]
+        return {'query': query, 'total': total, 'results': results}
+
+    def _phrase_sql(self, terms):
+        """SQL selecting the documents that contain ``terms`` at consecutive positions"""
+        if len(terms) == 1:
+            return TERM_SQL, [terms[0]]
+        # Candidates have every term; positions are only decoded for those
+        candidates = ' INTERSECT '.join([TERM_SQL] * len(terms))
+        positions = []
+        for term in terms:
+            rows = self._conn.execute(
+                f'SELECT doc_num, positions FROM postings WHERE term = ? AND doc_num IN ({candidates})',
+                [term] + terms)
+            positions.append(dict(rows))
+        matches = []
+        for doc_num, blob in positions[0].items():
+            starts = set(_decode_positions(blob))
+            for offset, term_positions in enumerate(positions[1:], 1):
+                following = set(_decode_positions(term_positions[doc_num]))
+                starts = {start for start in starts if start + offset in following}
+                if not starts:
+                    break
+            if starts:
+                matches.append(doc_num)
+        self._phrases += 1
+        self._conn.executemany('INSERT INTO phrase_matches (phrase, doc_num) VALUES (?, ?)',
+                               [(self._phrases, doc_num) for doc_num in matches])
+        return 'SELECT doc_num FROM phrase_matches WHERE phrase = ?', [self._phrases]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT count(*) FROM documents').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _QueryParser:
+    """Recursive-descent parser compiling a query to a select of doc numbers.
+
+    Each rule returns (sql, params, is_compound).
+    """
+
+    def __init__(self, tokens, index):
+        self.tokens = tokens
+        self.pos = 0
+        self.index = index
+
+    def parse(self):
+        result = self._or_expr()
+        if self.pos < len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected '{self.tokens[self.pos]}'")
+        return result
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    @staticmethod
+    def _combine(left, operator, right):
+        """Compound select of two (sql, params, is_compound) operands.
+
+        Compound operators associate to the left, as the parser folds, so only
+        a compound right operand needs a subquery to keep its grouping. Every
+        operand is ordered by doc_num, which lets SQLite merge them as sorted
+        cursors instead of building temporary tables.
+        """
+        right_sql = f'SELECT doc_num FROM ({right[0]} ORDER BY 1)' if right[2] else right[0]
+        return f'{left[0]} {operator} {right_sql}', left[1] + right[1], True
+
+    def _or_expr(self):
+        result = self._and_expr()
+        while self._peek() == 'OR':
+            self.pos += 1
+            result = self._combine(result, 'UNION', self._and_expr())
+        return result
+
+    def _and_expr(self):
+        result = self._not_expr()
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self.pos += 1
+            if self._peek() == 'NOT':
+                self.pos += 1
+                result = self._combine(result, 'EXCEPT', self._not_expr())
+            else:
+                result = self._combine(result, 'INTERSECT', self._not_expr())
+        return result
+
+    def _not_expr(self):
+        if self._peek() == 'NOT':
+            self.pos += 1
+            return self._combine((ALL_DOCS_SQL, [], False), 'EXCEPT', self._not_expr())
+        return self._primary()
+
+    def _primary(self):
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError('Unexpected end of query')
+        self.pos += 1
+        if token == '(':
+            result = self._or_expr()
+            if self._peek() != ')':
+                raise QuerySyntaxError("Missing ')'")
+            self.pos += 1
+            return result
+        if token in (')', 'AND', 'OR'):
+            raise QuerySyntaxError(f"Unexpected '{token}'")
+
+        field = None
+        match = re.match(r'([\w.]+):(.+)$', token)
+        if match and match.group(1).lower() in INDEXED_FIELDS:
+            field, token = match.group(1).lower(), match.group(2)
+        terms = tokenize(token.strip('"'))
+        if not terms:
+            return NO_DOCS_SQL, [], False
+        if field:
+            terms = [f'{field}:{term}' for term in terms]
+        return self.index._phrase_sql(terms) + (False,)
@@ -0,0 +1,323 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PLACEHOLDER = 'None identified'
+ROW_CHUNK = 65536  # Rows scanned per vectorized step, bounds temporary memory
+INITIAL_ROWS = 1024
+DOC_ID_BYTES = 64  # document_id is a hex sha256
+
+
+class _FileLock:
+    """Exclusive lock on a file, held across processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+class SkillBitmap:
+    """Memory-mapped bitset matrix of candidate skills.
+
+    Every (category, skill) pair gets a vocabulary id, seeded from the keyword
+    files and extended when a resume lists a skill that isn't a keyword. Each
+    candidate is one row of uint64 words with a bit set per skill it has, so
+    overlap filters and frequency counts over the whole corpus are a handful
+    of vectorized NumPy operations on the mapped file instead of string
+    comparisons per stored result.
+
+    New vocabulary is appended to vocab.jsonl and meta.json only holds counts,
+    so a write costs the rows it touches, not the corpus. Writers in several
+    processes (server, watch-folder daemon, backfill) take a lock file and
+    catch up with each other's committed rows before adding their own.
+    """
+
+    def __init__(self, directory, keywords=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, 'meta.json')
+        self._bits_path = os.path.join(directory, 'bits.u64')
+        self._ids_path = os.path.join(directory, 'documents.bin')
+        self._vocab_path = os.path.join(directory, 'vocab.jsonl')
+        self._file_lock = _FileLock(os.path.join(directory, 'writer.lock'))
+        self._vocab = []  # [category, skill_key, display]
+        self._vocab_ids = {}  # (category, skill_key) -> id
+        self._ids_by_skill = {}  # skill_key -> [id, ...] across categories
+        self._rows = 0
+        self._words = 1
+        self._capacity = 0
+        self._doc_rows = {}
+        self._vocab_saved = 0  # Entries of _vocab committed to vocab.jsonl
+        self._vocab_bytes = 0  # Committed length of vocab.jsonl
+        self._meta_stamp = None  # (mtime_ns, size, inode) of meta.json as last read or written
+        with self._file_lock:
+            self._load()
+            for category, values in (keywords or {}).items():
+                for skill in values:
+                    self._intern(category, skill)
+            if len(self._vocab) != self._vocab_saved:
+                self._ensure_shape(max(self._capacity, INITIAL_ROWS), self._words_for(len(self._vocab)))
+                self._save_meta()
+
+    def _load(self):
+        meta = self._read_meta()
+        if meta is not None:
+            if 'vocab' in meta:
+                # Older layout with the whole vocabulary in meta.json; moved out on the next save
+                for category, key, display in meta['vocab']:
+                    self._add_vocab(category, key, display)
+            else:
+                self._read_vocab(meta['vocab_count'], meta['vocab_bytes'])
+            self._rows, self._words, self._capacity = meta['rows'], meta['words'], meta['capacity']
+        self._map()
+        self._read_doc_ids(0)
+
+    def _read_meta(self):
+        """meta.json if it changed since it was last read or written here, else None"""
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._meta_stamp:
+            return None
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self._meta_stamp = stamp
+        return meta
+
+    def _read_vocab(self, count, size):
+        """Read committed vocabulary entries past the ones already loaded"""
+        if count > self._vocab_saved:
+            with open(self._vocab_path, 'rb') as f:
+                f.seek(self._vocab_bytes)
+                for line in f.read(size - self._vocab_bytes).splitlines():
+                    category, key, display = json.loads(line)
+                    self._add_vocab(category, key, display)
+        self._vocab_saved, self._vocab_bytes = count, size
+
+    def _read_doc_ids(self, start):
+        for row, doc_id in enumerate(self._doc_ids[start:self._rows], start):
+            self._doc_rows[doc_id.decode('ascii')] = row
+
+    def _refresh(self):
+        """Catch up with rows and vocabulary committed by another process"""
+        meta = self._read_meta()
+        if meta is None or 'vocab' in meta:
+            return
+        self._read_vocab(meta['vocab_count'], meta['vocab_bytes'])
+        if (meta['words'], meta['capacity']) != (self._words, self._capacity):
+            self._release()
+            self._words, self._capacity = meta['words'], meta['capacity']
+            self._map()
+        start, self._rows = self._rows, meta['rows']
+        self._read_doc_ids(start)
+
+    def _map(self):
+        if self._capacity:
+            self._bits = np.memmap(self._bits_path, dtype='<u8', mode='r+', shape=(self._capacity, self._words))
+            self._doc_ids = np.memmap(self._ids_path, dtype=f'S{DOC_ID_BYTES}', mode='r+',
+                                      shape=(self._capacity,))
+        else:
+            self._bits = np.zeros((0, self._words), dtype='<u8')
+            self._doc_ids = np.zeros(0, dtype=f'S{DOC_ID_BYTES}')
+
+    @staticmethod
+    def _words_for(vocab_size):
+        return max(1, -(-vocab_size // 64))
+
+    def _ensure_shape(self, capacity, words):
+        """Grow the mapped files to hold ``capacity`` rows of ``words`` words"""
+        if capacity <= self._capacity and words <= self._words:
+            return
+        capacity = max(capacity, self._capacity)
+        if words > self._words:
+            # Vocabulary outgrew the row width: rewrite with room to spare
+            words = max(words, self._words * 2)
+            old = np.array(self._bits[:self._rows])
+            tmp_path = self._bits_path + '.tmp'
+            resized = np.memmap(tmp_path, dtype='<u8', mode='w+', shape=(capacity, words))
+            resized[:self._rows, :self._words] = old
+            resized.flush()
+            del resized
+            self._release()
+            os.replace(tmp_path, self._bits_path)
+        else:
+            self._release()
+            with open(self._bits_path, 'ab') as f:
+                f.truncate(capacity * words * 8)
+        with open(self._ids_path, 'ab') as f:
+            f.truncate(capacity * DOC_ID_BYTES)
+        self._capacity, self._words = capacity, words
+        self._map()
+
+    def _release(self):
+        if isinstance(self._bits, np.memmap):
+            self._bits.flush()
+            self._doc_ids.flush()
+        self._bits = self._doc_ids = None
+
+    def _save_meta(self):
+        """Append new vocabulary, then commit it with the row count in meta.json"""
+        if len(self._vocab) > self._vocab_saved:
+            appended = b''.join(json.dumps(entry).encode('utf-8') + b'\n'
+                                for entry in self._vocab[self._vocab_saved:])
+            with open(self._vocab_path, 'ab') as f:
+                # Drop anything past the last commit, e.g. from a writer that crashed
+                f.truncate(self._vocab_bytes)
+                f.write(appended)
+            self._vocab_saved, self._vocab_bytes = len(self._vocab), self._vocab_bytes + len(appended)
+        tmp_path = self._meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': self._rows, 'words': self._words, 'capacity': self._capacity,
+                       'vocab_count': self._vocab_saved, 'vocab_bytes': self._vocab_bytes}, f)
+        os.replace(tmp_path, self._meta_path)
+        stat = os.stat(self._meta_path)
+        self._meta_stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _add_vocab(self, category, key, display):
+        skill_id = len(self._vocab)
+        self._vocab.append([category, key, display])
+        self._vocab_ids[(category, key)] = skill_id
+        self._ids_by_skill.setdefault(key, []).append(skill_id)
+        return skill_id
+
+    def _intern(self, category, skill):
+        key = skill.strip().lower()
+        skill_id = self._vocab_ids.get((category, key))
+        if skill_id is None:
+            skill_id = self._add_vocab(category, key, skill.strip().title() if skill.islower() else skill.strip())
+        return skill_id
+
+    def add(self, document_id, skills):
+        """Set the skill bits for one candidate (replacing any previous row)"""
+        self.add_many([(document_id, skills)])
+
+    def add_many(self, batch):
+        """Set skill bits for (document_id, skills_table) pairs, then commit once"""
+        with self._lock, self._file_lock:
+            self._refresh()
+            encoded = []
+            for document_id, skills in batch:
+                ids = [self._intern(category, skill)
+                       for category, values in (skills or {}).items()
+                       for skill in values if skill and skill != PLACEHOLDER]
+                encoded.append((document_id, ids))
+
+            new_rows = sum(1 for document_id, _ in encoded if document_id not in self._doc_rows)
+            capacity = max(INITIAL_ROWS, self._capacity)
+            while capacity < self._rows + new_rows:
+                capacity *= 2
+            self._ensure_shape(capacity, self._words_for(len(self._vocab)))
+
+            for document_id, ids in encoded:
+                row = self._doc_rows.get(document_id)
+                if row is None:
+                    row = self._rows
+                    self._rows += 1
+                    self._doc_rows[document_id] = row
+                    self._doc_ids[row] = document_id.encode('ascii')
+                words = np.zeros(self._words, dtype='<u8')
+                for skill_id in ids:
+                    words[skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+                self._bits[row] = words
+            self._bits.flush()
+            self._doc_ids.flush()
+            # Row count in meta.json is the commit point; rows past it are ignored on load
+            self._save_meta()
+
+    def _query_masks(self, skills, categories):
+        """Per query skill, a (word_index, mask) list covering its ids in the allowed categories"""
+        masks = []
+        for skill in skills:
+            word_masks = {}
+            for skill_id in self._ids_by_skill.get(skill.strip().lower(), []):
+                if categories and self._vocab[skill_id][0] not in categories:
+                    continue
+                word_masks[skill_id >> 6] = word_masks.get(skill_id >> 6, 0) | (1 << (skill_id & 63))
+            masks.append(word_masks)
+        return masks
+
+    def filter(self, skills, min_match=None, categories=None, limit=50, offset=0):
+        """Candidates having at least ``min_match`` of ``skills`` (default: all of them).
+
+        Returns ``(total, document_ids)`` with matches ordered by the number of
+        matching skills, then by ingest order.
+        """
+        skills = list(dict.fromkeys(skill.strip().lower() for skill in skills if skill.strip()))
+        if not skills:
+            return 0, []
+        min_match = len(skills) if min_match is None else max(1, min_match)
+        with self._lock:
+            self._refresh()
+            masks = self._query_masks(skills, categories)
+            masks = [word_masks for word_masks in masks if word_masks]
+            if len(masks) < min_match:
+                return 0, []
+            columns = sorted({word for word_masks in masks for word in word_masks})
+            column_index = {word: i for i, word in enumerate(columns)}
+            dense_masks = np.zeros((len(masks), len(columns)), dtype='<u8')
+            for i, word_masks in enumerate(masks):
+                for word, mask in word_masks.items():
+                    dense_masks[i, column_index[word]] = mask
+
+            counts = np.empty(self._rows, dtype=np.uint16)
+            for start in range(0, self._rows, ROW_CHUNK):
+                block = self._bits[start:min(start + ROW_CHUNK, self._rows), columns]
+                # (rows, 1, cols) & (1, skills, cols) -> any bit per skill -> skills matched per row
+                hits = (block[:, None, :] & dense_masks[None, :, :]).any(axis=2)
+                counts[start:start + len(block)] = hits.sum(axis=1)
+
+            matched = np.flatnonzero(counts >= min_match)
+            order = matched[np.argsort(-counts[matched].astype(np.int32), kind='stable')]
+            page = order[offset:offset + limit]
+            return len(matched), [self._doc_ids[row].decode('ascii') for row in page]
+
+    def frequencies(self, top=20, category=None):
+        """Most common skills across all candidates as [{skill, category, count}]"""
+        with self._lock:
+            self._refresh()
+            totals = np.zeros(self._words * 64, dtype=np.int64)
+            for start in range(0, self._rows, ROW_CHUNK):
+                block = np.ascontiguousarray(self._bits[start:min(start + ROW_CHUNK, self._rows)])
+                # Little-endian words unpacked little-bit-first put skill id i at column i
+                totals += np.unpackbits(block.view(np.uint8), axis=1, bitorder='little').sum(axis=0, dtype=np.int64)
+            totals = totals[:len(self._vocab)]
+            if category:
+                allowed = np.array([entry[0] == category for entry in self._vocab], dtype=bool)
+                totals = np.where(allowed, totals, 0)
+            ranked = np.argsort(-totals, kind='stable')[:top]
+            return [{'skill': self._vocab[i][2], 'category': self._vocab[i][0], 'count': int(totals[i])}
+                    for i in ranked if totals[i] > 0]
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return self._rows
@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TIME_LIMIT = 2.0  # Seconds per extractor per input
+DEFAULT_MEMORY_LIMIT_MB = 256  # Peak Python allocation per extractor per input
+DEFAULT_MEMORY_TIMEOUT = 60.0  # Seconds allowed for the traced run
+MEGABYTE = 1024 * 1024
+
+
+def text_cases(scale=1.0):
+    """Pathological plain-text inputs as (name, text) pairs"""
+    n = max(1, int(MEGABYTE * scale))
+    return [
+        ('long_line_letters', 'a' * n),
+        ('long_line_words', 'word ' * (n // 5)),
+        ('whitespace_run', ' ' * n),
+        ('tab_newline_run', '\t \n' * (n // 3)),
+        ('blank_lines', '\n' * n),
+        ('at_signs', '@' * (n // 10)),
+        ('at_separated', 'a@' * (n // 20)),
+        ('email_no_tld', 'a' * (n // 10) + '@' + 'b' * (n // 10)),
+        ('email_spaced', 'john . smith @ ' * (n // 150) + 'example'),
+        ('email_like_dots', 'a.' * (n // 20) + '@x'),
+        ('digit_run', '1' * (n // 10)),
+        ('digit_space_run', '1 ' * (n // 10)),
+        ('phone_punctuation', '(1)-.' * (n // 50)),
+        ('phone_candidates', '+1 415 555 0132, ' * (n // 170)),
+        ('date_ranges', 'Jan 2020 - Feb 2021 ' * (n // 200)),
+        ('section_headers', 'Experience\nEducation\nSkills\nCertifications\n' * (n // 400)),
+        ('certificate_lines', 'Certified AWS Solutions Architect (2020) - Amazon ' * (n // 500)),
+        ('skill_commas', 'Skills\n' + 'python, ' * (n // 80)),
+        ('bullets', '• ' * (n // 20)),
+        ('capitalized_words', 'John Smith ' * (n // 110)),
+        ('unicode_mixed', 'Ünïcødé résumé ☃ ' * (n // 170)),
+    ]
+
+
+def _write_docx(path, build):
+    from docx import Document
+    document = Document()
+    build(document)
+    document.save(path)
+
+
+def _nested_tables(depth):
+    def build(document):
+        cell = document.add_table(rows=1, cols=1).cell(0, 0)
+        for level in range(depth):
+            cell.paragraphs[0].text = f'Level {level} john{level}@example.com'
+            cell = cell.add_table(rows=1, cols=1).cell(0, 0)
+    return build
+
+
+def _wide_table(rows, cols):
+    def build(document):
+        table = document.add_table(rows=rows, cols=cols)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f'Email {r}-{c} a{r}@b.com'
+    return build
+
+
+def _many_paragraphs(count):
+    def build(document):
+        for i in range(count):
+            document.add_paragraph(f'Paragraph {i} with some python, sql and 415-555-{i % 10000:04d}')
+    return build
+
+
+def file_cases(directory, scale=1.0):
+    """Pathological DOCX inputs as (name, path) pairs"""
+    cases = [
+        ('docx_nested_tables', _nested_tables(max(2, int(50 * scale)))),
+        ('docx_wide_table', _wide_table(max(2, int(200 * scale)), 10)),
+        ('docx_many_paragraphs', _many_paragraphs(max(2, int(20000 * scale)))),
+    ]
+    paths = []
+    for name, build in cases:
+        path = os.path.join(directory, name + '.docx')
+        _write_docx(path, build)
+        paths.append((name, path))
+    return paths
+
+
+def _run_case(conn, kind, name, payload):
+    """Child process: run one stage over one input, reporting time and peak memory"""
+    import resume_parser
+    registry = resume_parser.EXTRACTOR_REGISTRY
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            if kind == 'extract_text':
+                def stage():
+                    resume_parser.extract_text(payload, 'docx')
+            else:
+                # Intermediates and upstream outputs are computed outside the measurement
+                entries = registry.plan([kind])
+                target = entries.pop(kind)
+                values = {'text': payload, 'profile': None, 'hints': None}
+                while entries:
+                    for entry_name, entry in list(entries.items()):
+                        if all(key in values for key in entry['inputs']):
+                            values[entry_name] = entry['func'](**{key: values[key] for key in entry['inputs']})
+                            del entries[entry_name]
+                arguments = {key: values[key] for key in target['inputs']}
+
+                def stage():
+                    target['func'](**arguments)
+
+            # Time an untraced run; tracemalloc slows allocation-heavy code several times over
+            started = time.perf_counter()
+            stage()
+            conn.send(('seconds', time.perf_counter() - started))
+            tracemalloc.start()
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+            conn.send(('peak_mb', peak / MEGABYTE))
+        except Exception as e:
+            conn.send(('error', f'{type(e).__name__}: {e}'))
+
+
+def run_case(kind, name, payload, time_limit, memory_timeout, context=None):
+    """Run one case in a child process, killing it if it exceeds the time limit.
+
+    The traced run for memory gets its own, longer allowance; if it doesn't
+    finish the peak is reported as unknown rather than as a failure.
+    """
+    context = context or multiprocessing.get_context()
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(child, kind, name, payload))
+    process.start()
+    child.close()
+    outcome = {'seconds': None, 'peak_mb': None, 'error': None}
+    # Allowance for setup (intermediates, DOCX generation); the recorded time covers only the stage
+    for key, timeout in (('seconds', time_limit * 2 + 10), ('peak_mb', memory_timeout)):
+        if not parent.poll(timeout):
+            if key == 'seconds':
+                outcome['error'] = 'timed out'
+            break
+        try:
+            received, value = parent.recv()
+        except EOFError:
+            outcome['error'] = 'child process died'
+            break
+        outcome[received] = value
+        if received == 'error' or (key == 'seconds' and value > time_limit):
+            break
+    process.kill()
+    process.join()
+    return outcome
+
+def main():
+    parser = argparse.ArgumentParser(description='Run extractors against pathological inputs and enforce time/memory bounds')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT, help='Seconds per extractor per input')
+    parser.add_argument('--memory-limit-mb', type=float, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help='Peak traced allocation per extractor per input')
+    parser.add_argument('--memory-timeout', type=float, default=DEFAULT_MEMORY_TIMEOUT,
+                        help='Seconds allowed for the (slower) traced run that measures memory')
+    parser.add_argument('--scale', type=float, default=1.0, help='Input size multiplier (1.0 = megabyte inputs)')
+    parser.add_argument('--only', action='append', help='Limit to these extractors (repeatable)')
+    args = parser.parse_args()
+
+    # Forked children skip re-importing the parser per case; spawn where fork isn't available
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    import resume_parser
+    extractors = args.only or resume_parser.EXTRACTOR_REGISTRY.outputs()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = [(extractor, name, text) for name, text in text_cases(args.scale) for extractor in extractors]
+        jobs += [('extract_text', name, path) for name, path in file_cases(directory, args.scale)]
+        for kind, name, payload in jobs:
+            outcome = run_case(kind, name, payload, args.time_limit, args.memory_timeout, context)
+            failed = (outcome['error'] is not None
+                      or outcome['seconds'] > args.time_limit
+                      or (outcome['peak_mb'] or 0) > args.memory_limit_mb)
+            results.append(dict(outcome, stage=kind, case=name, failed=failed))
+            status = 'FAIL' if failed else 'ok'
+            memory = 'memory not measured' if outcome['peak_mb'] is None else f"{outcome['peak_mb']:.1f}MB"
+            detail = outcome['error'] or f"{outcome['seconds']:.3f}s {memory}"
+            print(f"{status:4} {kind:20} {name:22} {detail}")
+
+    print()
+    print('Worst case per stage:')
+    for stage in dict.fromkeys(result['stage'] for result in results):
+        stage_results = [r for r in results if r['stage'] == stage]
+        worst = max(stage_results, key=lambda r: float('inf') if r['seconds'] is None else r['seconds'])
+        peak = max(stage_results, key=lambda r: r['peak_mb'] or 0)
+        seconds = 'timed out' if worst['seconds'] is None else f"{worst['seconds']:.3f}s"
+        print(f"  {stage:20} slowest {worst['case']} ({seconds}), "
+              f"largest {peak['case']} ({peak['peak_mb'] or 0:.1f}MB)")
+
+    failures = [r for r in results if r['failed']]
+    print(f"\n{len(results) - len(failures)} passed, {len(failures)} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
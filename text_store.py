@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+
+from near_duplicate import document_id, text_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    document_id TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    stored_at TEXT NOT NULL,
+    hints TEXT,
+    text_hash TEXT
+) WITHOUT ROWID;
+"""
+
+COMPRESSION_LEVEL = 6
+CODECS = {'zlib': zlib.decompress}
+
+
+class TextStore:
+    """Compressed extracted text of every ingested resume, addressed by document id.
+
+    The document id is the hash of the normalized text, so a resume uploaded
+    again (or as another file type) is stored once. The text is kept as the
+    extractors received it, together with the contact hints read from the
+    file's links and metadata, which lets them run again without decoding
+    the original PDF or DOCX. Like the stored parse result, the entry of a
+    document id is that of its latest upload.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(texts)')}
+        # Stores created before hints and text hashes were kept
+        if 'hints' not in columns:
+            conn.execute('ALTER TABLE texts ADD COLUMN hints TEXT')
+        if 'text_hash' not in columns:
+            conn.execute('ALTER TABLE texts ADD COLUMN text_hash TEXT')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, text, doc_id=None, hints=None):
+        """Store ``text`` and its hints; returns the id.
+
+        The document id ignores case, punctuation and line breaks, so a later
+        upload with the same id may differ in what the extractors read; it
+        replaces the stored text and hints, as it replaces the parse result.
+        """
+        doc_id = doc_id or document_id(text)
+        raw_hash = text_hash(text)
+        hints_json = json.dumps(hints) if hints else None
+        conn = self._connect()
+        row = conn.execute('SELECT text_hash, hints FROM texts WHERE document_id = ?', (doc_id,)).fetchone()
+        if row == (raw_hash, hints_json):
+            return doc_id
+        raw = text.encode('utf-8')
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO texts (document_id, codec, size, data, stored_at, hints, text_hash) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (doc_id, 'zlib', len(raw), zlib.compress(raw, COMPRESSION_LEVEL),
+                 datetime.now(timezone.utc).isoformat(timespec='seconds'), hints_json, raw_hash))
+        return doc_id
+
+    @staticmethod
+    def _decode(codec, data):
+        return CODECS[codec](data).decode('utf-8')
+
+    def get(self, doc_id):
+        row = self._connect().execute(
+            'SELECT codec, data FROM texts WHERE document_id = ?', (doc_id,)).fetchone()
+        return self._decode(*row) if row else None
+
+    def get_many(self, doc_ids):
+        """{document_id: text} for the ids that are stored"""
+        if not doc_ids:
+            return {}
+        placeholders = ','.join('?' * len(doc_ids))
+        rows = self._connect().execute(
+            f'SELECT document_id, codec, data FROM texts WHERE document_id IN ({placeholders})',
+            list(doc_ids)).fetchall()
+        return {doc_id: self._decode(codec, data) for doc_id, codec, data in rows}
+
+    def get_hints(self, doc_ids):
+        """{document_id: hints} for the stored ids that have hints"""
+        if not doc_ids:
+            return {}
+        placeholders = ','.join('?' * len(doc_ids))
+        rows = self._connect().execute(
+            f'SELECT document_id, hints FROM texts WHERE document_id IN ({placeholders}) AND hints IS NOT NULL',
+            list(doc_ids)).fetchall()
+        return {doc_id: json.loads(hints) for doc_id, hints in rows}
+
+    def __contains__(self, doc_id):
+        return self._connect().execute(
+            'SELECT 1 FROM texts WHERE document_id = ?', (doc_id,)).fetchone() is not None
+
+    def stats(self):
+        count, size, stored = self._connect().execute(
+            'SELECT count(*), coalesce(sum(size), 0), coalesce(sum(length(data)), 0) FROM texts').fetchone()
+        return {'texts': count, 'bytes': size, 'compressed_bytes': stored}
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,151 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+import zipfile
+
+MAX_PDF_PAGES = 50
+MAX_DOCX_MEMBERS = 1000
+MAX_DOCX_UNCOMPRESSED = 64 * 1024 * 1024  # 64MB of XML is far beyond any real resume
+MAX_COMPRESSION_RATIO = 100  # Members inflating more than this are treated as zip bombs
+TEXT_SNIFF_BYTES = 8192
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # Legacy .doc and password-protected OOXML
+
+PDF_COUNT_RE = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b')
+
+
+def _decision(action, reason, detected_type=None, **details):
+    return {'action': action, 'reason': reason, 'detected_type': detected_type, 'details': details}
+
+
+def sniff_type(head):
+    """Detect the real file type from its leading bytes"""
+    if head.startswith(PDF_MAGIC):
+        return 'pdf'
+    if head.startswith(ZIP_MAGIC):
+        return 'zip'
+    if head.startswith(OLE_MAGIC):
+        return 'ole'
+    if b'\x00' in head:
+        return 'binary'
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sniffed block is fine
+        if e.start < len(head) - 4:
+            return 'binary'
+    return 'txt'
+
+
+def inspect_pdf(file_path):
+    """Check encryption, page count and text layer without parsing the PDF"""
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data.find(b'/Encrypt') != -1:
+                return _decision('reject', 'encrypted_pdf', 'pdf')
+
+            counts = [int(a or b) for a, b in PDF_COUNT_RE.findall(data)]
+            pages = max(counts) if counts else None
+            if pages is not None and pages > MAX_PDF_PAGES:
+                return _decision('reject', 'too_many_pages', 'pdf', pages=pages)
+
+            # Fonts may hide inside compressed object streams, so only call a
+            # PDF image-only when everything is visible and no font is present.
+            has_fonts = data.find(b'/Font') != -1
+            has_images = data.find(b'/Image') != -1
+            has_object_streams = data.find(b'/ObjStm') != -1
+            if has_images and not has_fonts and not has_object_streams:
+                return _decision('reject', 'image_only_pdf', 'pdf', pages=pages)
+
+    return _decision('accept', 'ok', 'pdf', pages=pages)
+
+
+def inspect_docx(file_path):
+    """Check a DOCX zip's central directory for bombs without inflating it"""
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            members = archive.infolist()
+    except zipfile.BadZipFile:
+        return _decision('reject', 'corrupt_zip', 'zip')
+
+    if len(members) > MAX_DOCX_MEMBERS:
+        return _decision('reject', 'too_many_members', 'zip', members=len(members))
+    names = {member.filename for member in members}
+    if 'word/document.xml' not in names:
+        return _decision('reject', 'not_a_docx', 'zip', members=len(members))
+
+    total = 0
+    for member in members:
+        total += member.file_size
+        ratio = member.file_size / max(member.compress_size, 1)
+        if ratio > MAX_COMPRESSION_RATIO and member.file_size > 1024 * 1024:
+            return _decision('reject', 'suspicious_compression_ratio', 'docx',
+                             member=member.filename, ratio=round(ratio))
+    if total > MAX_DOCX_UNCOMPRESSED:
+        return _decision('reject', 'uncompressed_size_too_large', 'docx', uncompressed=total)
+
+    return _decision('accept', 'ok', 'docx', members=len(members), uncompressed=total)
+
+
+def triage_upload(file_path, declared_extension):
+    """Decide whether an upload should be parsed, and as which type.
+
+    Returns a decision dict with ``action`` ('accept' or 'reject'), a
+    ``reason``, the ``detected_type`` and details. Files whose content doesn't
+    match their extension are routed to the parser for their real type.
+    """
+    started = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        head = f.read(TEXT_SNIFF_BYTES)
+
+    sniffed = sniff_type(head)
+    if not head:
+        decision = _decision('reject', 'empty_file')
+    elif sniffed == 'pdf':
+        decision = inspect_pdf(file_path)
+    elif sniffed == 'zip':
+        decision = inspect_docx(file_path)
+    elif sniffed == 'ole':
+        decision = _decision('reject', 'encrypted_or_legacy_doc', 'ole')
+    elif sniffed == 'txt':
+        decision = _decision('accept', 'ok', 'txt')
+    else:
+        decision = _decision('reject', 'binary_content', sniffed)
+
+    if decision['action'] == 'accept' and decision['detected_type'] != declared_extension:
+        decision['reason'] = 'routed_by_content'
+        decision['details']['declared_type'] = declared_extension
+
+    decision['file_size'] = os.path.getsize(file_path)
+    decision['elapsed_us'] = int((time.perf_counter() - started) * 1e6)
+    print(f"DEBUG: Triage {decision['action']} ({decision['reason']}) in {decision['elapsed_us']}us")
+    return decision
+
+
+class TriageLog:
+    """Append-only JSONL record of triage decisions plus in-memory counters"""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.counts = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, filename, decision):
+        entry = dict(decision, filename=filename, timestamp=time.time())
+        key = f"{decision['action']}:{decision['reason']}"
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
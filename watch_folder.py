@@ -0,0 +1,307 @@
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import shutil
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+IN_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWaker:
+    """Blocks until something changes in the watched directories (Linux only).
+
+    Events are only used as a wake-up signal; the directory scan still decides
+    what is ready, so missed or coalesced events are harmless.
+    """
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                      IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 64 * IN_EVENT_HEADER.size + 4096):
+                    pass
+            except BlockingIOError:
+                pass
+        return bool(readable)
+
+
+class PollingWaker:
+    """Fallback when inotify isn't available: just sleep between scans"""
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return False
+
+
+def process_file(file_path, profile=None):
+    """Worker entry point: triage and parse one file, returning an outcome dict"""
+    import contextlib
+    import io
+    import resume_parser
+    from near_duplicate import document_id
+    from upload_triage import triage_upload
+
+    started = time.monotonic()
+    extension = file_path.rsplit('.', 1)[-1].lower()
+    # The extractors log verbosely; keep the daemon output to one line per file
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            decision = triage_upload(file_path, extension)
+            if decision['action'] != 'accept':
+                return {'ok': False, 'error': f"Rejected upload: {decision['reason']}", 'triage': decision,
+                        'seconds': time.monotonic() - started}
+            hints = resume_parser.new_document_hints()
+            text = resume_parser.extract_text(file_path, decision['detected_type'], hints=hints)
+            if text is None or not text.strip():
+                return {'ok': False, 'error': 'Could not extract text from file',
+                        'seconds': time.monotonic() - started}
+            result = resume_parser.parse_text(text, profile=profile, hints=hints)
+            result['document_id'] = document_id(text)
+            if profile is not None:
+                result['keyword_profile'] = profile
+        except Exception as e:
+            return {'ok': False, 'error': f'Error processing file: {str(e)}', 'seconds': time.monotonic() - started}
+    return {'ok': True, 'result': result, 'text': text, 'hints': hints, 'file_type': decision['detected_type'],
+            'seconds': time.monotonic() - started}
+
+
+def _unique_path(directory, name):
+    """A path in ``directory`` for ``name`` that doesn't overwrite an existing file"""
+    base, ext = os.path.splitext(name)
+    candidate = os.path.join(directory, name)
+    counter = 1
+    while os.path.exists(candidate) or os.path.exists(candidate + '.json'):
+        candidate = os.path.join(directory, f'{base}.{counter}{ext}')
+        counter += 1
+    return candidate
+
+
+def _atomic_move(src, dst):
+    """Rename within a filesystem; copy to a temp name then rename across filesystems"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        tmp = dst + '.partial'
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+        os.unlink(src)
+
+
+def _future_outcome(future):
+    """The outcome of a finished ``process_file`` future, or a failure if its worker died"""
+    try:
+        return future.result()
+    except Exception as e:  # Worker process died
+        return {'ok': False, 'error': f'Worker failed: {e}', 'seconds': 0.0}
+
+
+def _write_json_atomic(path, payload):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class WatchFolderDaemon:
+    """Watches intake directories and parses files once they stop changing.
+
+    A file is considered complete when its size and mtime have not changed
+    for ``settle_seconds``. Completed files go to a process pool; afterwards
+    the file and its JSON result are atomically moved into the done or failed
+    directory.
+
+    With ``ingest`` the daemon writes the result store and indexes under
+    DATA_DIR, which are not safe to share with a running server.
+    """
+
+    def __init__(self, watch_dirs, done_dir, failed_dir, workers=None, settle_seconds=2.0,
+                 poll_interval=1.0, report_interval=30.0, ingest=False):
+        import resume_parser
+        self.watch_dirs = [os.path.abspath(d) for d in watch_dirs]
+        self.done_dir = os.path.abspath(done_dir)
+        self.failed_dir = os.path.abspath(failed_dir)
+        self.allowed_extensions = resume_parser.ALLOWED_EXTENSIONS
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.report_interval = report_interval
+        self.ingest = ingest
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.candidates = {}  # path -> (size, mtime_ns, unchanged_since)
+        self.unmovable = {}  # path -> (size, mtime_ns) of files that could not be moved out
+        self.in_flight = {}  # future -> path
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._completed_since_report = 0
+        for directory in self.watch_dirs + [self.done_dir, self.failed_dir]:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            self.waker = InotifyWaker(self.watch_dirs)
+            print(f"DEBUG: Watching {self.watch_dirs} with inotify")
+        except (OSError, AttributeError):
+            self.waker = PollingWaker()
+            print(f"DEBUG: Watching {self.watch_dirs} by polling every {poll_interval}s")
+
+    def scan(self):
+        """Update debounce state and return files that are ready to process"""
+        now = time.monotonic()
+        busy = set(self.in_flight.values())
+        seen = set()
+        ready = []
+        for directory in self.watch_dirs:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False) or entry.name.startswith('.'):
+                        continue
+                    if entry.name.rsplit('.', 1)[-1].lower() not in self.allowed_extensions:
+                        continue
+                    path = entry.path
+                    seen.add(path)
+                    if path in busy:
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if self.unmovable.get(path) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    previous = self.candidates.get(path)
+                    if previous is None or previous[:2] != (stat.st_size, stat.st_mtime_ns):
+                        self.candidates[path] = (stat.st_size, stat.st_mtime_ns, now)
+                    elif now - previous[2] >= self.settle_seconds:
+                        ready.append(path)
+        for path in list(self.candidates):
+            if path not in seen:
+                del self.candidates[path]
+        for path in list(self.unmovable):
+            if path not in seen:
+                del self.unmovable[path]
+        return ready
+
+    def finish(self, path, outcome):
+        """Move a processed file and its JSON result into done/ or failed/"""
+        if outcome['ok'] and self.ingest:
+            import resume_parser
+            try:
+                resume_parser.ingest_parsed_resume(outcome['result']['document_id'], outcome['text'],
+                                                   outcome['result'], os.path.basename(path),
+                                                   outcome['file_type'], hints=outcome['hints'])
+            except Exception as e:
+                outcome = {'ok': False, 'error': f'Ingest failed: {e}', 'seconds': outcome['seconds']}
+        self.candidates.pop(path, None)
+        try:
+            self._move_out(path, outcome)
+        except OSError as e:
+            # Leave the file in place; it is retried only once it changes
+            print(f"WARNING: Could not move {path}: {e}")
+            try:
+                stat = os.stat(path)
+                self.unmovable[path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                pass
+            if outcome['ok']:
+                outcome = {'ok': False, 'error': f'Could not move file: {e}', 'seconds': outcome['seconds']}
+        if outcome['ok']:
+            self.processed += 1
+        else:
+            self.failed += 1
+        self.busy_seconds += outcome['seconds']
+        self._completed_since_report += 1
+        status = 'done' if outcome['ok'] else f"failed: {outcome['error']}"
+        print(f"DEBUG: {os.path.basename(path)} {status} in {outcome['seconds']:.2f}s")
+
+    def _move_out(self, path, outcome):
+        target_dir = self.done_dir if outcome['ok'] else self.failed_dir
+        target = _unique_path(target_dir, os.path.basename(path))
+        payload = outcome['result'] if outcome['ok'] else {'error': outcome['error'],
+                                                          'triage': outcome.get('triage')}
+        _write_json_atomic(target + '.json', payload)
+        try:
+            _atomic_move(path, target)
+        except OSError:
+            os.unlink(target + '.json')
+            raise
+
+    def report(self):
+        now = time.monotonic()
+        interval = now - self._last_report
+        total = self.processed + self.failed
+        print(f"DEBUG: throughput {self._completed_since_report / interval * 60:.1f} files/min, "
+              f"backlog {len(self.candidates) - len(self.in_flight)} waiting + {len(self.in_flight)} in flight, "
+              f"done {self.processed}, failed {self.failed}, "
+              f"avg {self.busy_seconds / total if total else 0:.2f}s/file")
+        self._last_report = now
+        self._completed_since_report = 0
+
+    def run_once(self):
+        for path in self.scan():
+            future = self.pool.submit(process_file, path)
+            self.in_flight[future] = path
+        for future in [f for f in self.in_flight if f.done()]:
+            path = self.in_flight.pop(future)
+            self.finish(path, _future_outcome(future))
+        if time.monotonic() - self._last_report >= self.report_interval:
+            self.report()
+
+    def run(self):
+        try:
+            while True:
+                self.run_once()
+                # Wake early on filesystem events, but keep scanning while files settle
+                timeout = self.poll_interval if (self.candidates or self.in_flight) else self.report_interval
+                self.waker.wait(min(timeout, self.poll_interval * 5))
+        except KeyboardInterrupt:
+            print("DEBUG: Stopping, waiting for in-flight files")
+            for future, path in list(self.in_flight.items()):
+                self.finish(path, _future_outcome(future))
+            self.report()
+        finally:
+            self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse resumes dropped into watched directories')
+    parser.add_argument('watch_dirs', nargs='+', help='Directories to watch for new resumes')
+    parser.add_argument('--done', required=True, help='Directory for parsed files and their JSON results')
+    parser.add_argument('--failed', required=True, help='Directory for files that could not be parsed')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='Seconds a file must stay unchanged before it is processed')
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    parser.add_argument('--report-interval', type=float, default=30.0)
+    parser.add_argument('--ingest', action='store_true',
+                        help='Also save results to the result store and search/ranking indexes '
+                             '(do not share the data directory with a running server)')
+    parser.add_argument('--data-dir', help='Data directory for --ingest (default: the app setting)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.data_dir:
+        import resume_parser
+        resume_parser.app.config['DATA_DIR'] = os.path.abspath(args.data_dir)
+    WatchFolderDaemon(args.watch_dirs, args.done, args.failed, workers=args.workers,
+                      settle_seconds=args.settle, poll_interval=args.poll_interval,
+                      report_interval=args.report_interval, ingest=args.ingest).run()
+
+
+if __name__ == '__main__':
+    main()